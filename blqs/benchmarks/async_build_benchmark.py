@@ -0,0 +1,131 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks building many programs concurrently in asyncio tasks.
+
+Usage:
+    python benchmarks/async_build_benchmark.py [--builds 500] [--steps 20] [--qubits 10]
+
+Each build is an asyncio task which opens a program and, for each step, calls a builder which adds
+a layer of instructions on that many qubits to it, then awaits, so that the builds interleave on
+the event loop. This reports the time to run all of the builds:
+
+*   one after the other, as was needed with the thread local block stack,
+*   concurrently on a thread pool, the other way to run them before,
+*   concurrently on the event loop with `blqs.set_block_stack_scope("context")`,
+*   concurrently on the event loop, each in a `blqs.block_stack_scope("context")`,
+
+and whether the programs built are correct. Running them concurrently on the event loop with the
+thread local block stack is also reported, and fails, since each build sees the blocks opened by
+the others.
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import sys
+import time
+
+import blqs
+
+_H = blqs.Op("H")
+_CZ = blqs.Op("CZ")
+
+
+@blqs.build
+def _layer(step, num_qubits):
+    for q in range(num_qubits):
+        _H(q)
+    if blqs.Register(f"m{step}"):
+        for q in range(0, num_qubits - 1, 2):
+            _CZ(q, q + 1)
+
+
+async def _build(num_steps: int, num_qubits: int) -> blqs.Program:
+    with blqs.Program() as program:
+        for step in range(num_steps):
+            _layer(step, num_qubits)
+            await asyncio.sleep(0)
+    return program
+
+
+async def _scoped_build(num_steps: int, num_qubits: int) -> blqs.Program:
+    with blqs.block_stack_scope("context"):
+        return await _build(num_steps, num_qubits)
+
+
+def _thread_build(num_steps: int, num_qubits: int) -> blqs.Program:
+    with blqs.Program() as program:
+        for step in range(num_steps):
+            _layer(step, num_qubits)
+    return program
+
+
+async def _sequential(num_builds, num_steps, num_qubits):
+    return [await _build(num_steps, num_qubits) for _ in range(num_builds)]
+
+
+async def _thread_pool(num_builds, num_steps, num_qubits):
+    loop = asyncio.get_running_loop()
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        return await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _thread_build, num_steps, num_qubits)
+                for _ in range(num_builds)
+            )
+        )
+
+
+async def _concurrent(num_builds, num_steps, num_qubits):
+    return await asyncio.gather(*(_build(num_steps, num_qubits) for _ in range(num_builds)))
+
+
+async def _concurrent_scoped(num_builds, num_steps, num_qubits):
+    return await asyncio.gather(*(_scoped_build(num_steps, num_qubits) for _ in range(num_builds)))
+
+
+def _run(name, scope, coroutine, args, expected):
+    blqs.set_block_stack_scope(scope)
+    start = time.perf_counter()
+    try:
+        programs = asyncio.run(coroutine(args.builds, args.steps, args.qubits))
+        correct = "yes" if all(program == expected for program in programs) else "no"
+    except AssertionError:
+        correct = "failed"
+    elapsed = time.perf_counter() - start
+    blqs.set_block_stack_scope("thread")
+    print(f"{name:<30} {scope:<8} {elapsed:>7.3f} {correct:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--builds", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--qubits", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    expected = _thread_build(args.steps, args.qubits)
+    print(
+        f"Python {sys.version.split()[0]}, {args.builds} builds of {args.steps} steps, "
+        f"times in s"
+    )
+    print(f"{'builds':<30} {'scope':<8} {'time':>7} {'correct':>8}")
+    _run("sequential", "thread", _sequential, args, expected)
+    _run("thread pool", "thread", _thread_pool, args, expected)
+    _run("concurrent", "context", _concurrent, args, expected)
+    _run("concurrent, block_stack_scope", "thread", _concurrent_scoped, args, expected)
+    _run("concurrent", "thread", _concurrent, args, expected)
+
+
+if __name__ == "__main__":
+    main()
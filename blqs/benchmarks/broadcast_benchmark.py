@@ -0,0 +1,88 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks emitting layers of an op on many targets, one instruction at a time and at once.
+
+Usage:
+    python benchmarks/broadcast_benchmark.py [--targets 10 1000] [--layers 100] [--repeats 5]
+
+For each number of targets, this creates a program with that many layers of an op applied to each
+target, by calling the op on each target and by calling `blqs.Op.on_each`, and reports the time to
+create the program and the memory it uses, as measured by `tracemalloc`.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+
+import blqs
+
+_H = blqs.Op("H")
+
+
+def _individual(num_targets: int, num_layers: int) -> blqs.Program:
+    targets = range(num_targets)
+    with blqs.Program() as program:
+        for _ in range(num_layers):
+            for t in targets:
+                _H(t)
+    return program
+
+
+def _broadcast(num_targets: int, num_layers: int) -> blqs.Program:
+    targets = range(num_targets)
+    with blqs.Program() as program:
+        for _ in range(num_layers):
+            _H.on_each(*targets)
+    return program
+
+
+def _time(func, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _memory(func) -> int:
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    program = func()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del program
+    return end - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--layers", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"Python {sys.version.split()[0]}, {args.layers} layers, median of {args.repeats} runs")
+    print(f"{'targets':>7} {'emission':<10} {'time (ms)':>10} {'memory (KB)':>12}")
+    for num_targets in args.targets:
+        for name, create in (("individual", _individual), ("on_each", _broadcast)):
+            elapsed = _time(lambda: create(num_targets, args.layers), args.repeats)
+            memory = _memory(lambda: create(num_targets, args.layers))
+            print(f"{num_targets:>7} {name:<10} {elapsed * 1e3:>10.2f} {memory / 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
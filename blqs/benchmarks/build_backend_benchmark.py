@@ -0,0 +1,100 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the time to compile large builders with the gast and ast backends.
+
+Usage:
+    python benchmarks/build_backend_benchmark.py [--sizes 100 300 1000] [--repeats 5]
+
+For each size this generates a builder function with that many blocks of statements, each
+containing an assignment, an `if`, a `for`, a `while` and a `del`, and reports the time of the
+first call of the builder, which transforms and compiles it, for each backend.
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+import textwrap
+import time
+
+import blqs
+
+_STATEMENT_BLOCK = """
+    a{i} = blqs.Register("a{i}")
+    if a{i}:
+        blqs.Op("H")({i})
+    else:
+        blqs.Op("X")({i})
+    for j{i} in blqs.Iterable("range(2)", blqs.Register("j{i}")):
+        blqs.Op("CX")(j{i}, {i})
+    while a{i}:
+        blqs.Op("Z")({i})
+    del a{i}
+"""
+
+
+def _builder_source(num_blocks: int) -> str:
+    body = "".join(_STATEMENT_BLOCK.format(i=i) for i in range(num_blocks))
+    return f"import blqs\n\n\ndef builder():{textwrap.indent(textwrap.dedent(body), '    ')}"
+
+
+def _load_builder(directory: str, num_blocks: int):
+    """Writes a builder with the given number of statement blocks to a module and imports it."""
+    path = os.path.join(directory, f"builder_{num_blocks}.py")
+    with open(path, "w") as f:
+        f.write(_builder_source(num_blocks))
+    spec = importlib.util.spec_from_file_location(f"builder_{num_blocks}", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.builder
+
+
+def _time_first_call(builder, config: blqs.BuildConfig, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        blqs.clear_compile_cache()
+        built = blqs.build_with_config(config)(builder)
+        start = time.perf_counter()
+        built()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    blqs.disable_persistent_cache()
+    print(f"Python {sys.version.split()[0]}, median of {args.repeats} runs")
+    print(f"{'blocks':>8} {'statements':>11} {'gast (ms)':>10} {'ast (ms)':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            builder = _load_builder(directory, size)
+            gast_time = _time_first_call(
+                builder, blqs.BuildConfig(ast_backend="gast"), args.repeats
+            )
+            ast_time = _time_first_call(builder, blqs.BuildConfig(ast_backend="ast"), args.repeats)
+            print(
+                f"{size:>8} {size * 10:>11} {gast_time * 1e3:>10.1f} {ast_time * 1e3:>10.1f} "
+                f"{gast_time / ast_time:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks building a builder over many arguments with `blqs.build_many`.
+
+Usage:
+    python benchmarks/build_many_benchmark.py [--builds 2000] [--qubits 20] [--layers 10]
+        [--chunksizes 1 16]
+
+This builds a sweep builder, with layers of rotations and entangling instructions on that many
+qubits, for that many angles, and reports the number of programs built per second by calling the
+builder in a loop, and by `blqs.build_many` with a thread pool and with a process pool for each
+chunksize. Building with a process pool scales with the number of cores, while building with a
+thread pool is limited by the global interpreter lock.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import blqs
+
+_CZ = blqs.Op("CZ")
+
+
+@blqs.build
+def _sweep(angle, num_qubits, num_layers):
+    rx = blqs.Op(f"rx({angle})")
+    for layer in range(num_layers):
+        for q in range(num_qubits):
+            rx(q)
+        for q in range(layer % 2, num_qubits - 1, 2):
+            _CZ(q, q + 1)
+        if blqs.Register(f"m{layer}"):
+            rx(0)
+
+
+def _per_second(func, num_builds: int) -> float:
+    start = time.perf_counter()
+    func()
+    return num_builds / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--builds", type=int, default=2000)
+    parser.add_argument("--qubits", type=int, default=20)
+    parser.add_argument("--layers", type=int, default=10)
+    parser.add_argument("--chunksizes", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args(argv)
+
+    sweep_args = [(i / args.builds, args.qubits, args.layers) for i in range(args.builds)]
+    print(
+        f"Python {sys.version.split()[0]}, {os.cpu_count()} CPUs, {args.builds} builds, "
+        f"programs per second"
+    )
+    print(f"{'build':<10} {'chunksize':>9} {'per s':>8}")
+    loop_rate = _per_second(lambda: [_sweep(*a) for a in sweep_args], args.builds)
+    print(f"{'loop':<10} {'':>9} {loop_rate:>8.0f}")
+    for executor in ("thread", "process"):
+        for chunksize in args.chunksizes:
+            rate = _per_second(
+                lambda: sum(
+                    1
+                    for _ in blqs.build_many(
+                        _sweep, sweep_args, executor=executor, chunksize=chunksize
+                    )
+                ),
+                args.builds,
+            )
+            print(f"{executor:<10} {chunksize:>9} {rate:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks programs of many instructions, stored in lists and in columns.
+
+Usage:
+    python benchmarks/columnar_benchmark.py [--instructions 1000000] [--qubits 100]
+
+For programs storing their instructions in a list and in columns, this creates a program with that
+many two-qubit instructions, with a few distinct ops, on that many qubits, and reports the memory
+the program uses, as measured by `tracemalloc`, the time to create it, to iterate over its
+instructions, to count the instructions with each op, and to pickle it, and the size of the
+pickle.
+"""
+
+import argparse
+import collections
+import pickle
+import sys
+import time
+import tracemalloc
+
+import blqs
+
+_OPS = [blqs.Op(name) for name in ("H", "X", "CZ", "CNOT")]
+
+
+def _program(num_instructions: int, num_qubits: int, columnar: bool) -> blqs.Program:
+    ops = _OPS
+    with blqs.Program(columnar=columnar) as program:
+        for i in range(num_instructions):
+            ops[i % len(ops)](i % num_qubits, (i + 1) % num_qubits)
+    return program
+
+
+def _op_counts(program: blqs.Program):
+    if program.is_columnar():
+        return program._statements.op_counts()
+    return collections.Counter(statement.op() for statement in program)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instructions", type=int, default=1000000)
+    parser.add_argument("--qubits", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    print(f"Python {sys.version.split()[0]}, {args.instructions} instructions, times in s")
+    print(
+        f"{'storage':<8} {'MB':>7} {'create':>7} {'iterate':>8} {'op counts':>10} {'pickle':>7} "
+        f"{'pickle MB':>10}"
+    )
+    for columnar in (False, True):
+        tracemalloc.start()
+        start, _ = tracemalloc.get_traced_memory()
+        program = _program(args.instructions, args.qubits, columnar)
+        end, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        create_time, _ = _timed(lambda: _program(args.instructions, args.qubits, columnar))
+        iterate_time, _ = _timed(lambda: sum(1 for _ in program))
+        op_counts_time, _ = _timed(lambda: _op_counts(program))
+        pickle_time, pickled = _timed(lambda: pickle.dumps(program))
+        print(
+            f"{'columns' if columnar else 'list':<8} {(end - start) / 1e6:>7.1f} "
+            f"{create_time:>7.2f} {iterate_time:>8.2f} {op_counts_time:>10.3f} "
+            f"{pickle_time:>7.2f} {len(pickled) / 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks hashing and comparing deeply nested programs, frozen and not.
+
+Usage:
+    python benchmarks/frozen_block_benchmark.py [--depths 10 100] [--width 10] [--repeats 5]
+
+For each depth, this creates programs of that many nested `blqs.If`s, each with `width`
+instructions in each of its blocks, and reports the time to hash a program, to compare two equal
+programs, to compare two programs which differ only in their innermost instruction, and to look a
+program up in a dict, for programs which are not frozen and for frozen programs. It also reports
+the time to freeze a program.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+import blqs
+
+_H = blqs.Op("H")
+
+
+def _program(depth: int, width: int, last_target: int = 0) -> blqs.Program:
+    with blqs.Program() as program:
+        block = program
+        for i in range(depth):
+            with block:
+                statement = blqs.If(blqs.Register(f"r{i}"))
+            with statement.else_block():
+                for target in range(width):
+                    _H(target)
+            block = statement.if_block()
+        with block:
+            _H(last_target)
+    return program
+
+
+def _time(func, repeats: int, number: int = 100) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return statistics.median(times)
+
+
+def _time_freeze(depth: int, width: int, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        program = _program(depth, width)
+        start = time.perf_counter()
+        program.freeze()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depths", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"Python {sys.version.split()[0]}, median of {args.repeats} runs, times in us")
+    print(
+        f"{'depth':>5} {'frozen':>6} {'hash':>9} {'eq (equal)':>11} {'eq (differ)':>12} "
+        f"{'dict lookup':>12} {'freeze':>9}"
+    )
+    for depth in args.depths:
+        for frozen in (False, True):
+            program, equal, different = (
+                _program(depth, args.width),
+                _program(depth, args.width),
+                _program(depth, args.width, last_target=1),
+            )
+            freeze_str = "-"
+            if frozen:
+                for p in (program, equal, different):
+                    p.freeze()
+                freeze_str = f"{_time_freeze(depth, args.width, args.repeats) * 1e6:.1f}"
+            programs = {equal: 0, different: 1}
+            hash_time = _time(lambda: hash(program), args.repeats)
+            eq_time = _time(lambda: program == equal, args.repeats)
+            differ_time = _time(lambda: program == different, args.repeats)
+            lookup_time = _time(lambda: programs[program], args.repeats)
+            print(
+                f"{depth:>5} {str(frozen):>6} {hash_time * 1e6:>9.2f} {eq_time * 1e6:>11.2f} "
+                f"{differ_time * 1e6:>12.2f} {lookup_time * 1e6:>12.2f} {freeze_str:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
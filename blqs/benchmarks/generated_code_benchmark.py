@@ -0,0 +1,135 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the size and run time of the code generated for the builders in testing_samples.
+
+Usage:
+    python benchmarks/generated_code_benchmark.py [--calls 2000] [--repeats 5] [--capture-all]
+
+For each builder in `blqs.testing_samples`, this reports the size of the bytecode generated for
+it, the time to transform and compile it, and the time of a call of the generated function. Most
+of the samples raise an exception, which is caught, so their call time includes raising it. The
+mapping of the exception back to the original source, done by `blqs.build`, is not included.
+
+With `--capture-all`, the native fast paths and static analysis are disabled, so that every
+statement the build supports is captured, even those on values of builtin types.
+
+To compare two versions of blqs, run this with each of them on the `PYTHONPATH`.
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import importlib
+import inspect
+import io
+import statistics
+import sys
+import time
+import types
+
+import blqs
+import blqs.testing_samples as ts
+
+# The build module is shadowed by the `blqs.build` function.
+build_module = importlib.import_module("blqs.build")
+
+
+def _samples(capture_all: bool):
+    """Yields the name, function and config of each builder without arguments in testing_samples."""
+    for name, value in vars(ts).items():
+        if not callable(value) or not hasattr(value, "__wrapped__"):
+            continue
+        func = inspect.unwrap(value)
+        if func.__module__ != ts.__name__:
+            continue
+        config = getattr(value, "_blqs_build_config", None) or blqs.BuildConfig()
+        if capture_all:
+            config = dataclasses.replace(
+                config, native_fast_paths=False, static_native_analysis=False
+            )
+        try:
+            build_module._compile(func, config)
+        except (NameError, ValueError):
+            # Samples of unsupported uses of decorators.
+            continue
+        if inspect.signature(func).parameters:
+            continue
+        yield name, func, config
+
+
+def _code_size(code: types.CodeType) -> int:
+    """The size of the bytecode of the code object and the code objects nested in it."""
+    return len(code.co_code) + sum(
+        _code_size(c) for c in code.co_consts if isinstance(c, types.CodeType)
+    )
+
+
+def _generated_function(func, compiled) -> types.FunctionType:
+    """Binds the compiled code like the `blqs.build` wrapper, without its exception handling."""
+    return types.FunctionType(
+        compiled.code, func.__globals__, func.__name__, func.__defaults__, func.__closure__
+    )
+
+
+def _time_call(generated_func, calls: int, repeats: int) -> float:
+    times = []
+    # Some of the samples print.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(calls):
+                try:
+                    generated_func()
+                except ts.LocatedException:
+                    pass
+            times.append((time.perf_counter() - start) / calls)
+    return statistics.median(times)
+
+
+def _time_compile(func, config, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        build_module._compile(func, config)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--capture-all", action="store_true")
+    args = parser.parse_args(argv)
+
+    blqs.disable_persistent_cache()
+    print(f"Python {sys.version.split()[0]}, median of {args.repeats} runs")
+    print(f"{'sample':<42} {'bytes':>6} {'compile (us)':>13} {'call (us)':>10}")
+    total_size = total_compile = total_call = 0.0
+    for name, func, config in _samples(args.capture_all):
+        compiled = build_module._compile(func, config)
+        size = _code_size(compiled.code)
+        compile_time = _time_compile(func, config, args.repeats)
+        call_time = _time_call(_generated_function(func, compiled), args.calls, args.repeats)
+        total_size += size
+        total_compile += compile_time
+        total_call += call_time
+        print(f"{name:<42} {size:>6} {compile_time * 1e6:>13.1f} {call_time * 1e6:>10.2f}")
+    print(
+        f"{'total':<42} {total_size:>6.0f} {total_compile * 1e6:>13.1f} {total_call * 1e6:>10.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
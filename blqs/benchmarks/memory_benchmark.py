@@ -0,0 +1,79 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the memory used by the statements of blqs programs.
+
+Usage:
+    python benchmarks/memory_benchmark.py [--count 100000] [--interning]
+
+This creates that many objects of each kind and reports the memory allocated per object, as
+measured by `tracemalloc`. The memory includes everything the object holds that is not shared
+with the other objects, for example the tuple of targets of an instruction, but not its op or its
+targets, which are shared.
+
+With `--interning`, `blqs.enable_interning` is called first, so that the equal ops, registers and
+instructions created by calling an op are shared, and use no memory after the first.
+"""
+
+import argparse
+import sys
+import tracemalloc
+
+import blqs
+
+_OP = blqs.Op("H")
+_REGISTER = blqs.Register("a")
+_ITERABLE = blqs.Iterable("range(5)", _REGISTER)
+
+_FACTORIES = {
+    "Instruction": lambda: blqs.Instruction(_OP, 0),
+    "Instruction (2 targets)": lambda: blqs.Instruction(_OP, 0, 1),
+    "Op call": lambda: _OP(0, 1),
+    "Op": lambda: blqs.Op("H"),
+    "Register": lambda: blqs.Register("a"),
+    "Block (empty)": blqs.Block,
+    "Assign": lambda: blqs.Assign(("a",), _REGISTER),
+    "Delete": lambda: blqs.Delete(("a",)),
+    "If": lambda: blqs.If(_REGISTER),
+    "For": lambda: blqs.For(_ITERABLE),
+    "While": lambda: blqs.While(_REGISTER),
+}
+
+
+def _bytes_per_object(factory, count: int) -> float:
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    objects = [factory() for _ in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Do not count the list holding the objects.
+    return (end - start - sys.getsizeof(objects)) / len(objects)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--interning", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.interning:
+        blqs.enable_interning()
+
+    print(f"Python {sys.version.split()[0]}, {args.count} objects of each kind")
+    print(f"{'kind':<24} {'bytes per object':>17}")
+    for kind, factory in _FACTORIES.items():
+        print(f"{kind:<24} {_bytes_per_object(factory, args.count):>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the time to name the variables of the code generated for large builders.
+
+Usage:
+    python benchmarks/namer_benchmark.py [--statements 1000 5000] [--globals 10 5000] [--repeats 5]
+
+For each number of statements and of globals, this generates a builder with that many captured
+assignments, in a module with that many globals, and reports the time to transform it, and the
+time spent creating the transformer and the names of the generated variables.
+"""
+
+import argparse
+import importlib
+import statistics
+import sys
+import time
+from unittest import mock
+
+import gast
+
+import blqs
+from blqs import _namer
+
+# The build module is shadowed by the `blqs.build` function.
+build_module = importlib.import_module("blqs.build")
+
+
+def _builder(num_statements: int, num_globals: int):
+    body = "".join(f"    a{i} = blqs.Register('a{i}')\n" for i in range(num_statements))
+    source = f"def builder():\n{body}"
+    namespace = {f"global_{i}": i for i in range(num_globals)}
+    namespace["blqs"] = blqs
+    exec(source, namespace)  # pylint: disable=exec-used
+    return source, namespace["builder"]
+
+
+class _TimedNamer(_namer.Namer):
+    """A namer which records the time spent creating it and new names."""
+
+    elapsed = 0.0
+
+    def __init__(self, *args, **kwargs):
+        start = time.perf_counter()
+        super().__init__(*args, **kwargs)
+        _TimedNamer.elapsed += time.perf_counter() - start
+
+    def new_name(self, name_base: str) -> str:
+        start = time.perf_counter()
+        name = super().new_name(name_base)
+        _TimedNamer.elapsed += time.perf_counter() - start
+        return name
+
+
+def _time_transform(source: str, func, repeats: int):
+    times, naming_times = [], []
+    for _ in range(repeats):
+        root = gast.parse(source)
+        _TimedNamer.elapsed = 0.0
+        start = time.perf_counter()
+        build_module._BuildTransformer(func, blqs.BuildConfig()).transform(root)
+        times.append(time.perf_counter() - start)
+        naming_times.append(_TimedNamer.elapsed)
+    return statistics.median(times), statistics.median(naming_times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--globals", type=int, nargs="+", default=[10, 5000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"Python {sys.version.split()[0]}, median of {args.repeats} runs")
+    print(f"{'statements':>10} {'globals':>8} {'transform (ms)':>15} {'naming (ms)':>12}")
+    for num_statements in args.statements:
+        for num_globals in args.globals:
+            source, func = _builder(num_statements, num_globals)
+            with mock.patch.object(_namer, "Namer", _TimedNamer):
+                transform_time, naming_time = _time_transform(source, func, args.repeats)
+            print(
+                f"{num_statements:>10} {num_globals:>8} {transform_time * 1e3:>15.1f} "
+                f"{naming_time * 1e3:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
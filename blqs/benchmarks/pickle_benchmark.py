@@ -0,0 +1,95 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks pickling programs and statements.
+
+Usage:
+    python benchmarks/pickle_benchmark.py [--instructions 1000000] [--qubits 100] [--depth 10000]
+
+This creates a program with that many two-qubit instructions, with a few distinct ops, on that
+many qubits, some of them in loops, and reports the time to pickle and unpickle it and the size of
+the pickle. It also reports the same for a list of its instructions, pickled individually, and
+whether a program of blocks nested to the given depth can be pickled without raising
+`RecursionError`.
+"""
+
+import argparse
+import pickle
+import sys
+import time
+
+import blqs
+
+_OPS = [blqs.Op(name) for name in ("H", "X", "CZ", "CNOT")]
+
+
+def _program(num_instructions: int, num_qubits: int) -> blqs.Program:
+    ops = _OPS
+    with blqs.Program() as program:
+        for i in range(num_instructions):
+            if i % 1000 == 0:
+                loop = blqs.For(blqs.Iterable(f"range({i})", blqs.Register("i")))
+                loop.loop_block().__enter__()
+            ops[i % len(ops)](i % num_qubits, (i + 1) % num_qubits)
+            if i % 1000 == 999:
+                loop.loop_block().__exit__(None, None, None)
+    return program
+
+
+def _nested_program(depth: int) -> blqs.Program:
+    program = blqs.Program()
+    current: blqs.Block = program
+    for _ in range(depth):
+        block = blqs.Block()
+        current.append(block)
+        current = block
+    current.append(_OPS[0](0))
+    return program
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def _round_trip(value) -> str:
+    dump_time, data = _timed(lambda: pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    load_time, _ = _timed(lambda: pickle.loads(data))
+    return f"{dump_time:>6.2f} {load_time:>6.2f} {len(data) / 1e6:>6.2f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instructions", type=int, default=1000000)
+    parser.add_argument("--qubits", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    program = _program(args.instructions, args.qubits)
+    instructions = [s for loop in program for s in loop.loop_block()]
+    print(f"Python {sys.version.split()[0]}, {args.instructions} instructions, times in s")
+    print(f"{'value':<13} {'dump':>6} {'load':>6} {'MB':>6}")
+    print(f"{'program':<13} {_round_trip(program)}")
+    print(f"{'instructions':<13} {_round_trip(instructions)}")
+
+    try:
+        pickle.loads(pickle.dumps(_nested_program(args.depth)))
+        nested = "ok"
+    except RecursionError:
+        nested = "RecursionError"
+    print(f"Depth {args.depth} nested program: {nested}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the string of deeply nested programs, by indenting strings and by streaming.
+
+Usage:
+    python benchmarks/printer_benchmark.py [--depths 10 100 300] [--statements 10] [--repeats 5]
+
+For each depth, this creates a program of blocks nested to that depth, each with that many
+instructions, and reports the time to create its string by indenting the string of each nested
+block, as `str` did before `blqs.Printer`, the time taken by `str`, and the time to write it to a
+file with `blqs.write_str`.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import textwrap
+import time
+
+import blqs
+
+_H = blqs.Op("H")
+
+
+def _program(depth: int, num_statements: int) -> blqs.Program:
+    program = blqs.Program()
+    current: blqs.Block = program
+    for _ in range(depth):
+        block = blqs.Block()
+        current.append(block)
+        current = block
+        for i in range(num_statements):
+            current.append(blqs.Instruction(_H, i))
+    return program
+
+
+def _indented_str(stmt) -> str:
+    if isinstance(stmt, blqs.Program):
+        return "\n".join(_indented_str(s) for s in stmt)
+    if isinstance(stmt, blqs.Block):
+        return textwrap.indent("\n".join(_indented_str(s) for s in stmt), "  ")
+    return str(stmt)
+
+
+def _write_devnull(program: blqs.Program):
+    with open(os.devnull, "w") as file:
+        blqs.write_str(program, file)
+
+
+def _time(func, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depths", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--statements", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * max(args.depths)))
+    print(
+        f"Python {sys.version.split()[0]}, {args.statements} statements per block, "
+        f"median of {args.repeats} runs, times in ms"
+    )
+    print(f"{'depth':>5} {'MB':>6} {'indent':>8} {'str':>8} {'write_str':>10}")
+    for depth in args.depths:
+        program = _program(depth, args.statements)
+        size = len(str(program))
+        indent_time = _time(lambda: _indented_str(program), args.repeats)
+        str_time = _time(lambda: str(program), args.repeats)
+        write_time = _time(lambda: _write_devnull(program), args.repeats)
+        print(
+            f"{depth:>5} {size / 1e6:>6.1f} {indent_time * 1e3:>8.1f} {str_time * 1e3:>8.1f} "
+            f"{write_time * 1e3:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
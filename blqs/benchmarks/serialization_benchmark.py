@@ -0,0 +1,86 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks serializing programs with pickle and with `blqs.dumps`.
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--instructions 300000] [--qubits 100]
+
+This creates a program with that many two-qubit instructions, with a few distinct ops, on that
+many qubits, some of them in loops, and reports the time to serialize and load it with pickle and
+with `blqs.dumps` and `blqs.loads`, the size of the serialized program, and the time to iterate over
+its statements with `blqs.ProgramReader`.
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import blqs
+
+_OPS = [blqs.Op(name) for name in ("H", "X", "CZ", "CNOT")]
+
+
+def _program(num_instructions: int, num_qubits: int) -> blqs.Program:
+    ops = _OPS
+    with blqs.Program() as program:
+        for i in range(num_instructions):
+            if i % 1000 == 0:
+                loop = blqs.For(blqs.Iterable(f"range({i})", blqs.Register("i")))
+                loop.loop_block().__enter__()
+            ops[i % len(ops)](i % num_qubits, (i + 1) % num_qubits)
+            if i % 1000 == 999:
+                loop.loop_block().__exit__(None, None, None)
+    return program
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instructions", type=int, default=300000)
+    parser.add_argument("--qubits", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    program = _program(args.instructions, args.qubits)
+    print(f"Python {sys.version.split()[0]}, {args.instructions} instructions, times in s")
+    print(f"{'format':<7} {'dump':>6} {'load':>6} {'MB':>6}")
+    for name, dumps, loads in (
+        ("pickle", lambda p: pickle.dumps(p, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        ("blqs", blqs.dumps, blqs.loads),
+    ):
+        dump_time, data = _timed(lambda: dumps(program))
+        load_time, loaded = _timed(lambda: loads(data))
+        assert loaded == program
+        print(f"{name:<7} {dump_time:>6.2f} {load_time:>6.2f} {len(data) / 1e6:>6.2f}")
+
+    fd, path = tempfile.mkstemp(suffix=".blqs")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            blqs.dump(program, f)
+        with blqs.ProgramReader(path) as reader:
+            read_time, _ = _timed(lambda: sum(1 for _ in reader))
+        print(f"ProgramReader iteration: {read_time:.2f}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
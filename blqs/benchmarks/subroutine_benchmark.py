@@ -0,0 +1,80 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks programs which call the same nested builders many times.
+
+Usage:
+    python benchmarks/subroutine_benchmark.py [--calls 10000] [--distinct 10] [--layer 100]
+
+This builds a program which calls a builder of a layer of that many instructions that many times,
+with that many distinct arguments, both adding a nested block for each call and, with
+`emit_calls`, adding a `blqs.Call` of a shared block. It reports the time to build the program,
+the number of statements held by it, counting shared blocks once, and the size of `blqs.dumps`.
+"""
+
+import argparse
+import sys
+import time
+
+import blqs
+
+_OPS = [blqs.Op(name) for name in ("H", "X", "CZ", "CNOT")]
+
+
+def _layer(offset, size):
+    for i in range(size):
+        _OPS[i % len(_OPS)](offset + i)
+
+
+def _program(layer, calls: int, distinct: int, size: int):
+    def program():
+        for i in range(calls):
+            layer(i % distinct, size)
+
+    return blqs.build(program)()
+
+
+def _num_statements(block: blqs.Block, seen: set) -> int:
+    if id(block) in seen:
+        return 0
+    seen.add(id(block))
+    total = len(block)
+    for stmt in block:
+        if isinstance(stmt, blqs.Block):
+            total += _num_statements(stmt, seen)
+        elif isinstance(stmt, blqs.Call):
+            total += _num_statements(stmt.block(), seen)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, default=10)
+    parser.add_argument("--layer", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    print(f"Python {sys.version.split()[0]}, {args.calls} calls, {args.distinct} distinct")
+    print(f"{'builder':<8} {'build s':>8} {'statements':>11} {'dumps MB':>9}")
+    for name, emit_calls in (("nested", False), ("calls", True)):
+        layer = blqs.build_with_config(blqs.BuildConfig(emit_calls=emit_calls))(_layer)
+        start = time.perf_counter()
+        program = _program(layer, args.calls, args.distinct, args.layer)
+        build_time = time.perf_counter() - start
+        statements = _num_statements(program, set())
+        size = len(blqs.dumps(program)) / 1e6
+        print(f"{name:<8} {build_time:>8.2f} {statements:>11} {size:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
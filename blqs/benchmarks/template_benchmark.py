@@ -0,0 +1,93 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the time to transform each kind of statement, with and without parsed templates.
+
+Usage:
+    python benchmarks/template_benchmark.py [--statements 500] [--repeats 5]
+
+For each kind of statement the build captures, this generates a builder containing that many
+statements of the kind and reports the time per statement taken by the build transformer, both
+with templates parsed once and reused (the default), and with templates parsed every time they
+are used.
+"""
+
+import argparse
+import importlib
+import statistics
+import sys
+import textwrap
+import time
+from unittest import mock
+
+import gast
+
+import blqs
+from blqs import _template
+
+# The build module is shadowed by the `blqs.build` function.
+build_module = importlib.import_module("blqs.build")
+
+_STATEMENTS = {
+    "if": "if a{i}:\n    b = {i}\nelse:\n    b = 0\n",
+    "for": "for i{i} in range({i}):\n    b = i{i}\n",
+    "while": "while a{i}:\n    b = {i}\n",
+    "assign": "a{i} = blqs.Register('a{i}')\n",
+    "delete": "del a{i}\n",
+}
+
+
+def _builder(kind: str, num_statements: int):
+    body = "".join(_STATEMENTS[kind].format(i=i) for i in range(num_statements))
+    source = f"def builder():\n{textwrap.indent(body, '    ')}"
+    namespace = {"blqs": blqs}
+    exec(source, namespace)  # pylint: disable=exec-used
+    return source, namespace["builder"]
+
+
+def _time_transform(source: str, func, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        root = gast.parse(source)
+        transformer = build_module._BuildTransformer(func, blqs.BuildConfig())
+        start = time.perf_counter()
+        transformer.transform(root)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(
+        f"Python {sys.version.split()[0]}, {args.statements} statements, "
+        f"median of {args.repeats} runs"
+    )
+    print(f"{'kind':>8} {'parsed (us)':>12} {'reused (us)':>12} {'speedup':>8}")
+    for kind in _STATEMENTS:
+        source, func = _builder(kind, args.statements)
+        # Parse the template every time it is used.
+        with mock.patch.object(_template, "get_template", _template.Template):
+            parsed_time = _time_transform(source, func, args.repeats) / args.statements
+        reused_time = _time_transform(source, func, args.repeats) / args.statements
+        print(
+            f"{kind:>8} {parsed_time * 1e6:>12.1f} {reused_time * 1e6:>12.1f} "
+            f"{parsed_time / reused_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
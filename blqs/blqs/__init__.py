@@ -16,23 +16,42 @@ from blqs.assignment import (
     Assign,
 )
 
+from blqs.batch import (
+    build_many,
+)
+
 from blqs.block_stack import (
+    block_stack_scope,
     get_current_block,
     pop_block,
     push_new_block,
+    set_block_stack_scope,
 )
 
 from blqs.block import (
     Block,
+    StatementsView,
 )
 
 from blqs.build import (
     build,
+    build_stats,
     build_with_config,
     BuildConfig,
 )
 
 
+from blqs.columnar import (
+    ColumnarStatements,
+)
+
+from blqs.compile_cache import (
+    clear_compile_cache,
+    compile_cache_info,
+    CompileCacheInfo,
+    set_compile_cache_maxsize,
+)
+
 from blqs.conditional import (
     If,
 )
@@ -50,9 +69,18 @@ from blqs.exceptions import (
 )
 
 from blqs.instruction import (
+    BroadcastInstruction,
     Instruction,
 )
 
+from blqs.interning import (
+    count_distinct_instructions,
+    disable_interning,
+    enable_interning,
+    interning_info,
+    InterningInfo,
+)
+
 from blqs.iterable import (
     Iterable,
 )
@@ -66,6 +94,12 @@ from blqs.op import (
     Op,
 )
 
+from blqs.printer import (
+    print_str,
+    Printer,
+    write_str,
+)
+
 from blqs.protocols import (
     is_deletable,
     is_iterable,
@@ -80,6 +114,13 @@ from blqs.protocols import (
     SupportsReadableTargets,
 )
 
+from blqs.persistent_cache import (
+    disable_persistent_cache,
+    enable_persistent_cache,
+    persistent_cache_info,
+    PersistentCacheInfo,
+)
+
 from blqs.program import (
     Program,
 )
@@ -88,6 +129,29 @@ from blqs.register import (
     Register,
 )
 
+from blqs.result_cache import (
+    clear_result_cache,
+    result_cache_info,
+    ResultCache,
+    ResultCacheInfo,
+)
+
+from blqs.serialization import (
+    dump,
+    dumps,
+    load,
+    loads,
+    ProgramReader,
+)
+
 from blqs.statement import (
     Statement,
 )
+
+from blqs.stats import (
+    BuildStats,
+)
+
+from blqs.subroutine import (
+    Call,
+)
@@ -0,0 +1,281 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A static analysis of which expressions of a function always evaluate to builtin values."""
+
+import builtins
+import types
+from typing import Any, Collection, Dict, List, Optional, Set
+
+# Builtin functions whose return value is always of a builtin type, whatever their arguments.
+_NATIVE_BUILTIN_FUNCTIONS = frozenset(
+    {
+        "all",
+        "any",
+        "bool",
+        "callable",
+        "chr",
+        "dict",
+        "enumerate",
+        "frozenset",
+        "hasattr",
+        "hash",
+        "id",
+        "isinstance",
+        "issubclass",
+        "len",
+        "list",
+        "ord",
+        "range",
+        "set",
+        "sorted",
+        "tuple",
+        "zip",
+    }
+)
+
+# The native builtin functions whose return value is always a scalar, such as a bool, int or str.
+_SCALAR_BUILTIN_FUNCTIONS = frozenset(
+    {"bool", "callable", "chr", "hasattr", "hash", "id", "isinstance", "issubclass", "len", "ord"}
+)
+
+# The types of the constants which are scalars.
+_SCALAR_TYPES = (bool, int, float, complex, str, bytes, type(None), type(Ellipsis))
+
+
+class NativeAnalysis:
+    """Determines which expressions of a function always evaluate to values of builtin types.
+
+    Values of builtin types never support the blqs protocols, so statements whose conditions,
+    iterables or assigned values are such expressions do not need to be captured.
+
+    The analysis is conservative. Literals, comparisons and arithmetic of such values, and calls
+    of builtin functions which always return builtin types, are native, except that orderings,
+    such as `<`, are only native if both of their operands are scalars, such as ints or strs,
+    since ordering containers orders their elements. A local variable of the function is native
+    if every place a variable of the same name is bound, in any scope in the function, binds a
+    native value. Names of the builtin functions must not be bound anywhere in
+    the function, nor in its globals, for calls of them to count.
+    """
+
+    def __init__(
+        self,
+        root: Any,
+        ast_module: types.ModuleType,
+        local_names: Collection[str],
+        outer_names: Collection[str],
+    ):
+        """Analyzes the function.
+
+        Args:
+            root: The syntax tree of the function's source code, before it is transformed.
+            ast_module: The module of the syntax tree, either `gast` or `ast`.
+            local_names: The names of the local variables of the function, including those used
+                by nested functions.
+            outer_names: The names visible to the function from outside of it, that is the names
+                of its free variables and globals.
+        """
+        self._ast = ast_module
+        # The values bound to each name. None for a binding whose value is not known.
+        self._bindings: Dict[str, List[Optional[Any]]] = {}
+        self._collect_bindings(root)
+        self._native_functions = {
+            name
+            for name in _NATIVE_BUILTIN_FUNCTIONS
+            if name not in self._bindings
+            and name not in outer_names
+            and name not in local_names
+            and hasattr(builtins, name)
+        }
+        self._native_names: Set[str] = set()
+        # The native names which are always bound to scalars, such as ints and strs.
+        self._scalar_names: Set[str] = set()
+        self._solve(local_names)
+
+    def is_native(self, node: Any) -> bool:
+        """Returns whether the expression always evaluates to a value of a builtin type."""
+        a = self._ast
+        if isinstance(node, (a.Constant, a.JoinedStr)):
+            return True
+        if isinstance(
+            node,
+            (a.List, a.Tuple, a.Set, a.Dict, a.ListComp, a.SetComp, a.DictComp, a.GeneratorExp),
+        ):
+            # Containers never support the protocols, whatever their elements are.
+            return True
+        if isinstance(node, a.Name):
+            return node.id in self._native_names
+        if isinstance(node, a.Compare):
+            if all(isinstance(op, (a.Is, a.IsNot, a.In, a.NotIn)) for op in node.ops):
+                return True
+            operands = (node.left, *node.comparators)
+            if not all(self.is_native(operand) for operand in operands):
+                return False
+            # Ordering containers returns the result of ordering their first differing elements,
+            # which may support the protocols, so only orderings of scalars are native.
+            return all(
+                not isinstance(op, (a.Lt, a.LtE, a.Gt, a.GtE))
+                or (self._is_scalar(left) and self._is_scalar(right))
+                for op, left, right in zip(node.ops, operands, operands[1:])
+            )
+        if isinstance(node, a.BoolOp):
+            return all(self.is_native(v) for v in node.values)
+        if isinstance(node, a.UnaryOp):
+            return isinstance(node.op, a.Not) or self.is_native(node.operand)
+        if isinstance(node, a.BinOp):
+            return self.is_native(node.left) and self.is_native(node.right)
+        if isinstance(node, a.IfExp):
+            return self.is_native(node.body) and self.is_native(node.orelse)
+        if isinstance(node, a.Call):
+            return isinstance(node.func, a.Name) and node.func.id in self._native_functions
+        return False
+
+    def _is_scalar(self, node: Any) -> bool:
+        """Returns whether the expression always evaluates to a scalar, such as an int or str."""
+        a = self._ast
+        if isinstance(node, a.Constant):
+            return isinstance(node.value, _SCALAR_TYPES)
+        if isinstance(node, a.JoinedStr):
+            return True
+        if isinstance(node, a.Name):
+            return node.id in self._scalar_names
+        if isinstance(node, a.Compare):
+            # Native comparisons evaluate to bools.
+            return self.is_native(node)
+        if isinstance(node, a.BoolOp):
+            return all(self._is_scalar(v) for v in node.values)
+        if isinstance(node, a.UnaryOp):
+            return isinstance(node.op, a.Not) or self._is_scalar(node.operand)
+        if isinstance(node, a.BinOp):
+            return self._is_scalar(node.left) and self._is_scalar(node.right)
+        if isinstance(node, a.IfExp):
+            return self._is_scalar(node.body) and self._is_scalar(node.orelse)
+        if isinstance(node, a.Call):
+            return (
+                isinstance(node.func, a.Name)
+                and node.func.id in self._native_functions
+                and node.func.id in _SCALAR_BUILTIN_FUNCTIONS
+            )
+        return False
+
+    def is_native_int_iterable(self, node: Any) -> bool:
+        """Returns whether the expression always evaluates to an iterable of `int`s."""
+        a = self._ast
+        return (
+            isinstance(node, a.Call)
+            and isinstance(node.func, a.Name)
+            and node.func.id == "range"
+            and "range" in self._native_functions
+        )
+
+    def _is_native_binding(self, value: Any) -> bool:
+        if isinstance(value, _LoopVariable):
+            # The loop variable of a loop over a range is an int.
+            return self.is_native_int_iterable(value.iter_node)
+        return self.is_native(value)
+
+    def _is_scalar_binding(self, value: Any) -> bool:
+        if isinstance(value, _LoopVariable):
+            return self.is_native_int_iterable(value.iter_node)
+        return self._is_scalar(value)
+
+    def _bind(self, name: str, value: Optional[Any]):
+        self._bindings.setdefault(name, []).append(value)
+
+    def _collect_bindings(self, root: Any):
+        a = self._ast
+        # The targets whose bindings are accounted for by the statement binding them.
+        bound_targets = set()
+        nodes = list(a.walk(root))
+        for node in nodes:
+            if isinstance(node, a.Assign):
+                for target in node.targets:
+                    if isinstance(target, a.Name):
+                        self._bind(target.id, node.value)
+                        bound_targets.add(id(target))
+                    elif (
+                        isinstance(target, (a.Tuple, a.List))
+                        and isinstance(node.value, (a.Tuple, a.List))
+                        and len(target.elts) == len(node.value.elts)
+                        and all(isinstance(t, a.Name) for t in target.elts)
+                        and not any(isinstance(v, a.Starred) for v in node.value.elts)
+                    ):
+                        for t, v in zip(target.elts, node.value.elts):
+                            self._bind(t.id, v)
+                            bound_targets.add(id(t))
+            elif isinstance(node, a.AnnAssign) and isinstance(node.target, a.Name):
+                if node.value is not None:
+                    self._bind(node.target.id, node.value)
+                bound_targets.add(id(node.target))
+            elif isinstance(node, a.AugAssign) and isinstance(node.target, a.Name):
+                # The result of the operation is native if both the variable and value are.
+                self._bind(node.target.id, a.BinOp(node.target, node.op, node.value))
+                bound_targets.add(id(node.target))
+            elif isinstance(node, a.For) and isinstance(node.target, a.Name):
+                self._bind(node.target.id, _LoopVariable(node.iter))
+                bound_targets.add(id(node.target))
+
+        for node in nodes:
+            if isinstance(node, a.Name):
+                if not isinstance(node.ctx, a.Load) and id(node) not in bound_targets:
+                    # Other stores, and parameters, whose values are not known.
+                    if not isinstance(node.ctx, a.Del):
+                        self._bind(node.id, None)
+            elif isinstance(node, (a.FunctionDef, a.AsyncFunctionDef, a.ClassDef)):
+                self._bind(node.name, None)
+            elif isinstance(node, (a.Global, a.Nonlocal)):
+                for name in node.names:
+                    self._bind(name, None)
+            elif isinstance(node, a.alias):
+                self._bind((node.asname or node.name).split(".")[0], None)
+            elif isinstance(node, a.ExceptHandler) and isinstance(node.name, str):
+                # In gast, the name is a Name node, handled above.
+                self._bind(node.name, None)
+            elif type(node).__name__ == "arg":
+                self._bind(node.arg, None)
+            elif type(node).__name__.startswith("Match"):
+                for attribute in ("name", "rest"):
+                    name = getattr(node, attribute, None)
+                    if isinstance(name, str):
+                        self._bind(name, None)
+
+    def _solve(self, local_names: Collection[str]):
+        """Finds the greatest set of native names consistent with their bindings."""
+        native_names = {
+            name
+            for name, values in self._bindings.items()
+            if name in local_names and all(v is not None for v in values)
+        }
+        scalar_names = native_names
+        changed = True
+        while changed:
+            self._native_names, self._scalar_names = native_names, scalar_names
+            native_names = {
+                name
+                for name in native_names
+                if all(self._is_native_binding(v) for v in self._bindings[name])
+            }
+            scalar_names = {
+                name
+                for name in scalar_names & native_names
+                if all(self._is_scalar_binding(v) for v in self._bindings[name])
+            }
+            changed = (native_names, scalar_names) != (self._native_names, self._scalar_names)
+        self._native_names, self._scalar_names = native_names, scalar_names
+
+
+class _LoopVariable:
+    """The value bound to the variable of a `for` loop over `iter_node`."""
+
+    def __init__(self, iter_node: Any):
+        self.iter_node = iter_node
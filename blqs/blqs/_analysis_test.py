@@ -0,0 +1,162 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import ast
+import textwrap
+
+import gast
+import pytest
+
+from blqs import _analysis
+
+
+def _analyze(code, ast_module=gast, local_names=None, outer_names=()):
+    root = ast_module.parse(textwrap.dedent(code))
+    if local_names is None:
+        # The names bound anywhere in the code.
+        local_names = {
+            n.id
+            for n in ast_module.walk(root)
+            if isinstance(n, ast_module.Name) and not isinstance(n.ctx, ast_module.Load)
+        } | {n.arg for n in ast_module.walk(root) if type(n).__name__ == "arg"}
+    return _analysis.NativeAnalysis(root, ast_module, local_names, outer_names)
+
+
+def _expr(code, ast_module=gast):
+    return ast_module.parse(code).body[0].value
+
+
+@pytest.mark.parametrize("ast_module", [gast, ast])
+@pytest.mark.parametrize(
+    "expr, native",
+    [
+        ("1", True),
+        ("'a'", True),
+        ("f'{x}'", True),
+        ("[x, y]", True),
+        ("{x: y}", True),
+        ("(x for x in y)", True),
+        ("x", False),
+        ("x is y", True),
+        ("x in y", True),
+        ("not x", True),
+        ("x == 1", False),
+        ("1 == 2 < 3", True),
+        ("(x,) < (y,)", False),
+        ("[x] >= [y]", False),
+        ("(x,) == (y,)", True),
+        ("'a' < f'{x}' <= 'c'", True),
+        ("len(x) > 1", True),
+        ("(1 < 2) < 3", True),
+        ("1 < (2,)", False),
+        ("1 + 2 * -3", True),
+        ("1 + x", False),
+        ("1 and 2", True),
+        ("1 or x", False),
+        ("1 if x else 2", True),
+        ("1 if x else x", False),
+        ("len(x)", True),
+        ("isinstance(x, int)", True),
+        ("range(x)", True),
+        ("abs(x)", False),
+        ("f(x)", False),
+        ("x.y", False),
+        ("x[0]", False),
+    ],
+)
+def test_is_native_expressions(ast_module, expr, native):
+    analysis = _analyze("pass", ast_module)
+    assert analysis.is_native(_expr(expr, ast_module)) == native
+
+
+@pytest.mark.parametrize("ast_module", [gast, ast])
+def test_is_native_names(ast_module):
+    code = """
+    def f(param):
+        a = 1
+        b, c = a + 1, param
+        for i in range(10):
+            d = i * a
+        for j in param:
+            pass
+        e = 0
+        e += a
+        g = 0
+        g += param
+        with param as h:
+            pass
+        k = 1
+        def inner(k):
+            return k
+    """
+    analysis = _analyze(code, ast_module)
+    native = {n for n in "abcdeghijk" if analysis.is_native(_expr(n, ast_module))}
+    assert native == {"a", "b", "d", "e", "i"}
+    assert not analysis.is_native(_expr("param", ast_module))
+    assert not analysis.is_native(_expr("f", ast_module))
+
+
+def test_is_native_names_cycle():
+    analysis = _analyze("""
+    x = 0
+    y = x
+    x = y + 1
+    z = w
+    w = z
+    w = f()
+    """)
+    assert analysis.is_native(_expr("x")) and analysis.is_native(_expr("y"))
+    assert not analysis.is_native(_expr("z")) and not analysis.is_native(_expr("w"))
+
+
+def test_is_native_ordering_names():
+    analysis = _analyze("""
+    t = (x,)
+    n = 0
+    for i in range(3):
+        n += i
+    s = "a" if x else "b"
+    """)
+    assert not analysis.is_native(_expr("t < t"))
+    assert analysis.is_native(_expr("t == t"))
+    assert analysis.is_native(_expr("n < i <= len(t)"))
+    assert analysis.is_native(_expr("s > 'a'"))
+    assert not analysis.is_native(_expr("n < t"))
+
+
+def test_is_native_names_global():
+    analysis = _analyze("""
+    def f():
+        global a
+        a = 1
+    b = 1
+    """)
+    assert not analysis.is_native(_expr("a"))
+    # Only local variables of the function are native, others are globals which might not be.
+    assert not _analyze("a = 1", local_names=()).is_native(_expr("a"))
+
+
+def test_is_native_builtin_shadowed():
+    assert not _analyze("pass", outer_names={"len"}).is_native(_expr("len(x)"))
+    assert not _analyze("len = f").is_native(_expr("len(x)"))
+    assert not _analyze("import len").is_native(_expr("len(x)"))
+    assert not _analyze("def len(): pass").is_native(_expr("len(x)"))
+    assert _analyze("pass", outer_names={"other"}).is_native(_expr("len(x)"))
+
+
+def test_is_native_int_iterable():
+    assert _analyze("pass").is_native_int_iterable(_expr("range(3)"))
+    assert not _analyze("pass").is_native_int_iterable(_expr("enumerate(x)"))
+    assert not _analyze("pass", outer_names={"range"}).is_native_int_iterable(_expr("range(3)"))
+    analysis = _analyze("for i in range(3):\n    pass", outer_names={"range"})
+    assert not analysis.is_native(_expr("i"))
@@ -12,12 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import ast
-from typing import Dict, Union
+import types
+from typing import Dict, Set, Union
 
 import gast
 
-
-ANNOTATIONS = ["original_lineno"]
+ANNOTATIONS = ["original_lineno", "original_position"]
 
 
 def walk_ast(node: Union[ast.AST, gast.AST]):
@@ -40,7 +40,9 @@ def gast_to_ast(gast_root: gast.AST):
     return ast_root
 
 
-def construct_line_map(annotated_ast: gast.AST, source_code: str) -> Dict[int, int]:
+def construct_line_map(
+    annotated_ast: Union[ast.AST, gast.AST], source_code: str, ast_module: types.ModuleType = gast
+) -> Dict[int, int]:
     """Construct a map from the line number in generated code to the original line of the code.
 
     Args:
@@ -48,12 +50,13 @@ def construct_line_map(annotated_ast: gast.AST, source_code: str) -> Dict[int, i
             each of its nodes that correspond to the location of the original code that generated
             this node.
         source_code: The source code for the given `annotated_ast`.
+        ast_module: The module of the nodes of `annotated_ast`, either `gast` or `ast`.
 
     Returns:
         A map from the line number in the generated code to the line number in the original code
             that generated the code.
     """
-    new_ast = gast.parse(source_code)
+    new_ast = ast_module.parse(source_code)
     line_map: Dict[int, int] = {}
 
     for old, new in zip(walk_ast(annotated_ast), walk_ast(new_ast)):
@@ -67,3 +70,47 @@ def construct_line_map(annotated_ast: gast.AST, source_code: str) -> Dict[int, i
                     ), "Inconsistent line mapping, this should not occur. Please file a bug."
                 line_map[new.lineno] = old.original_lineno
     return line_map
+
+
+def set_original_locations(annotated_ast: ast.AST, lineno_offset: int, col_offset: int) -> Set[int]:
+    """Set the locations of the nodes of generated code to the locations of the original code.
+
+    Nodes which have an `original_position` attribute, a tuple of `lineno`, `col_offset`,
+    `end_lineno` and `end_col_offset`, are nodes of the original code, and are given this
+    position. Other nodes are generated: they are given the line of their `original_lineno`
+    attribute, or if they do not have one, the line of their parent, and no column information.
+
+    Args:
+        annotated_ast: The ast of generated code, annotated as described above.
+        lineno_offset: The amount to add to the line numbers of the annotations, i.e. the line
+            number in the original file of the first line of the code that was parsed, minus one.
+        col_offset: The amount to add to the column offsets of the annotations, i.e. the
+            indentation that was removed from the code that was parsed.
+
+    Returns:
+        The set of line numbers given to nodes of the generated code.
+    """
+    linenos: Set[int] = set()
+    stack = [(annotated_ast, lineno_offset + 1)]
+    while stack:
+        node, parent_lineno = stack.pop()
+        if "lineno" in node._attributes:
+            original_position = getattr(node, "original_position", None)
+            if original_position is not None:
+                lineno, col, end_lineno, end_col = original_position
+                node.lineno = lineno + lineno_offset
+                node.col_offset = col + col_offset
+                node.end_lineno = None if end_lineno is None else end_lineno + lineno_offset
+                node.end_col_offset = None if end_col is None else end_col + col_offset
+            else:
+                original_lineno = getattr(node, "original_lineno", None)
+                node.lineno = (
+                    parent_lineno if original_lineno is None else original_lineno + lineno_offset
+                )
+                node.col_offset = 0
+                node.end_lineno = node.lineno
+                node.end_col_offset = None
+            parent_lineno = node.lineno
+            linenos.add(node.lineno)
+        stack.extend((child, parent_lineno) for child in ast.iter_child_nodes(node))
+    return linenos
@@ -123,6 +123,16 @@ def test_construct_line_map():
     assert set(line_map.keys()) == transformer.original_linenos
 
 
+def test_construct_line_map_ast():
+    source = "a = 1\nif a:\n    b = 2\n"
+    nodes = ast.parse(source)
+    for node in ast.walk(nodes):
+        if hasattr(node, "lineno"):
+            node.original_lineno = node.lineno + 10
+
+    assert _ast.construct_line_map(nodes, source, ast) == {1: 11, 2: 12, 3: 13}
+
+
 def test_construct_line_map_inconsistent_linenos():
     code = """
     a = 1
@@ -134,3 +144,46 @@ def test_construct_line_map_inconsistent_linenos():
 
     with pytest.raises(AssertionError, match="Inconsistent"):
         _ast.construct_line_map(gast_nodes, source)
+
+
+def test_set_original_locations():
+    original = ast.parse("x = 1\ny = 2")
+    x_assign = original.body[0]
+    for node in ast.walk(x_assign):
+        if "lineno" not in node._attributes:
+            continue
+        node.original_position = (
+            node.lineno,
+            node.col_offset,
+            node.end_lineno,
+            node.end_col_offset,
+        )
+    # A generated statement standing in for the second line, with a generated child.
+    generated = ast.parse("if True:\n    pass").body[0]
+    generated.original_lineno = 2
+    original.body = [x_assign, generated]
+
+    linenos = _ast.set_original_locations(original, lineno_offset=10, col_offset=4)
+
+    assert linenos == {11, 12}
+    assert (x_assign.lineno, x_assign.col_offset) == (11, 4)
+    assert (x_assign.value.lineno, x_assign.value.col_offset) == (11, 8)
+    assert (x_assign.value.end_lineno, x_assign.value.end_col_offset) == (11, 9)
+    for node in (generated, generated.test, generated.body[0]):
+        assert (node.lineno, node.end_lineno) == (12, 12)
+        assert node.col_offset == 0
+        assert node.end_col_offset is None
+    # The result compiles.
+    compile(original, "<test>", "exec")
+
+
+def test_set_original_locations_inherits_from_parent():
+    tree = ast.parse("def f():\n    return 1")
+    tree.body[0].original_lineno = 3
+
+    linenos = _ast.set_original_locations(tree, lineno_offset=0, col_offset=0)
+
+    assert linenos == {3}
+    for node in ast.walk(tree):
+        if "lineno" in node._attributes:
+            assert node.lineno == 3
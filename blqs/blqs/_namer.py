@@ -11,22 +11,26 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Optional, Sequence
+from typing import Container, Dict
 
 
 class Namer:
     """Produces new names for symbols that do not conflict with other symbols."""
 
-    def __init__(self, used_names: Optional[Sequence[str]] = None):
+    def __init__(self, *used_names: Container[str]):
         """Initialize the Namer.
 
         The namer is stateful, it records all new names that were created by the namer.
 
         Args:
-            used_names: A set of names that are already used. The namer will not produce
-                names from this list.
+            *used_names: Containers of names that are already used, for example the globals
+                dictionary of a function. The namer will not produce names in these. They are
+                not copied, names are looked up in them as they are needed.
         """
-        self._used_names = set(used_names or {})
+        self._used_names = used_names
+        # For each base name that has been used by the namer, the next number to try as the
+        # postfix of a name based upon it.
+        self._counters: Dict[str, int] = {}
 
     def new_name(self, name_base: str) -> str:
         """Create a new name which does not conflict with already created, or used names.
@@ -40,6 +44,9 @@ class Namer:
         If the name ends in `_<number>` then this will produce the same, but for the string
         with this number removed.
 
+        The namer keeps the next number to try for each base name, so creating a new name takes
+        constant time, apart from skipping over numbers of names in `used_names`.
+
         Args:
             name_base: The name to try to base this new name upon.
 
@@ -51,10 +58,20 @@ class Namer:
         # If ends in a `_<digit>``, we will try to replace with other integer.
         if name_parts[-1].isdigit():
             new_name = "_".join(name_parts[:-1])
-        n = 0
-        final_name = new_name
-        while final_name in self._used_names:
-            final_name = f"{new_name}_{n}"
+        # Names created by the namer never conflict with each other: a name is either its base
+        # name or the base name followed by `_<number>`, and base names do not end in a number.
+        n = self._counters.get(new_name)
+        if n is None:
+            self._counters[new_name] = 0
+            if not self._is_used(new_name):
+                return new_name
+            n = 0
+        final_name = f"{new_name}_{n}"
+        while self._is_used(final_name):
             n += 1
-        self._used_names.add(final_name)
+            final_name = f"{new_name}_{n}"
+        self._counters[new_name] = n + 1
         return final_name
+
+    def _is_used(self, name: str) -> bool:
+        return any(name in used_names for used_names in self._used_names)
@@ -77,3 +77,28 @@ def test_namer_used_with_underscores_digits_match():
     namer = _namer.Namer(["a_0"])
     assert namer.new_name("a_0") == "a"
     assert namer.new_name("a_0") == "a_1"
+
+
+def test_namer_multiple_used_containers():
+    namer = _namer.Namer({"a": 1}, ("b", "a_0"))
+    assert namer.new_name("a") == "a_1"
+    assert namer.new_name("b") == "b_0"
+    assert namer.new_name("c") == "c"
+
+
+def test_namer_used_not_copied():
+    used = {"a": 1}
+    namer = _namer.Namer(used)
+    used["b"] = 2
+    used["a_1"] = 3
+    assert namer.new_name("b") == "b_0"
+    assert namer.new_name("a") == "a_0"
+    assert namer.new_name("a") == "a_2"
+
+
+def test_namer_many_names():
+    namer = _namer.Namer([f"a_{i}" for i in range(0, 100, 2)])
+    names = [namer.new_name("a") for _ in range(100)]
+    assert names[:4] == ["a", "a_1", "a_3", "a_5"]
+    assert names[-1] == "a_148"
+    assert len(set(names)) == 100
@@ -0,0 +1,143 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers called by the code generated by `blqs.build`.
+
+Each captured statement is transformed into a call of one of these helpers, which decides whether
+the statement is captured, and code which runs the statement's body in the block the helper
+returns. This keeps the generated code small, and the work done per statement in one place.
+"""
+
+from typing import Any, Iterable, Sequence, Tuple, Union
+
+from blqs import (
+    assignment,
+    block,
+    block_stack,
+    conditional,
+    delete as delete_lib,
+    loops,
+    program,
+    protocols,
+)
+
+NATIVE_TYPES = protocols._NATIVE_TYPES
+
+
+class _NullContext:
+    """A reusable context manager which does nothing, used in place of a block not captured."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+NULL_CONTEXT = _NullContext()
+
+_Context = Union[block.Block, _NullContext]
+
+
+def new_block() -> block.Block:
+    """Returns the block the statements of a builder are added to.
+
+    This is a new `blqs.Program` if the builder is not called from within another block, and a new
+    `blqs.Block` otherwise, which stores its instructions in columns if the block it is called from
+    does.
+    """
+    current_block = block_stack.get_current_block()
+    if current_block is None:
+        return program.Program()
+    return block.Block(columnar=current_block.is_columnar())
+
+
+def assign(assign_names: Sequence[str], value: Any) -> Any:
+    """Captures an assignment of `value` if it is readable.
+
+    Returns:
+        The values assigned to the targets of the assignment. These are the readable targets of
+        the value, or the value itself if it has none.
+    """
+    if value.__class__ in NATIVE_TYPES:
+        return value
+    targets = protocols.readable_targets(value)
+    if len(targets) == 1:
+        targets = targets[0]
+    if targets:
+        assignment.Assign(assign_names, value)
+        return targets
+    return value
+
+
+def delete(delete_names: Sequence[str], values: Sequence[Any]):
+    """Captures the deletion of those of `values` which are deletable.
+
+    Values which are not deletable are left as they are.
+    """
+    deletable_names = tuple(
+        name for value, name in zip(values, delete_names) if protocols.is_deletable(value)
+    )
+    if deletable_names:
+        delete_lib.Delete(deletable_names)
+
+
+def if_(condition: Any) -> Tuple[bool, bool, _Context, _Context]:
+    """Captures an if statement on `condition` if it is readable.
+
+    Returns:
+        A tuple of whether to run the if branch, whether to run the else branch, and the contexts
+        to run each of them in. Both branches are run, in the blocks of a new `blqs.If`, if the
+        condition is readable, and only the branch the condition selects otherwise.
+    """
+    if condition.__class__ not in NATIVE_TYPES and protocols.is_readable(condition):
+        statement = conditional.If(condition)
+        return True, True, statement.if_block(), statement.else_block()
+    if condition:
+        return True, False, NULL_CONTEXT, NULL_CONTEXT
+    return False, True, NULL_CONTEXT, NULL_CONTEXT
+
+
+def for_(iterable: Any) -> Tuple[Iterable, _Context, _Context]:
+    """Captures a for loop over `iterable` if it is iterable.
+
+    Returns:
+        A tuple of what to loop over, and the contexts to run the loop body and else branch in. If
+        the iterable is captured, the loop is over a single value, the loop variables of a new
+        `blqs.For`, and the contexts are its blocks. Otherwise the loop is over the iterable.
+    """
+    if iterable.__class__ not in NATIVE_TYPES and protocols.is_iterable(iterable):
+        statement = loops.For(iterable)
+        loop_vars = protocols.loop_vars(iterable)
+        return (
+            (loop_vars if len(loop_vars) > 1 else loop_vars[0],),
+            statement.loop_block(),
+            statement.else_block(),
+        )
+    return iterable, NULL_CONTEXT, NULL_CONTEXT
+
+
+def while_(condition: Any) -> Tuple[bool, _Context, _Context]:
+    """Captures a while loop on `condition` if it is readable.
+
+    Returns:
+        A tuple of whether the loop is captured, and the contexts to run the loop body and else
+        branch in. A captured loop runs its body and else branch once each, in the blocks of a new
+        `blqs.While`.
+    """
+    if condition.__class__ not in NATIVE_TYPES and protocols.is_readable(condition):
+        statement = loops.While(condition)
+        return True, statement.loop_block(), statement.else_block()
+    return False, NULL_CONTEXT, NULL_CONTEXT
@@ -0,0 +1,121 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import blqs
+from blqs import _runtime
+
+
+def test_null_context():
+    with _runtime.NULL_CONTEXT as value:
+        assert value is None
+    assert blqs.get_current_block() is None
+
+
+def test_new_block():
+    program = _runtime.new_block()
+    assert isinstance(program, blqs.Program)
+    with program:
+        # Even when the current block is empty.
+        block = _runtime.new_block()
+        assert type(block) == blqs.Block
+
+
+def test_assign():
+    with blqs.Program() as program:
+        assert _runtime.assign(("a",), blqs.Register("a")) == blqs.Register("a")
+        assert _runtime.assign(("b",), 1) == 1
+        assert _runtime.assign(("c",), "c") == "c"
+    assert program == blqs.Program.of(blqs.Assign(("a",), blqs.Register("a")))
+
+
+def test_assign_multiple_targets():
+    class MultipleTargets:
+        def _is_readable_(self):
+            return True
+
+        def _readable_targets_(self):
+            return (blqs.Register("a"), blqs.Register("b"))
+
+    value = MultipleTargets()
+    with blqs.Program() as program:
+        assert _runtime.assign(("a", "b"), value) == (blqs.Register("a"), blqs.Register("b"))
+    assert program == blqs.Program.of(blqs.Assign(("a", "b"), value))
+
+
+def test_delete():
+    class Deletable:
+        def _is_deletable_(self):
+            return True
+
+    with blqs.Program() as program:
+        _runtime.delete(("a", "b", "c"), (Deletable(), 1, Deletable()))
+        _runtime.delete(("d",), (1,))
+    assert program == blqs.Program.of(blqs.Delete(("a", "c")))
+
+
+def test_if_readable():
+    with blqs.Program() as program:
+        enter_if, enter_else, if_block, else_block = _runtime.if_(blqs.Register("a"))
+    assert enter_if and enter_else
+    (statement,) = program
+    assert statement == blqs.If(blqs.Register("a"))
+    assert if_block is statement.if_block()
+    assert else_block is statement.else_block()
+
+
+def test_if_native():
+    with blqs.Program() as program:
+        assert _runtime.if_(1) == (True, False, _runtime.NULL_CONTEXT, _runtime.NULL_CONTEXT)
+        assert _runtime.if_([]) == (False, True, _runtime.NULL_CONTEXT, _runtime.NULL_CONTEXT)
+    assert program == blqs.Program()
+
+
+def test_for_iterable():
+    iterable = blqs.Iterable("range(5)", blqs.Register("a"))
+    with blqs.Program() as program:
+        loop_vars, loop_block, else_block = _runtime.for_(iterable)
+    assert loop_vars == (blqs.Register("a"),)
+    (statement,) = program
+    assert statement == blqs.For(iterable)
+    assert loop_block is statement.loop_block()
+    assert else_block is statement.else_block()
+
+
+def test_for_iterable_multiple_loop_vars():
+    iterable = blqs.Iterable("range(5)", blqs.Register("a"), blqs.Register("b"))
+    with blqs.Program():
+        loop_vars, _, _ = _runtime.for_(iterable)
+    assert loop_vars == ((blqs.Register("a"), blqs.Register("b")),)
+
+
+def test_for_native():
+    values = [1, 2]
+    with blqs.Program() as program:
+        assert _runtime.for_(values) == (values, _runtime.NULL_CONTEXT, _runtime.NULL_CONTEXT)
+    assert program == blqs.Program()
+
+
+def test_while_readable():
+    with blqs.Program() as program:
+        is_readable, loop_block, else_block = _runtime.while_(blqs.Register("a"))
+    assert is_readable
+    (statement,) = program
+    assert statement == blqs.While(blqs.Register("a"))
+    assert loop_block is statement.loop_block()
+    assert else_block is statement.else_block()
+
+
+def test_while_native():
+    with blqs.Program() as program:
+        assert _runtime.while_(True) == (False, _runtime.NULL_CONTEXT, _runtime.NULL_CONTEXT)
+    assert program == blqs.Program()
@@ -11,11 +11,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""A thread local stack."""
+"""Thread local and context local stacks."""
 
+import contextvars
 import threading
 
-from typing import Generic, List, Optional, TypeVar
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
 
 T = TypeVar("T")
 
@@ -24,6 +25,9 @@ class ThreadLocalStack(threading.local, Generic[T]):
     def __init__(self) -> None:
         self._stack: List[T] = []
 
+    def __len__(self) -> int:
+        return len(self._stack)
+
     def peek(self) -> Optional[T]:
         return self._stack[-1] if self._stack else None
 
@@ -34,3 +38,39 @@ class ThreadLocalStack(threading.local, Generic[T]):
         if len(self._stack) != 0:
             return self._stack.pop()
         raise IndexError("Pop from an empty stack.")
+
+
+class ContextLocalStack(Generic[T]):
+    """A stack which is local to the current `contextvars.Context`.
+
+    Unlike `ThreadLocalStack`, each asyncio task sees its own stack, starting as a copy of the
+    stack of the code that created the task. The stack is held in a `contextvars.ContextVar` as a
+    linked list of `(value, rest)` pairs, so that copying it is free.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._var: contextvars.ContextVar[Optional[Tuple[T, Any]]] = contextvars.ContextVar(
+            name, default=None
+        )
+
+    def __len__(self) -> int:
+        length = 0
+        node = self._var.get()
+        while node is not None:
+            length += 1
+            node = node[1]
+        return length
+
+    def peek(self) -> Optional[T]:
+        node = self._var.get()
+        return node[0] if node is not None else None
+
+    def push(self, value: T):
+        self._var.set((value, self._var.get()))
+
+    def pop(self) -> T:
+        node = self._var.get()
+        if node is not None:
+            self._var.set(node[1])
+            return node[0]
+        raise IndexError("Pop from an empty stack.")
@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+import contextvars
 import threading
 
 import pytest
@@ -18,13 +20,18 @@ import pytest
 from blqs import _stack
 
 
-def test_stack():
-    stack = _stack.ThreadLocalStack()
+@pytest.mark.parametrize(
+    "stack", [_stack.ThreadLocalStack(), _stack.ContextLocalStack("test_stack")]
+)
+def test_stack(stack):
+    assert stack.peek() is None
     stack.push(0)
     stack.push("1")
+    assert len(stack) == 2
     assert stack.peek() == "1"
     assert stack.pop() == "1"
     assert stack.pop() == 0
+    assert len(stack) == 0
     with pytest.raises(IndexError, match="empty stack"):
         stack.pop()
 
@@ -44,3 +51,45 @@ def test_stack_thread_local():
     t1.join()
 
     assert stack.peek() == 0
+
+
+_CONTEXT_STACK: _stack.ContextLocalStack[object] = _stack.ContextLocalStack("test_context_stack")
+
+
+def test_stack_context_local():
+    stack = _CONTEXT_STACK
+    stack.push(0)
+
+    def f():
+        assert stack.peek() == 0
+        stack.push(1)
+        assert stack.peek() == 1
+
+    contextvars.copy_context().run(f)
+    assert stack.peek() == 0
+    assert len(stack) == 1
+
+    t1 = threading.Thread(target=lambda: stack.push(2))
+    t1.start()
+    t1.join()
+    assert stack.pop() == 0
+
+
+def test_stack_context_local_asyncio_tasks():
+    stack = _CONTEXT_STACK
+
+    async def task(value):
+        stack.push(value)
+        await asyncio.sleep(0)
+        assert stack.peek() == value
+        assert len(stack) == 2
+        return stack.pop()
+
+    async def main():
+        stack.push("main")
+        values = await asyncio.gather(*(task(i) for i in range(10)))
+        assert stack.pop() == "main"
+        return values
+
+    assert asyncio.run(main()) == list(range(10))
+    assert len(stack) == 0
@@ -11,41 +11,112 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
 import textwrap
+import types
 
-from typing import Iterable
+from typing import Any, Dict, Iterable, List
 
 import gast
 
 
-class ReplacementTransformer(gast.NodeTransformer):
-    def __init__(self, **replacements):
-        self.replacements = replacements
+class Template:
+    """A template of code, parsed once, that can be instantiated many times.
 
-    def visit_Name(self, node):
-        if node.id in self.replacements:
-            replacement = self.replacements[node.id]
-            if isinstance(replacement, str):
-                node.id = replacement
+    Instantiating the template clones its nodes, substituting the replacements for the
+    placeholders, which is much cheaper than parsing the template again. The rules of the
+    substitution are described in `replace`.
+    """
+
+    def __init__(self, template: str, ast_module: types.ModuleType = gast):
+        """Parses the template.
+
+        Args:
+            template: A string containing python code. The code can have placeholder names
+                that will be replaced when the template is instantiated.
+            ast_module: The module used to parse the template, either `gast` or `ast`.
+        """
+        self._nodes = ast_module.parse(textwrap.dedent(template)).body
+        self._name_type = ast_module.Name
+        self._expr_type = ast_module.Expr
+        self._function_def_type = ast_module.FunctionDef
+        self._alias_type = ast_module.alias
+
+    def instantiate(self, **replacements) -> List:
+        """Returns new nodes for the template, with the placeholders replaced.
+
+        Args:
+            **replacements: Keyword arguments from the placeholder name in the code to the node,
+                a sequence of nodes, or a string, as described in `replace`.
+
+        Returns:
+            A list of the nodes representing the template with replaced nodes.
+        """
+        return self._clone_list(self._nodes, replacements)
+
+    def _clone_list(self, values: List, replacements: Dict[str, Any]) -> List:
+        new_values: List = []
+        for value in values:
+            if not isinstance(value, gast.AST):
+                new_values.append(value)
+                continue
+            new_value = self._clone(value, replacements)
+            if isinstance(new_value, gast.AST):
+                new_values.append(new_value)
             else:
+                new_values.extend(new_value)
+        return new_values
+
+    def _clone(self, node: gast.AST, replacements: Dict[str, Any]) -> Any:
+        node_type = type(node)
+        if node_type is self._name_type and node.id in replacements:
+            replacement = replacements[node.id]
+            if not isinstance(replacement, str):
                 return replacement
-        return node
+        elif node_type is self._expr_type:
+            # If the expression is replaced, return it outside of an expression.
+            value = node.value
+            if type(value) is self._name_type and value.id in replacements:
+                replacement = replacements[value.id]
+                if not isinstance(replacement, str):
+                    return replacement
+
+        new_node = gast.AST.__new__(node_type)
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                value = self._clone_list(value, replacements)
+            elif isinstance(value, gast.AST):
+                value = self._clone(value, replacements)
+            setattr(new_node, field, value)
+        for attribute in node._attributes:
+            if hasattr(node, attribute):
+                setattr(new_node, attribute, getattr(node, attribute))
 
-    def visit_FunctionDef(self, node):
-        node = self.generic_visit(node)
-        if node.name in self.replacements:
-            node.name = self.replacements[node.name]
-        return node
+        if node_type is self._name_type and node.id in replacements:
+            new_node.id = replacements[node.id]
+        elif node_type is self._function_def_type and node.name in replacements:
+            new_node.name = replacements[node.name]
+        elif node_type is self._alias_type and node.asname in replacements:
+            new_node.asname = replacements[node.asname]
+        return new_node
 
-    def visit_Expr(self, node):
-        # If we changed things, return it outside of an expression.
-        visited_node = self.visit(node.value)
-        if visited_node is node.value:
-            return node
-        return visited_node
 
+@functools.lru_cache(maxsize=None)
+def get_template(template: str, ast_module: types.ModuleType = gast) -> Template:
+    """Returns the parsed template for the template code, parsing it only on the first call.
 
-def replace(template: str, **replacements) -> Iterable:
+    Args:
+        template: A string containing python code with placeholder names.
+        ast_module: The module used to parse the template, either `gast` or `ast`.
+
+    Returns:
+        The parsed template.
+    """
+    return Template(template, ast_module)
+
+
+def replace(template: str, ast_module: types.ModuleType = gast, **replacements) -> Iterable:
     """A simple templating system.
 
     Rules:
@@ -55,11 +126,17 @@ def replace(template: str, **replacements) -> Iterable:
 
         * Replaces the name of a `FunctionDef` with a possible string replacement.
 
+        * Replaces the name an import is bound to by `as` with a possible string replacement.
+
         * Replaces an `Expr` wholesale with the supplied replacement nodes.
 
+    The template is only parsed the first time it is used, see `get_template`.
+
     Args:
         template: A string containing python code. The code can have placeholder names
             that will be replaced by this call.
+        ast_module: The module used to parse the template, either `gast` or `ast`. The
+            replacement nodes should be nodes of this module.
         **replacements: Keyword arguments from the placeholder name in the code to the `gast.Node`,
             a sequence of the `gast.Node`s representing the code that should be replaced,
             or a string, which is used to replace an `id` or `name` as described above.
@@ -67,7 +144,4 @@ def replace(template: str, **replacements) -> Iterable:
     Returns:
         A list of the `gast.Node`s representing the template with replaced nodes.
     """
-    nodes = gast.parse(textwrap.dedent(template))
-    transformer = ReplacementTransformer(**replacements)
-    replaced_nodes = transformer.visit(nodes)
-    return replaced_nodes.body
+    return get_template(template, ast_module).instantiate(**replacements)
@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import ast
+
 import gast
 import astunparse
 
@@ -136,3 +138,35 @@ def test_replace_fn():
     """
     nodes = _template.replace(fn_code, g="new_g")
     assert astunparse.unparse(nodes).strip() == "def f():\n    pass"
+
+
+def test_replace_import_alias():
+    nodes = _template.replace("from a import b as c", c="d")
+    assert astunparse.unparse(nodes).strip() == "from a import b as d"
+
+    nodes = _template.replace("import a.b as c", ast, c="d", a="e")
+    assert astunparse.unparse(nodes).strip() == "import a.b as d"
+
+
+def test_replace_ast_module():
+    nodes = _template.replace("a = c", ast, a="b", c=ast.Constant(1))
+    assert all(isinstance(node, ast.AST) for node in nodes)
+    assert astunparse.unparse(nodes).strip() == "b = 1"
+
+
+def test_get_template_parses_once():
+    template = _template.get_template("a = b")
+    assert _template.get_template("a = b") is template
+    assert _template.get_template("a = b", ast) is not template
+
+
+def test_template_instantiate_clones():
+    template = _template.Template("if a:\n    b = c")
+    first = template.instantiate(a="x", b="y")
+    second = template.instantiate(a="z")
+    assert astunparse.unparse(first).strip() == "if x:\n    y = c"
+    assert astunparse.unparse(second).strip() == "if z:\n    b = c"
+    assert astunparse.unparse(template.instantiate()).strip() == "if a:\n    b = c"
+
+    first_nodes = set(map(id, gast.walk(first[0])))
+    assert not first_nodes & set(map(id, gast.walk(second[0])))
@@ -14,7 +14,7 @@
 from __future__ import annotations
 from typing import Sequence, TYPE_CHECKING
 
-from blqs import statement
+from blqs import serialization, statement
 
 
 if TYPE_CHECKING:
@@ -28,6 +28,8 @@ class Assign(statement.Statement):
     to which these names have been assigned.
     """
 
+    __slots__ = ("_assign_names", "_value")
+
     def __init__(self, assign_names: Sequence[str], value: blqs.SupportsIsReadable):
         super().__init__()
         self._assign_names = assign_names
@@ -49,3 +51,14 @@ class Assign(statement.Statement):
 
     def __str__(self):
         return f"{', '.join(self._assign_names)} = {self._value}"
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is Assign:
+            return serialization.loads_statement, (serialization.dumps_statement(self),)
+        return super().__reduce_ex__(protocol)
+
+    def __copy__(self):
+        return statement.copy_statement(self)
+
+    def __deepcopy__(self, memo):
+        return statement.copy_statement(self, memo)
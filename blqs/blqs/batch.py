@@ -0,0 +1,151 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Building a builder over many arguments in parallel."""
+
+import collections
+import concurrent.futures
+import itertools
+import os
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Sequence, Set, Tuple, Union
+
+# The executors `build_many` can create, keyed by name.
+_EXECUTORS = {
+    "process": concurrent.futures.ProcessPoolExecutor,
+    "thread": concurrent.futures.ThreadPoolExecutor,
+}
+
+# The number of chunks submitted to the executor ahead of the results consumed, per CPU. This
+# keeps the workers busy, while bounding the memory held by results not yet consumed.
+_PENDING_CHUNKS_PER_CPU = 4
+
+
+def build_many(
+    func: Callable,
+    args_iterable: Iterable[Sequence[Any]],
+    *,
+    executor: Union[str, concurrent.futures.Executor] = "process",
+    chunksize: int = 1,
+    ordered: bool = True,
+) -> Iterator[Any]:
+    """Calls a builder on each of many arguments in parallel, yielding the programs built.
+
+    For example, to build a program for each of a sweep of angles and layouts:
+        ```
+        @blqs.build
+        def my_func(angle, layout):
+            my_code
+
+        for program in blqs.build_many(my_func, itertools.product(angles, layouts)):
+            ...
+        ```
+
+    The arguments are split into chunks of `chunksize` arguments, which are built by the workers
+    of the executor. With the default process pool, the builder is compiled once in each worker
+    process, and building scales with the number of cores rather than being limited by the global
+    interpreter lock. The programs built are sent back in the compact format of `blqs.dumps`,
+    which is how programs are pickled. The arguments are consumed lazily, and only a bounded
+    number of chunks are built ahead of the programs consumed.
+
+    Args:
+        func: The builder, such as a function decorated with `blqs.build`. For a process pool this
+            must be picklable, for example a function decorated at the top level of a module.
+        args_iterable: The arguments to call the builder on. Each element is a sequence of the
+            positional arguments of one call.
+        executor: Either "process" for a new `concurrent.futures.ProcessPoolExecutor`, "thread"
+            for a new `concurrent.futures.ThreadPoolExecutor`, or an executor to use. An executor
+            created here is shut down when the results have been consumed, or the iterator
+            returned is closed. An executor supplied is left running.
+        chunksize: The number of arguments each task submitted to the executor builds. Larger
+            chunks reduce the overhead of each task, for builders which are fast to call.
+        ordered: If True, the programs are yielded in the order of their arguments. If False,
+            each program is yielded as a tuple of the index of its arguments and the program, as
+            soon as the chunk it is in has been built.
+
+    Returns:
+        An iterator over the programs built, or over the tuples of their index and program if
+        `ordered` is False.
+
+    Raises:
+        ValueError: If the executor is an unknown name, or the chunksize is not positive.
+        Exception: The first exception raised by a call of the builder is raised when the program
+            of that call would have been yielded.
+    """
+    if isinstance(executor, str) and executor not in _EXECUTORS:
+        raise ValueError(f"Unknown executor {executor!r}, expected one of {sorted(_EXECUTORS)}.")
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be positive, was {chunksize}.")
+    return _build_many(func, args_iterable, executor, chunksize, ordered)
+
+
+def _build_many(
+    func: Callable,
+    args_iterable: Iterable[Sequence[Any]],
+    executor: Union[str, concurrent.futures.Executor],
+    chunksize: int,
+    ordered: bool,
+) -> Iterator[Any]:
+    pool = _EXECUTORS[executor]() if isinstance(executor, str) else executor
+    max_pending = _PENDING_CHUNKS_PER_CPU * (os.cpu_count() or 1)
+    chunks = _chunks(args_iterable, chunksize)
+    futures: Union[Deque[concurrent.futures.Future], Set[concurrent.futures.Future]]
+    try:
+        if ordered:
+            futures = collections.deque()
+            for _, chunk in chunks:
+                futures.append(pool.submit(_build_chunk, func, chunk))
+                if len(futures) >= max_pending:
+                    yield from futures.popleft().result()
+            while futures:
+                yield from futures.popleft().result()
+        else:
+            futures = set()
+            for start, chunk in chunks:
+                futures.add(pool.submit(_build_indexed_chunk, func, start, chunk))
+                if len(futures) >= max_pending:
+                    done, futures = concurrent.futures.wait(
+                        futures, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        yield from future.result()
+            for future in concurrent.futures.as_completed(futures):
+                yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        if isinstance(executor, str):
+            pool.shutdown(wait=True)
+
+
+def _chunks(
+    args_iterable: Iterable[Sequence[Any]], chunksize: int
+) -> Iterator[Tuple[int, List[Sequence[Any]]]]:
+    """Yields the chunks of the arguments, with the index of the first arguments in each chunk."""
+    args_iterator = iter(args_iterable)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(args_iterator, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _build_chunk(func: Callable, chunk: List[Sequence[Any]]) -> List[Any]:
+    return [func(*args) for args in chunk]
+
+
+def _build_indexed_chunk(
+    func: Callable, start: int, chunk: List[Sequence[Any]]
+) -> List[Tuple[int, Any]]:
+    return [(start + i, func(*args)) for i, args in enumerate(chunk)]
@@ -0,0 +1,101 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import concurrent.futures
+import itertools
+
+import pytest
+
+import blqs
+
+
+@blqs.build
+def sweep(angle, qubit):
+    blqs.Op(f"rx({angle})")(qubit)
+    if blqs.Register("a"):
+        blqs.Op("H")(qubit)
+
+
+@blqs.build
+def fail(x):
+    if x == 3:
+        raise ValueError("x was 3")
+    blqs.Op("H")(x)
+
+
+_ARGS = list(itertools.product(range(5), range(3)))
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+@pytest.mark.parametrize("chunksize", [1, 4, 100])
+def test_build_many(executor, chunksize):
+    programs = list(blqs.build_many(sweep, _ARGS, executor=executor, chunksize=chunksize))
+    assert programs == [sweep(*args) for args in _ARGS]
+    assert all(type(p) is blqs.Program for p in programs)
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_build_many_unordered(executor):
+    results = list(blqs.build_many(sweep, iter(_ARGS), executor=executor, ordered=False))
+    assert sorted(index for index, _ in results) == list(range(len(_ARGS)))
+    for index, program in results:
+        assert program == sweep(*_ARGS[index])
+
+
+def test_build_many_many_chunks():
+    args = [(i, i) for i in range(500)]
+    assert list(blqs.build_many(sweep, args, executor="thread", chunksize=3)) == [
+        sweep(*a) for a in args
+    ]
+    results = blqs.build_many(sweep, args, executor="thread", chunksize=3, ordered=False)
+    assert sorted(results) == list(enumerate(sweep(*a) for a in args))
+    # Closing the iterator early cancels the chunks not yet built, and shuts down the executor.
+    programs = blqs.build_many(sweep, args, executor="thread")
+    assert next(programs) == sweep(*args[0])
+    programs.close()
+
+
+def test_build_many_executor():
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        assert list(blqs.build_many(sweep, _ARGS, executor=executor)) == [
+            sweep(*args) for args in _ARGS
+        ]
+        # The executor is left running.
+        assert executor.submit(sum, [1, 2]).result() == 3
+
+
+def test_build_many_empty():
+    assert list(blqs.build_many(sweep, [], executor="thread")) == []
+    assert list(blqs.build_many(sweep, [], executor="thread", ordered=False)) == []
+
+
+def test_build_many_in_block():
+    with blqs.Block() as block:
+        programs = list(blqs.build_many(sweep, _ARGS[:2], executor="thread"))
+    assert not block
+    assert programs == [sweep(*args) for args in _ARGS[:2]]
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_build_many_raises(executor):
+    programs = blqs.build_many(fail, [(i,) for i in range(6)], executor=executor)
+    assert next(programs) == blqs.Program.of(blqs.Op("H")(0))
+    with pytest.raises(ValueError, match="x was 3"):
+        list(programs)
+
+
+def test_build_many_invalid():
+    with pytest.raises(ValueError, match="Unknown executor 'gpu'"):
+        blqs.build_many(sweep, _ARGS, executor="gpu")
+    with pytest.raises(ValueError, match="chunksize must be positive"):
+        blqs.build_many(sweep, _ARGS, chunksize=0)
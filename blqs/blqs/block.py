@@ -13,10 +13,11 @@
 # limitations under the License.
 from __future__ import annotations
 
-import textwrap
-from typing import Iterable, Iterator, List, Optional, TYPE_CHECKING, Tuple
+import collections.abc
+import itertools
+from typing import Iterable, Iterator, Optional, overload, Sequence, TYPE_CHECKING, Tuple, Union
 
-from blqs import block_stack, statement
+from blqs import block_stack, columnar as columnar_lib, printer, serialization, statement
 
 if TYPE_CHECKING:
     import blqs  # coverage: ignore
@@ -71,10 +72,19 @@ class Block(statement.Statement):
     `Block`s have a boolean value of `False` if they contain no statements, otherwise
     they are `True`.
 
+    `Block`s can be frozen with `freeze`, after which no statements can be added to them, and
+    their hash is cached.
+
+    `Block`s created with `columnar=True` store their instructions in columns, see
+    `blqs.ColumnarStatements`. This uses much less memory for blocks of many instructions, but
+    creates the instructions each time they are accessed.
+
     See also `blqs.Program` for a top level `Block`.
     """
 
-    def __init__(self, parent_statement: Optional[blqs.Statement] = None):
+    __slots__ = ("_statements", "_hash")
+
+    def __init__(self, parent_statement: Optional[blqs.Statement] = None, columnar: bool = False):
         """Construction a block.
 
         Args:
@@ -82,10 +92,15 @@ class Block(statement.Statement):
                 to be added to the current default block. Typically this is never set by client
                 code, but is used by other statements that have their own `blqs.Block`s
                 (arising, for example, in `if` statements).
+            columnar: Whether to store the instructions of the block in columns.
         """
         if not parent_statement:
             super().__init__()
-        self._statements: List[statement.Statement] = []
+        # A list, a tuple once the block is frozen, or columnar statements.
+        self._statements: Sequence[statement.Statement] = (
+            columnar_lib.ColumnarStatements() if columnar else []
+        )
+        self._hash: Optional[int] = None
 
     @classmethod
     def of(cls, *statements) -> Block:
@@ -111,6 +126,14 @@ class Block(statement.Statement):
         """The statements that make up a block, returned as an immutable tuple."""
         return tuple(self._statements)
 
+    def statements_view(self) -> StatementsView:
+        """A read-only view of the statements that make up a block, without copying them.
+
+        The view contains the statements of the block when it is created. Statements appended to
+        the block afterwards are not in the view.
+        """
+        return StatementsView(self._statements, range(len(self._statements)))
+
     def __getitem__(self, key):
         return self._statements[key]
 
@@ -121,24 +144,164 @@ class Block(statement.Statement):
         return iter(self._statements)
 
     def append(self, stmt: blqs.Statement):
-        self._statements.append(stmt)
+        try:
+            append = self._statements.append  # type: ignore
+        except AttributeError:
+            raise ValueError("Frozen blocks cannot be modified.") from None
+        append(stmt)
 
     def extend(self, statements: Iterable[blqs.Statement]):
-        self._statements.extend(statements)
+        try:
+            extend = self._statements.extend  # type: ignore
+        except AttributeError:
+            raise ValueError("Frozen blocks cannot be modified.") from None
+        extend(statements)
+
+    def freeze(self) -> Block:
+        """Makes the block immutable, and caches its hash.
+
+        This freezes the statements of the block, and so the blocks nested in them, before the block
+        itself. The hash of each block is then computed once, from the cached hashes of the blocks
+        nested in it, so that hashing a frozen block takes constant time. Comparing frozen blocks
+        with different hashes also takes constant time.
+
+        Statements can no longer be added to a frozen block: `append` and `extend` raise a
+        `ValueError`. Freezing a frozen block does nothing.
+
+        Returns:
+            The block itself.
+
+        Raises:
+            TypeError: If a statement of the block is not hashable. The block is then not frozen.
+        """
+        if self._statements.__class__ is list:
+            for stmt in self._statements:
+                if isinstance(stmt, statement.Statement):
+                    stmt.freeze()
+            statements = tuple(self._statements)
+            # The hash is computed before the block is frozen, so that it is left as it was if a
+            # statement is not hashable.
+            self._hash = hash(statements)
+            self._statements = statements
+        elif isinstance(self._statements, columnar_lib.ColumnarStatements) and not (
+            self._statements.is_frozen()
+        ):
+            statements_hash = hash(tuple(self._statements))
+            self._statements.freeze()
+            self._hash = statements_hash
+        else:
+            hash(self)
+        return self
+
+    def is_frozen(self) -> bool:
+        """Whether the block has been frozen by `freeze`."""
+        if self._statements.__class__ is tuple:
+            return True
+        return isinstance(self._statements, columnar_lib.ColumnarStatements) and (
+            self._statements.is_frozen()
+        )
+
+    def is_columnar(self) -> bool:
+        """Whether the block stores its instructions in columns."""
+        return isinstance(self._statements, columnar_lib.ColumnarStatements)
 
     def __len__(self) -> int:
         return len(self._statements)
 
-    def __str__(self) -> str:
-        return textwrap.indent("\n".join(str(e) for e in self), "  ")
+    __str__ = printer.print_str
+
+    def _print_(self, p: printer.Printer):
+        with p.indented("  "):
+            p.print_joined(self._statements, "\n")
 
     def __eq__(self, other):
         if not isinstance(other, type(self)):
             return NotImplemented
+        if self is other:
+            return True
+        if self._hash is not None and other._hash is not None and self._hash != other._hash:
+            return False
+        if self._statements.__class__ is not other._statements.__class__:
+            # Only one of the blocks is frozen or columnar.
+            return tuple(self._statements) == tuple(other._statements)
         return self._statements == other._statements
 
     def __hash__(self):
-        return hash((*self._statements,))
+        if self._hash is not None:
+            return self._hash
+        statements_hash = hash(tuple(self._statements))
+        if self.is_frozen():
+            self._hash = statements_hash
+        return statements_hash
+
+    def __reduce_ex__(self, protocol):
+        # Blocks are pickled in the format of `blqs.dumps`, which is compact, and encodes the
+        # blocks nested in them without recursion. Subclasses, which may have other state, are not.
+        if self.__class__ is Block:
+            return serialization.loads_block, (serialization.dumps(self),)
+        return super().__reduce_ex__(protocol)
+
+    def __copy__(self):
+        return statement.copy_statement(self)
+
+    def __deepcopy__(self, memo):
+        return statement.copy_statement(self, memo)
+
+    def __getstate__(self):
+        # The cached hash is not pickled, since the hashes of strings differ between processes. It
+        # is computed again when the unpickled block is first hashed. The attributes of subclasses
+        # without slots are kept.
+        return getattr(self, "__dict__", None) or None, {
+            "_statements": self._statements,
+            "_hash": None,
+        }
 
     def __bool__(self) -> bool:
         return bool(self._statements)
+
+
+class StatementsView(collections.abc.Sequence):
+    """A read-only view of some of the statements of a `blqs.Block`, see `Block.statements_view`.
+
+    Views support `len`, indexing, slicing and iteration without copying the statements.
+    Slicing a view returns a view. Views are equal to sequences with equal elements, other than
+    strings.
+    """
+
+    __slots__ = ("_statements", "_indices")
+
+    def __init__(self, statements: Sequence[statement.Statement], indices: range):
+        self._statements = statements
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    @overload
+    def __getitem__(self, key: int) -> statement.Statement:
+        pass
+
+    @overload
+    def __getitem__(self, key: slice) -> StatementsView:
+        pass
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[statement.Statement, StatementsView]:
+        if isinstance(key, slice):
+            return StatementsView(self._statements, self._indices[key])
+        return self._statements[self._indices[key]]
+
+    def __iter__(self) -> Iterator[statement.Statement]:
+        indices = self._indices
+        if indices.start == 0 and indices.step == 1:
+            return itertools.islice(self._statements, indices.stop)
+        return map(self._statements.__getitem__, indices)
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"blqs.StatementsView({list(self)!r})"
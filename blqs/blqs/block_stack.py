@@ -11,7 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Optional, TYPE_CHECKING
+import contextlib
+import contextvars
+from typing import cast, Dict, Iterator, Optional, TYPE_CHECKING, Union
 
 from blqs import _stack
 
@@ -20,12 +22,37 @@ if TYPE_CHECKING:
     import blqs  # coverage: ignore
 
 
-class _BlockStack(_stack.ThreadLocalStack["blqs.Block"]):
+class _BlockStack(_stack.ThreadLocalStack[Optional["blqs.Block"]]):
     def __init__(self):
         super().__init__()
 
 
-_default_block_stack = _BlockStack()
+class _ContextBlockStack(_stack.ContextLocalStack[Optional["blqs.Block"]]):
+    def __init__(self):
+        super().__init__("blqs_block_stack")
+
+
+_AnyBlockStack = Union[_BlockStack, _ContextBlockStack]
+
+_BLOCK_STACKS: Dict[str, _AnyBlockStack] = {
+    "thread": _BlockStack(),
+    "context": _ContextBlockStack(),
+}
+
+_default_block_stack: _AnyBlockStack = _BLOCK_STACKS["thread"]
+
+# The block stack selected for the current context by `block_stack_scope`, if any.
+_scoped_block_stack: contextvars.ContextVar[_AnyBlockStack] = contextvars.ContextVar(
+    "blqs_scoped_block_stack"
+)
+
+
+def _block_stack_for(scope: str) -> _AnyBlockStack:
+    if scope not in _BLOCK_STACKS:
+        raise ValueError(
+            f"Unknown block stack scope {scope!r}, expected one of {sorted(_BLOCK_STACKS)}."
+        )
+    return _BLOCK_STACKS[scope]
 
 
 def get_current_block() -> Optional["blqs.Block"]:
@@ -35,14 +62,15 @@ def get_current_block() -> Optional["blqs.Block"]:
     stack. It does not remove this from the stack (for that see `pop_block`).
 
     The global default stack is thread local, i.e. different threads see different
-    stacks.
+    stacks. See `set_block_stack_scope` and `block_stack_scope` for making it local to asyncio
+    tasks instead.
     """
-    return _default_block_stack.peek()
+    return _scoped_block_stack.get(_default_block_stack).peek()
 
 
 def push_new_block(block: "blqs.Block"):
     """Push a new block onto the global default stack of blocks."""
-    _default_block_stack.push(block)
+    _scoped_block_stack.get(_default_block_stack).push(block)
 
 
 def pop_block() -> "blqs.Block":
@@ -51,4 +79,74 @@ def pop_block() -> "blqs.Block":
     Raises:
         IndexError: if the stack is empty.
     """
-    return _default_block_stack.pop()
+    return cast("blqs.Block", _scoped_block_stack.get(_default_block_stack).pop())
+
+
+def set_block_stack_scope(scope: str):
+    """Sets what the global default stack of blocks is local to.
+
+    By default the stack is local to the thread, so two asyncio tasks which build programs on the
+    same event loop see the same current block, and statements of one task can be added to the
+    blocks of the other. If the scope is "context", the stack is local to the current
+    `contextvars.Context` instead. Each asyncio task runs in its own context, so its stack starts
+    as a copy of the stack of the code that created the task, and is not changed by other tasks.
+    Since this is also local to the thread, it can be used with threads too, but is slightly
+    slower.
+
+    This should only be called when no blocks are open, since blocks opened on one stack are
+    closed on the other otherwise. See `block_stack_scope` for changing the scope of a single
+    build.
+
+    Args:
+        scope: Either "thread" or "context".
+
+    Raises:
+        ValueError: If the scope is not one of these, or if the stack of the current thread or
+            context is not empty.
+    """
+    global _default_block_stack
+    block_stack = _block_stack_for(scope)
+    if len(_scoped_block_stack.get(_default_block_stack)) != 0:
+        raise ValueError("The block stack scope cannot be changed while blocks are open.")
+    _default_block_stack = block_stack
+
+
+@contextlib.contextmanager
+def block_stack_scope(scope: str) -> Iterator[None]:
+    """A context in which the stack of blocks is local to the given scope.
+
+    This is like `set_block_stack_scope`, but only applies to the code run in this context, in the
+    current thread or asyncio task, and to tasks created by it. For example, many asyncio tasks
+    can each build a program in a `block_stack_scope("context")` context, and interleave safely.
+    The current block when entering the context remains the current block within it.
+
+    Args:
+        scope: Either "thread" or "context".
+
+    Raises:
+        ValueError: If the scope is not one of these.
+    """
+    block_stack = _block_stack_for(scope)
+    current_block = get_current_block()
+    token = _scoped_block_stack.set(block_stack)
+    block_stack.push(current_block)
+    try:
+        yield
+    finally:
+        block_stack.pop()
+        _scoped_block_stack.reset(token)
+
+
+@contextlib.contextmanager
+def detached() -> Iterator[None]:
+    """A context in which there is no current block.
+
+    Statements created in this context are not added to any block, even if the context is entered
+    within the context of a block.
+    """
+    block_stack = _scoped_block_stack.get(_default_block_stack)
+    block_stack.push(None)
+    try:
+        yield
+    finally:
+        block_stack.pop()
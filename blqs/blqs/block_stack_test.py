@@ -11,9 +11,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+import threading
+
 import pytest
 
 import blqs
+from blqs import block_stack
 
 
 def test_block_stack():
@@ -32,3 +36,105 @@ def test_block_stack():
 def test_block_pop_stack_empty():
     with pytest.raises(IndexError):
         blqs.pop_block()
+
+
+def test_detached():
+    with blqs.Block() as b:
+        with block_stack.detached():
+            assert blqs.get_current_block() is None
+            blqs.Op("H")(0)
+            blqs.Program()
+        assert blqs.get_current_block() is b
+    assert not b
+
+
+@pytest.fixture
+def context_scope():
+    blqs.set_block_stack_scope("context")
+    yield
+    blqs.set_block_stack_scope("thread")
+
+
+def test_set_block_stack_scope(context_scope):
+    with blqs.Block() as b:
+        assert blqs.get_current_block() is b
+        with block_stack.detached():
+            assert blqs.get_current_block() is None
+        with pytest.raises(ValueError, match="blocks are open"):
+            blqs.set_block_stack_scope("thread")
+    assert blqs.get_current_block() is None
+
+
+def test_set_block_stack_scope_invalid():
+    with pytest.raises(ValueError, match="Unknown block stack scope 'process'"):
+        blqs.set_block_stack_scope("process")
+    with pytest.raises(ValueError, match="Unknown block stack scope"):
+        with blqs.block_stack_scope("process"):
+            pass  # coverage: ignore
+
+
+async def _build_program(index: int, num_statements: int):
+    with blqs.Program() as program:
+        for i in range(num_statements):
+            with blqs.Block():
+                blqs.Op("H")(index, i)
+                await asyncio.sleep(0)
+    return program
+
+
+def _expected_program(index: int, num_statements: int):
+    return blqs.Program.of(*(blqs.Block.of(blqs.Op("H")(index, i)) for i in range(num_statements)))
+
+
+def test_block_stack_context_scope_asyncio(context_scope):
+    async def main():
+        return await asyncio.gather(*(_build_program(i, 5) for i in range(20)))
+
+    programs = asyncio.run(main())
+    assert programs == [_expected_program(i, 5) for i in range(20)]
+
+
+def test_block_stack_scope_asyncio():
+    async def build(index):
+        with blqs.block_stack_scope("context"):
+            return await _build_program(index, 5)
+
+    async def main():
+        return await asyncio.gather(*(build(i) for i in range(20)))
+
+    programs = asyncio.run(main())
+    assert programs == [_expected_program(i, 5) for i in range(20)]
+    assert blqs.get_current_block() is None
+
+
+def test_block_stack_scope_keeps_current_block():
+    with blqs.Block() as b:
+        with blqs.block_stack_scope("context"):
+            assert blqs.get_current_block() is b
+            blqs.Op("H")(0)
+            with blqs.Block() as c:
+                assert blqs.get_current_block() is c
+            with blqs.block_stack_scope("thread"):
+                assert blqs.get_current_block() is b
+            assert blqs.get_current_block() is b
+        assert blqs.get_current_block() is b
+    assert b == blqs.Block.of(blqs.Op("H")(0), blqs.Block())
+    assert blqs.get_current_block() is None
+
+
+def test_block_stack_context_scope_threads(context_scope):
+    programs = [None] * 10
+
+    def build(index):
+        with blqs.Program() as program:
+            for i in range(100):
+                blqs.Op("H")(index, i)
+        programs[index] = program
+
+    threads = [threading.Thread(target=build, args=(i,)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for index, program in enumerate(programs):
+        assert program == blqs.Program.of(*(blqs.Op("H")(index, i) for i in range(100)))
@@ -11,6 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import copy
+import pickle
+
 import pymore
 import pytest
 
@@ -124,6 +127,157 @@ def test_block_statements_immutable():
         s[0] = "b"
 
 
+def test_block_statements_view():
+    b = blqs.Block.of("a", "b", "c")
+    view = b.statements_view()
+    assert isinstance(view, blqs.StatementsView)
+    assert len(view) == 3
+    assert view[0] == "a"
+    assert view[-1] == "c"
+    assert list(view) == ["a", "b", "c"]
+    assert view == ("a", "b", "c")
+    assert view == ["a", "b", "c"]
+    assert view != ("a", "b")
+    assert view != "abc"
+    assert "b" in view
+    assert view.index("c") == 2
+    with pytest.raises(IndexError):
+        _ = view[3]
+    assert repr(view) == "blqs.StatementsView(['a', 'b', 'c'])"
+
+
+def test_block_statements_view_slicing():
+    b = blqs.Block.of("a", "b", "c", "d")
+    view = b.statements_view()
+    assert isinstance(view[1:], blqs.StatementsView)
+    assert view[1:] == ("b", "c", "d")
+    assert view[1:3] == ("b", "c")
+    assert view[::2] == ("a", "c")
+    assert view[::-1] == ("d", "c", "b", "a")
+    assert view[1:][1:] == ("c", "d")
+    assert view[1:][-1] == "d"
+    assert view[5:] == ()
+
+
+def test_block_statements_view_not_mutable():
+    b = blqs.Block.of("a", "b")
+    view = b.statements_view()
+    with pytest.raises(TypeError):
+        view[0] = "b"  # type: ignore
+    with pytest.raises(TypeError):
+        hash(view)
+    b.append("c")
+    assert view == ("a", "b")
+    assert b.statements_view() == ("a", "b", "c")
+
+
+def test_block_statements_view_frozen():
+    b = blqs.Block.of("a", "b").freeze()
+    assert b.statements_view() == ("a", "b")
+    assert b.statements_view()[1:] == ("b",)
+
+
 def test_block_parent_statement():
     blqs.Block(parent_statement=True)
     assert blqs.get_current_block() is None
+
+
+def _nested_block(depth: int, value: str) -> blqs.Block:
+    b = blqs.Block.of(value)
+    for _ in range(depth):
+        b = blqs.Block.of(b)
+    return b
+
+
+def test_block_freeze():
+    b = blqs.Block.of("a", blqs.Block.of("b"))
+    assert not b.is_frozen()
+    assert b.freeze() is b
+    assert b.is_frozen()
+    assert b[1].is_frozen()
+    assert b.statements() == ("a", blqs.Block.of("b"))
+    assert b.freeze() is b
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_block_freeze_unhashable(columnar):
+    b = blqs.Block(columnar=columnar)
+    b.append(blqs.Op("H")([0, 1]))
+    with pytest.raises(TypeError, match="unhashable"):
+        b.freeze()
+    assert not b.is_frozen()
+    b.append(blqs.Op("H")(0))
+    assert b == blqs.Block.of(blqs.Op("H")([0, 1]), blqs.Op("H")(0))
+
+
+def test_block_freeze_not_mutable():
+    b = blqs.Block.of("a").freeze()
+    with pytest.raises(ValueError, match="Frozen"):
+        b.append("b")
+    with pytest.raises(ValueError, match="Frozen"):
+        b.extend(["b"])
+    with pytest.raises(ValueError, match="Frozen"):
+        with b:
+            blqs.Block()
+    assert b == blqs.Block.of("a")
+
+
+def test_block_freeze_eq():
+    eq = pymore.EqualsTester()
+    eq.add_equality_group(
+        blqs.Block.of("a", blqs.Block.of("b")),
+        blqs.Block.of("a", blqs.Block.of("b")).freeze(),
+        blqs.Block.of("a", blqs.Block.of("b").freeze()),
+    )
+    eq.add_equality_group(
+        blqs.Block.of("a", blqs.Block.of("c")), blqs.Block.of("a", blqs.Block.of("c")).freeze()
+    )
+    eq.add_equality_group(blqs.Block().freeze(), blqs.Block())
+
+
+def test_block_freeze_nested_hash():
+    b = _nested_block(50, "a")
+    unfrozen_hash = hash(b)
+    b.freeze()
+    assert hash(b) == unfrozen_hash
+    assert b == _nested_block(50, "a")
+    assert b != _nested_block(50, "b").freeze()
+
+
+def test_block_freeze_eq_short_circuits_on_hash():
+    class NotComparable(blqs.Statement):
+        def __eq__(self, other):
+            raise AssertionError("Compared")
+
+        def __hash__(self):
+            return 1
+
+    b1 = blqs.Block.of(NotComparable(), "a").freeze()
+    b2 = blqs.Block.of(NotComparable(), "b").freeze()
+    assert b1 != b2
+
+
+def test_block_freeze_copy_and_pickle():
+    b = blqs.Block.of("a", blqs.Block.of("b")).freeze()
+    for copied in (copy.deepcopy(b), pickle.loads(pickle.dumps(b))):
+        assert copied == b
+        assert copied.is_frozen()
+        assert copied[1].is_frozen()
+        assert hash(copied) == hash(b)
+        with pytest.raises(ValueError, match="Frozen"):
+            copied.append("c")
+
+
+class AttributeBlock(blqs.Block):
+    def __init__(self):
+        super().__init__()
+        self.label = "mine"
+
+
+def test_block_subclass_copy_and_pickle_attributes():
+    b = AttributeBlock()
+    b.append("a")
+    for copied in (copy.copy(b), copy.deepcopy(b), pickle.loads(pickle.dumps(b))):
+        assert type(copied) is AttributeBlock
+        assert copied.label == "mine"
+        assert copied == b
@@ -11,22 +11,55 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import ast
 import collections
+import copy
 import dataclasses
 import functools
 import inspect
-import importlib
-import os
+import itertools
 import sys
 import textwrap
+import threading
 import types
-import tempfile
 
-from typing import Callable, Optional, Sequence
+from typing import Any, Callable, cast, Dict, Optional, Sequence, Set, Tuple
 import astunparse
 import gast
 
-from blqs import decorators, exceptions, _ast, _namer, _template
+from blqs import (
+    block,
+    block_stack,
+    compile_cache,
+    decorators,
+    exceptions,
+    persistent_cache,
+    result_cache as result_cache_lib,
+    stats,
+    subroutine,
+    _analysis,
+    _ast,
+    _namer,
+    _template,
+)
+
+# Used to give each piece of generated code a distinct filename. Different builders compile
+# concurrently, and iterators are not thread safe without the global interpreter lock.
+_generated_counter = itertools.count()
+_generated_counter_lock = threading.Lock()
+
+# The modules whose abstract syntax trees the build can transform, keyed by backend name.
+_AST_BACKENDS = {"gast": gast, "ast": ast}
+
+# The fields of `BuildConfig` which only affect how the builder is called, not the code it is
+# compiled to, so are not part of the keys of the compile caches.
+_CALL_FIELDS = frozenset(
+    ("cache_results", "result_cache_maxsize", "result_cache_weak_keys", "emit_calls")
+)
+
+# Each native fast path duplicates the body of the statement, so the number of fast paths on any
+# path through nested statements is capped, preferring the innermost statements.
+_MAX_FAST_PATH_DEPTH = 2
 
 
 @dataclasses.dataclass
@@ -41,6 +74,43 @@ class BuildConfig:
         support_delete: Whether to support capturing `del` statements.
         additional_decorator_specs: A list of `blqs.DecoratorSpec`s that are removed
             during the build. See `blqs.DecoratorSpec` for more information.
+        debug_generated_code: If True, the transformed code is converted to source code which is
+            then compiled, so that tracebacks show the generated code rather than the original
+            code. This is slower, and is intended for debugging the build itself.
+        ast_backend: The abstract syntax tree library used to transform the code, either "gast"
+            or "ast". The "gast" backend transforms a `gast` tree, which is then converted to a
+            standard `ast` tree to be compiled. The "ast" backend transforms the standard `ast`
+            tree directly, avoiding this conversion, and requires Python 3.8 or later.
+        native_fast_paths: Whether captured `if`, `for` and `while` statements and assignments
+            also get a fast path, taken when the value of the condition, iterable or assigned
+            value is of a builtin type, such as an `int` or `range`. Such values never support
+            the blqs protocols, so the fast path is plain Python code which skips checking them.
+            Since this duplicates the bodies of statements, only the innermost two levels of
+            nested statements get fast paths.
+        static_native_analysis: Whether captured `if`, `for` and `while` statements and
+            assignments are left as plain Python code when it can be shown when building that
+            their condition, iterable or assigned value is always of a builtin type. For example,
+            `for i in range(n)` and then `if i % 2 == 0` are left as they are. See
+            `blqs.build_stats` for how many statements this applies to.
+        cache_results: Whether to cache the program returned by the builder for each of the
+            arguments it is called with, in a least recently used cache, and return the cached
+            program when it is called with the same arguments again. This is for builders whose
+            program only depends on their arguments. The program is frozen, see
+            `blqs.Block.freeze`, before it is cached, so that it cannot be modified. Calls made
+            while a block is open, which add their block to the open block, are not cached. See
+            `blqs.ResultCache` for how the arguments are compared, and `blqs.result_cache_info`
+            for the statistics of the cache.
+        result_cache_maxsize: The maximum number of programs cached if `cache_results` is True.
+        result_cache_weak_keys: If `cache_results` is True, whether arguments which can be weakly
+            referenced are, so that their programs are evicted once they are garbage collected.
+        emit_calls: Whether the builder adds a `blqs.Call` of its block to the current block when
+            it is called within another block, such as by another builder, rather than adding
+            its statements in a new nested block. The blocks of the calls are frozen, and shared
+            by the calls with the same arguments, so that the size of a program which calls the
+            builder many times grows with the number of distinct arguments, not the number of
+            calls. The blocks are cached as the programs are by `cache_results`, with the same
+            maximum size, and weak keys. The builder then returns the block of the call, and must
+            not return a value of its own.
     """
 
     support_if: bool = True
@@ -51,6 +121,68 @@ class BuildConfig:
 
     additional_decorator_specs: Sequence[decorators.DecoratorSpec] = ()
 
+    debug_generated_code: bool = False
+
+    ast_backend: str = "gast"
+
+    native_fast_paths: bool = True
+
+    static_native_analysis: bool = True
+
+    cache_results: bool = False
+
+    result_cache_maxsize: int = result_cache_lib.DEFAULT_MAXSIZE
+
+    result_cache_weak_keys: bool = False
+
+    emit_calls: bool = False
+
+    def __post_init__(self):
+        if self.ast_backend not in _AST_BACKENDS:
+            raise ValueError(
+                f"Unknown ast_backend {self.ast_backend!r}, expected one of "
+                f"{sorted(_AST_BACKENDS)}."
+            )
+        if self.ast_backend == "ast" and sys.version_info < (3, 8):
+            raise ValueError("The ast ast_backend requires Python 3.8 or later.")
+        if self.result_cache_maxsize < 0:
+            raise ValueError(
+                f"result_cache_maxsize must be non-negative, was {self.result_cache_maxsize}."
+            )
+
+    def _ast_module(self) -> types.ModuleType:
+        """The module of the abstract syntax tree library used to transform the code."""
+        return _AST_BACKENDS[self.ast_backend]
+
+    def _key(self) -> Tuple:
+        """A hashable key that identifies the code produced by a build with this config."""
+        return tuple(
+            tuple(value) if isinstance(value, (list, tuple)) else value
+            for value in (getattr(self, field.name) for field in self._compiled_fields())
+        )
+
+    def _persistent_key(self) -> Tuple[str, ...]:
+        """Like `_key` but as strings that are stable across processes."""
+
+        def stable_str(value) -> str:
+            if isinstance(value, decorators.DecoratorSpec):
+                return (
+                    f"DecoratorSpec({value.module.__name__}, "
+                    f"{value.method.__module__}.{value.method.__qualname__})"
+                )
+            if isinstance(value, (list, tuple)):
+                return "(" + ", ".join(stable_str(v) for v in value) + ")"
+            return repr(value)
+
+        return tuple(
+            f"{field.name}={stable_str(getattr(self, field.name))}"
+            for field in self._compiled_fields()
+        )
+
+    def _compiled_fields(self) -> Tuple[dataclasses.Field, ...]:
+        """The fields which affect the code produced by a build with this config."""
+        return tuple(f for f in dataclasses.fields(self) if f.name not in _CALL_FIELDS)
+
 
 def build(func: Callable):
     """Turn the supplied function into a builder for the code the function contains.
@@ -91,75 +223,350 @@ def build_with_config(build_config: BuildConfig) -> Callable:
     return functools.partial(_build, build_config=build_config)
 
 
+@functools.lru_cache(maxsize=None)
+def _decorator_specs() -> Tuple[decorators.DecoratorSpec, ...]:
+    """Returns the specs of the `blqs.build` and `blqs.build_with_config` decorators.
+
+    These are always removed from the function during the build. They are created once, when
+    first needed, since `blqs` cannot be imported when this module is.
+    """
+    import blqs as __blqs
+
+    return (
+        decorators.DecoratorSpec(module=__blqs, method=build),
+        decorators.DecoratorSpec(module=__blqs, method=build_with_config),
+    )
+
+
 def _build(func: Callable, build_config: Optional[BuildConfig] = None) -> Callable:
     """Turn the supplied function into a builder for the code the function contains.
 
     This method is not intended to be called directly, use build or build_with_config above.
     """
 
+    build_config = build_config or BuildConfig()
+    # The key of the config is computed once, rather than on each call.
+    config_key = build_config._key()
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Get source.
-        source_code = textwrap.dedent(inspect.getsource(func))
-
-        # Parse it.
-        root = gast.parse(source_code)
-
-        # Transform the function via the transform below.
-        # This creates an outer function, which when call returns the transformed function.
-        # This pattern is used to correctly capture closures.
-        transformer = _BuildTransformer(func, build_config or BuildConfig())
-        transformed_gast, outer_fn_name = transformer.transform(root)
-
-        # Convert back to ast and get the code, preserving annotations.
-        transformed_ast = _ast.gast_to_ast(transformed_gast)
-        transformed_source_code = astunparse.unparse(transformed_ast).strip()
-
-        # Write a temp file with the new source code.
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".py", delete=False, encoding="utf-8"
-        ) as f:
-            module_name = os.path.basename(f.name[:-3])
-            filename = f.name
-            f.write(transformed_source_code)
-
-        # Import this new code into the temp module.
-        spec = importlib.util.spec_from_file_location(module_name, filename)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        sys.modules[module_name] = module
-
-        # Get the outer function, and call it, returning the inner function.
-        new_func = getattr(module, outer_fn_name)()  # pylint: disable=not-callable
-        # Set this inner function up with the correct globals and closure.
+        compiled = _get_or_compile(func, build_config, config_key)
+        # Set the compiled function up with the correct globals, closure and defaults.
         final_func = types.FunctionType(
-            code=new_func.__code__, globals=func.__globals__, closure=func.__closure__
+            code=compiled.code,
+            globals=func.__globals__,
+            name=func.__name__,
+            argdefs=func.__defaults__,
+            closure=func.__closure__,
         )
+        final_func.__kwdefaults__ = func.__kwdefaults__
         try:
             return final_func(*args, **kwargs)  # pylint: disable=not-callable
         except Exception as e:
             # If there is an exception, chain the exception in such a way as to indicated
             # the original file and line number is given.
-            line_map = _ast.construct_line_map(transformed_gast, transformed_source_code)
-            exceptions._raise_with_line_mapping(e, func, line_map, filename)
+            exceptions._raise_with_line_mapping(e, func, compiled.line_map(), compiled.filename)
+
+    uncached_wrapper = wrapper
+    if build_config.cache_results:
+        wrapper = _with_result_cache(wrapper, build_config)
+    if build_config.emit_calls:
+        wrapper = _with_calls(wrapper, uncached_wrapper, build_config)
+    setattr(wrapper, "_blqs_build_config", build_config)
+    return wrapper
 
+
+def _with_result_cache(func: Callable, build_config: BuildConfig) -> Callable:
+    """Wraps a builder so that it caches the frozen programs it returns, see `BuildConfig`."""
+    cache = result_cache_lib.ResultCache(
+        build_config.result_cache_maxsize, build_config.result_cache_weak_keys
+    )
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if block_stack.get_current_block() is not None:
+            return func(*args, **kwargs)
+        return cache.get_or_build(
+            args,
+            kwargs,
+            lambda: result_cache_lib.freeze_result(func(*args, **kwargs)),
+            result_cache_lib.is_cacheable,
+        )
+
+    setattr(wrapper, "_blqs_result_cache", cache)
     return wrapper
 
 
+def _with_calls(func: Callable, uncached_func: Callable, build_config: BuildConfig) -> Callable:
+    """Wraps a builder so that it adds calls of shared blocks within other blocks.
+
+    Args:
+        func: The builder.
+        uncached_func: The builder, without its result cache if it has one.
+        build_config: The config of the builder, see `BuildConfig.emit_calls`.
+
+    Returns:
+        The wrapped builder.
+    """
+    blocks = result_cache_lib.ResultCache(
+        build_config.result_cache_maxsize, build_config.result_cache_weak_keys
+    )
+    name = func.__name__
+
+    def build_block(*args, **kwargs):
+        # The program is built outside of any block, so that it is not added to the current block.
+        with block_stack.detached():
+            prog = uncached_func(*args, **kwargs)
+            if not isinstance(prog, block.Block):
+                raise ValueError(
+                    f"Builder {name} returned {prog!r}, but builders which emit calls must not "
+                    "return a value."
+                )
+            return block.Block.of(*prog).freeze()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if block_stack.get_current_block() is None:
+            return func(*args, **kwargs)
+        # Lists of qubits, say, are keyed as tuples, so that calls with equal lists share a block.
+        call_args = tuple(map(subroutine.hashable_arg, args))
+        call_kwargs = {k: subroutine.hashable_arg(v) for k, v in kwargs.items()}
+        body = blocks.get_or_build(call_args, call_kwargs, lambda: build_block(*args, **kwargs))
+        subroutine.Call(name, body, call_args, call_kwargs)
+        return body
+
+    return wrapper
+
+
+def build_stats(func: Callable, build_config: Optional[BuildConfig] = None) -> stats.BuildStats:
+    """Returns statistics about the code generated for a builder.
+
+    This compiles the builder, if it has not already been compiled, without calling it.
+
+    Args:
+        func: The builder, either a function returned by `blqs.build` or `blqs.build_with_config`,
+            or the function that was passed to them.
+        build_config: The configuration of the build. If not supplied, this is the configuration
+            `func` was built with if it was returned by `blqs.build` or `blqs.build_with_config`,
+            and the default configuration otherwise.
+
+    Returns:
+        The statistics of the compiled builder.
+    """
+    build_config = build_config or getattr(func, "_blqs_build_config", None) or BuildConfig()
+    compiled = _get_or_compile(inspect.unwrap(func), build_config)
+    assert compiled.stats is not None
+    return compiled.stats
+
+
+def _get_or_compile(
+    func: Callable, build_config: BuildConfig, config_key: Optional[Tuple] = None
+) -> compile_cache._CompiledBuilder:
+    return compile_cache._default_compile_cache.get_or_compile(
+        func.__code__,
+        build_config._key() if config_key is None else config_key,
+        lambda: _compile(cast(types.FunctionType, func), build_config),
+    )
+
+
+def _compile(func: types.FunctionType, build_config: BuildConfig) -> compile_cache._CompiledBuilder:
+    """Transforms and compiles the supplied function, returning the code of the new function.
+
+    If the persistent cache is enabled, the compiled code is loaded from it when present, and
+    written to it otherwise.
+    """
+    # Get source.
+    source_lines, first_lineno = inspect.getsourcelines(func)
+    source_code = textwrap.dedent("".join(source_lines))
+    # The amount of indentation removed by the dedent.
+    indent = len(source_lines[0]) - len(source_code.splitlines(True)[0])
+    with _generated_counter_lock:
+        number = next(_generated_counter)
+    filename = f"<blqs generated {func.__qualname__} #{number}>"
+
+    def transform_and_compile():
+        return _transform_and_compile(
+            func, source_code, first_lineno - 1, indent, filename, build_config
+        )
+
+    disk_cache = persistent_cache._default_persistent_cache
+    if disk_cache is None:
+        return transform_and_compile()
+
+    # The generated code also depends on the globals: generated names avoid them, builtins they
+    # shadow are not native, and they determine the aliases of the decorators removed.
+    module_aliases, method_aliases = _decorator_aliases(func, build_config)
+    key = persistent_cache.cache_key(
+        func.__code__.co_filename,
+        str(first_lineno),
+        str(indent),
+        func.__qualname__,
+        source_code,
+        *build_config._persistent_key(),
+        ",".join(sorted(map(str, func.__globals__))),
+        ",".join(sorted(module_aliases)),
+        ",".join(sorted(method_aliases)),
+    )
+    compiled = disk_cache.load(key, filename)
+    if compiled is None:
+        compiled = transform_and_compile()
+        disk_cache.store(key, compiled)
+    return compiled
+
+
+def _decorator_aliases(
+    func: types.FunctionType, build_config: BuildConfig
+) -> Tuple[Set[str], Set[str]]:
+    """Returns the module and method aliases of the build decorators in the globals of `func`."""
+    decorator_specs = (*_decorator_specs(), *build_config.additional_decorator_specs)
+    return decorators._default_alias_cache.aliases(decorator_specs, func.__globals__)
+
+
+def _transform_and_compile(
+    func: types.FunctionType,
+    source_code: str,
+    lineno_offset: int,
+    col_offset: int,
+    filename: str,
+    build_config: BuildConfig,
+) -> compile_cache._CompiledBuilder:
+    """Transforms and compiles the function.
+
+    Args:
+        func: The function to transform.
+        source_code: The dedented source code of the function.
+        lineno_offset: The line number of the first line of the source, minus one.
+        col_offset: The amount of indentation removed from the source of the function.
+        filename: The filename used for the generated code, if it is compiled from source.
+        build_config: The configuration of the build.
+
+    Returns:
+        The compiled builder.
+    """
+    # Parse it.
+    ast_module = build_config._ast_module()
+    root = ast_module.parse(source_code)
+
+    # Transform the function via the transform below.
+    # This creates an outer function, which when call returns the transformed function.
+    # This pattern is used to correctly capture closures.
+    transformer = _BuildTransformer(func, build_config)
+    transformed_root, outer_fn_name = transformer.transform(root)
+    build_stats = transformer.stats()
+
+    # Convert back to ast if necessary, preserving annotations.
+    transformed_ast = _ast.gast_to_ast(transformed_root) if ast_module is gast else transformed_root
+
+    source: Optional[str] = None
+    if build_config.debug_generated_code:
+        # Get the code and compile it, so that tracebacks show the generated code.
+        generated_source = astunparse.unparse(transformed_ast).strip()
+        code = compile(generated_source, filename, "exec")
+        line_map_fn = lambda: _ast.construct_line_map(
+            transformed_root, generated_source, ast_module
+        )
+        source = generated_source
+    else:
+        # Compile the ast directly, with line numbers pointing at the original code.
+        filename = func.__code__.co_filename
+        linenos = _ast.set_original_locations(transformed_ast, lineno_offset, col_offset)
+        code = compile(transformed_ast, filename, "exec")
+        line_map = {lineno: lineno - lineno_offset for lineno in linenos}
+        line_map_fn = lambda: line_map  # pylint: disable=unnecessary-lambda-assignment
+
+    # Execute the code to define the outer function.
+    namespace: Dict[str, Any] = {}
+    exec(code, namespace)  # pylint: disable=exec-used
+
+    # Get the outer function, and call it, returning the inner function.
+    new_func = namespace[outer_fn_name]()
+
+    # Name the code after the original function, so that it shows up as such in tracebacks.
+    names = {"co_name": func.__code__.co_name}
+    if hasattr(func.__code__, "co_qualname"):
+        names["co_qualname"] = func.__code__.co_qualname
+    return compile_cache._CompiledBuilder(
+        code=new_func.__code__.replace(**names),
+        line_map_fn=line_map_fn,
+        filename=filename,
+        source=source,
+        stats=build_stats,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _with_fast_path(template: str, native_template: str, mode: str, expression: str) -> str:
+    """Returns the template of a captured statement, with a native fast path if requested.
+
+    Args:
+        template: The template capturing the statement on the placeholder `value`.
+        native_template: The template running the statement natively.
+        mode: How the statement is emitted, see `_BuildTransformer._visit_site`.
+        expression: The placeholder of the expression of the statement that `value` is.
+
+    Returns:
+        The template. In the fast path case, this first assigns the expression to `value`, so
+        that `value` should be replaced by a name, and guards the captured statement by whether
+        the value is of a native type. Otherwise `value` should be replaced by the expression.
+    """
+    if mode != "fast_path":
+        return template
+    return (
+        f"value = {expression}\n"
+        "if value.__class__ in native_types:\n"
+        f"{textwrap.indent(textwrap.dedent(native_template).strip(), '    ')}\n"
+        "else:\n"
+        f"{textwrap.indent(textwrap.dedent(template).strip(), '    ')}\n"
+    )
+
+
 class _BuildTransformer(gast.NodeTransformer):
     def __init__(self, func: types.FunctionType, build_config: BuildConfig):
         self._func = func
         self._build_config = build_config
-        self._local_vars = func.__code__.co_freevars + func.__code__.co_varnames
-        self._namer = _namer.Namer(tuple(func.__globals__.keys()))
+        self._ast = build_config._ast_module()
+        code = func.__code__
+        # Generated names must not shadow the function's globals, nor clobber its variables.
+        self._namer = _namer.Namer(
+            func.__globals__, frozenset((*code.co_varnames, *code.co_cellvars, *code.co_freevars))
+        )
         self._outer_fn_name = None
+        # The name of the module of helpers called by the generated code, see `blqs._runtime`.
+        self._runtime = self._namer.new_name("blqs_runtime")
+        self._native_types = (
+            self._namer.new_name("native_types") if build_config.native_fast_paths else None
+        )
+        # The maximum number of fast paths on a path through the statements visited so far.
+        self._fast_path_depth = 0
+        self._analysis: Optional[_analysis.NativeAnalysis] = None
+        self._stats: Dict[str, int] = collections.Counter()
 
     def transform(self, node):
+        if self._build_config.static_native_analysis:
+            code = self._func.__code__
+            self._analysis = _analysis.NativeAnalysis(
+                node,
+                self._ast,
+                local_names={*code.co_varnames, *code.co_cellvars},
+                outer_names={*code.co_freevars, *self._func.__globals__},
+            )
         transformed_node = self.visit(node)
         assert self._outer_fn_name is not None
         return transformed_node, self._outer_fn_name
 
+    def stats(self) -> stats.BuildStats:
+        """Returns the statistics of the code produced by `transform`."""
+        return stats.BuildStats(**self._stats)
+
     def visit(self, node):
+        if hasattr(node, "lineno"):
+            # Only nodes of the original code are visited, record where they came from.
+            node.original_position = (
+                node.lineno,
+                node.col_offset,
+                node.end_lineno,
+                node.end_col_offset,
+            )
         new_nodes = super().visit(node)
         return self._annotate_nodes(node, new_nodes)
 
@@ -185,169 +592,303 @@ class _BuildTransformer(gast.NodeTransformer):
             var_defs
 
             def inner_fn():
-                import blqs
-                import contextlib
-                with blqs.Block() if blqs.get_current_block() else blqs.Program() as return_block:
+                import blqs._runtime as runtime
+                native_types_defs
+                with runtime.new_block() as return_block:
                     old_body
                 return return_block
             return inner_fn
         """
         var_defs = [
-            _template.replace("var_name = None", var_name=var)
+            var_def
             for var in self._func.__code__.co_freevars
+            for var_def in _template.replace("var_name = None", self._ast, var_name=var)
         ]
+        native_types_defs = (
+            _template.replace(
+                "native_types = runtime.NATIVE_TYPES",
+                self._ast,
+                native_types=self._native_types,
+                runtime=self._runtime,
+            )
+            if self._native_types
+            else []
+        )
         self._outer_fn_name = self._namer.new_name("outer_fn")
         new_fn = _template.replace(
             template,
+            self._ast,
             outer_fn=self._outer_fn_name,
             var_defs=var_defs,
+            runtime=self._runtime,
+            native_types_defs=native_types_defs,
             inner_fn=self._namer.new_name("inner_fn"),
             return_block=self._namer.new_name("return_block"),
             old_body=node.body,
         )
         # Set the inner args to the args of the original function and similarly for decorators.
-        inner = next(x for x in new_fn[0].body if isinstance(x, gast.FunctionDef))
+        # Defaults and annotations are dropped: defaults are bound from the original function
+        # when it is called, and neither can be evaluated in the scope of the generated code.
+        inner = next(x for x in new_fn[0].body if isinstance(x, self._ast.FunctionDef))
         inner.args = node.args
+        inner.args.defaults = []
+        inner.args.kw_defaults = [None] * len(inner.args.kwonlyargs)
+        for arg in (
+            *inner.args.posonlyargs,
+            *inner.args.args,
+            *inner.args.kwonlyargs,
+            inner.args.vararg,
+            inner.args.kwarg,
+        ):
+            if arg is not None:
+                arg.annotation = None
         inner.decorator_list = new_decorator_list
         return new_fn
 
     def remove_blqs_build_annotations(self, decorator_list: Sequence):
         """Removes any"""
-        import blqs as __blqs
-
-        decorator_specs = [
-            decorators.DecoratorSpec(module=__blqs, method=build),
-            decorators.DecoratorSpec(module=__blqs, method=build_with_config),
-            *self._build_config.additional_decorator_specs,
-        ]
-        module_aliases = decorators._compute_module_aliases(decorator_specs, self._func.__globals__)
-        method_aliases = decorators._compute_method_aliases(decorator_specs, self._func.__globals__)
+        module_aliases, method_aliases = _decorator_aliases(self._func, self._build_config)
 
         return decorators._remove_decorators(
-            decorator_list, module_aliases=module_aliases, method_aliases=method_aliases
+            decorator_list,
+            module_aliases=module_aliases,
+            method_aliases=method_aliases,
+            ast_module=self._ast,
         )
 
-    def visit_If(self, node):
+    def _visit_site(self, node, supported: bool, value, compound: bool = True):
+        """Visits the children of a statement that may be captured, and decides how to emit it.
+
+        Args:
+            node: The statement.
+            supported: Whether capturing the statement is supported by the build config.
+            value: The expression that determines whether the statement is captured.
+            compound: Whether the statement has a body, which a fast path duplicates.
+
+        Returns:
+            A tuple of the visited statement, and None if the statement should be left as it is,
+            "fast_path" if it should be captured with a native fast path, or "captured" if it
+            should only be captured.
+        """
+        static_native = supported and self._analysis is not None and self._analysis.is_native(value)
+        outer_depth = self._fast_path_depth
+        self._fast_path_depth = 0
         node = self.generic_visit(node)
-        if not self._build_config.support_if:
+        inner_depth = self._fast_path_depth
+        fast_path = (
+            supported
+            and not static_native
+            and self._native_types is not None
+            and (not compound or inner_depth < _MAX_FAST_PATH_DEPTH)
+        )
+        self._fast_path_depth = max(outer_depth, inner_depth + (fast_path and compound))
+        if not supported:
+            return node, None
+        if static_native:
+            self._stats["static_native_sites"] += 1
+            return node, None
+        if fast_path:
+            self._stats["fast_path_sites"] += 1
+            return node, "fast_path"
+        self._stats["captured_sites"] += 1
+        return node, "captured"
+
+    def visit_If(self, node):
+        node, mode = self._visit_site(node, self._build_config.support_if, node.test)
+        if mode is None:
             return node
-        template = """
-        cond = test
-        is_readable = blqs.is_readable(cond)
-        cond_statement = blqs.If(cond) if is_readable else None
-        if is_readable or cond:
-            with cond_statement.if_block() if cond_statement else contextlib.nullcontext():
+        if node.orelse:
+            template = """
+            enter_if, enter_else, if_block, else_block = runtime.if_(value)
+            if enter_if:
+                with if_block:
+                    if_body
+            if enter_else:
+                with else_block:
+                    else_body
+            """
+            native_template = """
+            if value:
                 if_body
-        if is_readable or not cond:
-            with cond_statement.else_block() if cond_statement else contextlib.nullcontext():
+            else:
                 else_body
-        """
-        new_nodes = _template.replace(
-            template,
-            cond=self._namer.new_name("cond"),
-            is_readable=self._namer.new_name("is_readable"),
-            cond_statement=self._namer.new_name("cond_statement"),
+            """
+        else:
+            template = """
+            enter_if, enter_else, if_block, else_block = runtime.if_(value)
+            if enter_if:
+                with if_block:
+                    if_body
+            """
+            native_template = """
+            if value:
+                if_body
+            """
+        return _template.replace(
+            _with_fast_path(template, native_template, mode, "test"),
+            self._ast,
+            runtime=self._runtime,
+            native_types=self._native_types,
+            value=self._namer.new_name("cond") if mode == "fast_path" else node.test,
             test=node.test,
+            enter_if=self._namer.new_name("enter_if"),
+            enter_else=self._namer.new_name("enter_else"),
+            if_block=self._namer.new_name("if_block"),
+            else_block=self._namer.new_name("else_block"),
             if_body=node.body,
-            else_body=node.orelse if node.orelse else gast.Pass(),
+            else_body=node.orelse,
         )
-        return new_nodes
 
     def visit_For(self, node):
-        node = self.generic_visit(node)
-        if not self._build_config.support_for:
+        node, mode = self._visit_site(node, self._build_config.support_for, node.iter)
+        if mode is None:
             return node
-
-        template = """
-        is_iterable = blqs.is_iterable(iter)
-        for_statement = blqs.For(iter) if is_iterable else None
-        loop_vars = blqs.loop_vars(iter) if is_iterable else None
-        for target in ([loop_vars if len(loop_vars) > 1 else loop_vars[0]]
-                       if is_iterable else iter):
-            with for_statement.loop_block() if for_statement else contextlib.nullcontext():
+        if node.orelse:
+            template = """
+            iterable, loop_block, else_block = runtime.for_(value)
+            for target in iterable:
+                with loop_block:
+                    loop_body
+            else:
+                with else_block:
+                    else_body
+            """
+            native_template = """
+            for target in value:
                 loop_body
-        else:
-            with for_statement.else_block() if for_statement else contextlib.nullcontext():
+            else:
                 else_body
-        """
-        new_nodes = _template.replace(
-            template,
-            is_iterable=self._namer.new_name("is_iterable"),
-            for_statement=self._namer.new_name("for_statement"),
-            loop_vars=self._namer.new_name("loop_vars"),
-            target=node.target,
+            """
+        else:
+            template = """
+            iterable, loop_block, else_block = runtime.for_(value)
+            for target in iterable:
+                with loop_block:
+                    loop_body
+            """
+            native_template = """
+            for target in value:
+                loop_body
+            """
+        return _template.replace(
+            _with_fast_path(template, native_template, mode, "iter"),
+            self._ast,
+            runtime=self._runtime,
+            native_types=self._native_types,
+            value=self._namer.new_name("iter_value") if mode == "fast_path" else node.iter,
             iter=node.iter,
+            iterable=self._namer.new_name("iterable"),
+            loop_block=self._namer.new_name("loop_block"),
+            else_block=self._namer.new_name("else_block"),
+            target=node.target,
             loop_body=node.body,
-            else_body=node.orelse if node.orelse else gast.Pass(),
+            else_body=node.orelse,
         )
-        return new_nodes
 
     def visit_While(self, node):
-        node = self.generic_visit(node)
-        if not self._build_config.support_while:
+        node, mode = self._visit_site(node, self._build_config.support_while, node.test)
+        if mode is None:
             return node
-
-        template = """
-        is_readable = blqs.is_readable(test)
-        while_statement = blqs.While(test) if is_readable else None
-        while test or is_readable:
-            with while_statement.loop_block() if while_statement else contextlib.nullcontext():
-                loop_body
+        # A captured loop runs its body once, then runs the else branch. Otherwise the loop runs
+        # natively, and the else branch runs if the loop ends without a break.
+        if node.orelse:
+            template = """
+            is_readable, loop_block, else_block = runtime.while_(value)
+            while is_readable or test:
+                with loop_block:
+                    loop_body
+                if is_readable:
+                    break
+            else:
+                is_readable = True
             if is_readable:
-                break
-        if not test or is_readable:
-            with while_statement.else_block() if while_statement else contextlib.nullcontext():
+                with else_block:
+                    else_body
+            """
+            native_template = """
+            while test:
+                loop_body
+            else:
                 else_body
-        """
-        new_nodes = _template.replace(
-            template,
-            is_readable=self._namer.new_name("is_readable"),
-            while_statement=self._namer.new_name("while_statement"),
+            """
+        else:
+            template = """
+            is_readable, loop_block, else_block = runtime.while_(value)
+            while is_readable or test:
+                with loop_block:
+                    loop_body
+                if is_readable:
+                    break
+            """
+            native_template = """
+            while test:
+                loop_body
+            """
+        return _template.replace(
+            _with_fast_path(template, native_template, mode, "test"),
+            self._ast,
+            runtime=self._runtime,
+            native_types=self._native_types,
+            value=self._namer.new_name("cond") if mode == "fast_path" else node.test,
             test=node.test,
+            is_readable=self._namer.new_name("is_readable"),
+            loop_block=self._namer.new_name("loop_block"),
+            else_block=self._namer.new_name("else_block"),
             loop_body=node.body,
-            else_body=node.orelse if node.orelse else gast.Pass(),
+            else_body=node.orelse,
         )
-        return new_nodes
 
     def visit_Assign(self, node):
-        node = self.generic_visit(node)
-        if not self._build_config.support_assign:
+        node, mode = self._visit_site(
+            node, self._build_config.support_assign, node.value, compound=False
+        )
+        if mode is None:
             return node
 
         template = """
-        temp_value = value
-        readable_targets = blqs.readable_targets(temp_value)
-        if len(readable_targets) == 1:
-            readable_targets = readable_targets[0]
-        if readable_targets:
-            blqs.Assign(assign_names, temp_value)
-            targets = readable_targets
-        else:
-            targets = temp_value
+        targets = runtime.assign(assign_names, value)
         """
-        assign_names = self._target_names(node.targets)
-        new_nodes = _template.replace(
+        if mode == "fast_path":
+            template = """
+            temp_value = value
+            targets = (
+                temp_value
+                if temp_value.__class__ in native_types
+                else runtime.assign(assign_names, temp_value)
+            )
+            """
+        temp_value = self._namer.new_name("temp_value")
+        return _template.replace(
             template,
-            temp_value=self._namer.new_name("temp_value"),
+            self._ast,
+            runtime=self._runtime,
+            native_types=self._native_types,
+            temp_value=temp_value,
             value=node.value,
             targets=node.targets,
-            readable_targets=self._namer.new_name("readable_targets"),
-            assign_names=assign_names,
+            assign_names=self._target_names(node.targets),
         )
-        return new_nodes
 
     def _target_names(self, targets):
         names = []
         for target in targets:
-            if isinstance(target, gast.Name):
-                names.append(gast.Constant(target.id, None))
-            elif isinstance(target, gast.Tuple):
-                names.extend(gast.Constant(t.id, None) for t in target.elts)
-            elif isinstance(target, gast.List):
-                names.extend(gast.Constant(t.id, None) for t in target.elts)
+            if isinstance(target, self._ast.Name):
+                names.append(self._ast.Constant(target.id, None))
+            elif isinstance(target, self._ast.Tuple):
+                names.extend(self._ast.Constant(t.id, None) for t in target.elts)
+            elif isinstance(target, self._ast.List):
+                names.extend(self._ast.Constant(t.id, None) for t in target.elts)
             else:
                 raise ValueError("Invalid target type: this should not happen")  # coverage: ignore
-        return gast.Tuple(names, gast.Load())
+        return self._ast.Tuple(names, self._ast.Load())
+
+    def _as_load(self, target):
+        """Returns a copy of the target expression which loads, rather than stores or deletes."""
+        target = copy.deepcopy(target)
+        for n in self._ast.walk(target):
+            if hasattr(n, "ctx"):
+                n.ctx = self._ast.Load()
+        return target
 
     def visit_Delete(self, node):
         node = self.generic_visit(node)
@@ -355,22 +896,14 @@ class _BuildTransformer(gast.NodeTransformer):
             return node
 
         target_names = self._target_names(node.targets)
-        target_tuple = gast.Tuple(node.targets, gast.Load())
+        target_tuple = self._ast.Tuple([self._as_load(t) for t in node.targets], self._ast.Load())
         template = """
-        temp_value = target_tuple
-        standard_targets = tuple(val for val in temp_value if not blqs.is_deletable(val))
-        if len(standard_targets) > 0:
-            del standard_targets
-        deletable_names = tuple(name for val, name in zip(temp_value, target_names)
-                                if blqs.is_deletable(val))
-        if len(deletable_names) > 0:
-            blqs.Delete(deletable_names)
+        runtime.delete(target_names, target_tuple)
         """
         new_nodes = _template.replace(
             template,
-            temp_value=self._namer.new_name("temp_value"),
-            targets=node.targets,
-            standard_targets=self._namer.new_name("standard_targets"),
+            self._ast,
+            runtime=self._runtime,
             target_names=target_names,
             target_tuple=target_tuple,
         )
@@ -568,6 +568,49 @@ def test_build_exception_only_raise(method):
     assert cause.original_filename() == inspect.getfile(blqs.testing_samples)
     assert e.value.lineno in cause.linenos_dict().values()
 
+    # The traceback points directly at the original code.
+    last_tb = e.value.__traceback__
+    while last_tb.tb_next is not None:
+        last_tb = last_tb.tb_next
+    assert last_tb.tb_frame.f_code.co_filename == inspect.getfile(blqs.testing_samples)
+    assert last_tb.tb_lineno == e.value.lineno
+
+
+@pytest.mark.parametrize("method", [ts.only_raise, ts.if_blqs, ts.for_else_native, ts.while_blqs])
+def test_build_exception_debug_generated_code(method):
+    config = blqs.BuildConfig(debug_generated_code=True)
+    with pytest.raises(ts.LocatedException, match="oh no") as e:
+        blqs.build_with_config(config)(method.__wrapped__)()
+    cause = e.value.__cause__
+    assert type(cause) == blqs.GeneratedCodeException
+    assert cause.original_filename() == inspect.getfile(blqs.testing_samples)
+    assert cause.generated_filename().startswith("<blqs generated")
+    assert e.value.lineno in cause.linenos_dict().values()
+
+
+def test_build_multiline_statements():
+    def fn():
+        blqs.Op(
+            "H",
+        )(
+            0,
+        )
+        a = blqs.Register(
+            "a",
+        )
+        del a
+
+    assert blqs.build(fn)() == blqs.Program.of(
+        blqs.Op("H")(0), blqs.Assign(("a",), blqs.Register("a")), blqs.Delete(("a",))
+    )
+
+
+def test_build_code_name():
+    def fn():
+        return inspect.currentframe().f_code.co_name
+
+    assert blqs.build(fn)() == "fn"
+
 
 @pytest.mark.parametrize(
     "method",
@@ -600,3 +643,481 @@ def test_build_with_before_decorator():
     assert ts.build(ts.blqs_build_with_only_decorator)() == blqs.Program.of(
         blqs.Op("X")(0), blqs.Op("H")(0)
     )
+
+
+def test_build_default_args():
+    assert ts.default_args(1) == blqs.Program.of(blqs.Op("H")(1, 3, 2))
+    assert ts.default_args(1, 2, c=4) == blqs.Program.of(blqs.Op("H")(1, 2, 4))
+
+
+def test_build_config_ast_backend_invalid():
+    with pytest.raises(ValueError, match="ast_backend"):
+        blqs.BuildConfig(ast_backend="typed_ast")
+
+
+def _all_statements(x):
+    a = blqs.Register("a")
+    b, c = blqs.Register("b"), 1
+    if a:
+        blqs.Op("H")(x)
+    elif c:
+        blqs.Op("X")(x)
+    for i in blqs.Iterable("range(5)", blqs.Register("i")):
+        blqs.Op("Y")(i)
+    else:
+        blqs.Op("Z")(x)
+    for j in range(2):
+        blqs.Op("CX")(x, j)
+    while b:
+        blqs.Op("S")(x)
+    del a, c
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        _all_statements,
+        ts.blqs_build_decorator.__wrapped__,
+        ts.blqs_alias_build_with_config_decorator.__wrapped__,
+        ts.blqs_build_with_config_alias_decorator.__wrapped__,
+    ],
+)
+def test_build_ast_backend_matches_gast(method):
+    args = [0] if method is _all_statements else []
+    gast_config = blqs.BuildConfig(ast_backend="gast")
+    ast_config = blqs.BuildConfig(ast_backend="ast")
+    assert blqs.build_with_config(ast_config)(method)(*args) == (
+        blqs.build_with_config(gast_config)(method)(*args)
+    )
+
+
+@pytest.mark.parametrize("debug_generated_code", [False, True])
+@pytest.mark.parametrize(
+    "method", [ts.multiple_statements, ts.elif_blqs, ts.for_else_blqs, ts.while_else_native]
+)
+def test_build_ast_backend_exception(method, debug_generated_code):
+    config = blqs.BuildConfig(ast_backend="ast", debug_generated_code=debug_generated_code)
+    with pytest.raises(ts.LocatedException, match="oh no") as e:
+        blqs.build_with_config(config)(method.__wrapped__)()
+    cause = e.value.__cause__
+    assert type(cause) == blqs.GeneratedCodeException
+    assert e.value.lineno in cause.linenos_dict().values()
+
+
+def _native_and_blqs(n):
+    total = 0
+    for i in range(n):
+        if i % 2:
+            blqs.Op("H")(i)
+        else:
+            blqs.Op("X")(i)
+        j = i
+        while j > 0:
+            j -= 1
+            if j == 1:
+                break
+        else:
+            total += 1
+    else:
+        blqs.Op("Z")(total)
+    a = blqs.Register("a")
+    for k in blqs.Iterable("range(2)", blqs.Register("k")):
+        if a:
+            blqs.Op("CX")(k, n)
+    while blqs.Register("b"):
+        blqs.Op("Y")(n)
+
+
+@pytest.mark.parametrize("ast_backend", ["gast", "ast"])
+def test_build_native_fast_paths_match(ast_backend):
+    fast = blqs.build_with_config(blqs.BuildConfig(ast_backend=ast_backend))(_native_and_blqs)
+    slow = blqs.build_with_config(
+        blqs.BuildConfig(ast_backend=ast_backend, native_fast_paths=False)
+    )(_native_and_blqs)
+    assert fast(4) == slow(4)
+
+
+def test_build_native_fast_paths_skip_protocols(monkeypatch):
+    def fn(n):
+        for i in range(n):
+            if i % 2:
+                blqs.Op("H")(i)
+            x = i
+            while x > 0:
+                x -= 1
+
+    def fail(val):
+        raise AssertionError(f"Protocol checked for {val}.")
+
+    for protocol in ("is_readable", "is_iterable", "readable_targets"):
+        monkeypatch.setattr(blqs.protocols, protocol, fail)
+    assert blqs.build(fn)(3) == blqs.Program.of(blqs.Op("H")(1))
+
+
+@pytest.mark.parametrize("native_fast_paths", [True, False])
+def test_build_while_else_native_break(native_fast_paths):
+    def fn(n):
+        while n > 0:
+            n -= 1
+            if n == 2:
+                break
+        else:
+            blqs.Op("X")(n)
+
+    config = blqs.BuildConfig(native_fast_paths=native_fast_paths, static_native_analysis=False)
+    built = blqs.build_with_config(config)(fn)
+    assert built(4) == blqs.Program()
+    assert built(2) == blqs.Program.of(blqs.Op("X")(0))
+
+
+def test_build_nested_builder_first_statement():
+    @blqs.build
+    def inner():
+        blqs.Op("H")(0)
+
+    def outer():
+        inner()
+        blqs.Op("X")(0)
+
+    block = blqs.Block.of(blqs.Op("H")(0))
+    assert blqs.build(outer)() == blqs.Program.of(block, blqs.Op("X")(0))
+
+
+def test_build_generated_names_do_not_clobber_variables():
+    def fn():
+        cond, iter_value, temp_value, blqs_runtime = 1, [1], 2, 3
+        enter_if = blqs.Register("a")
+        if enter_if:
+            blqs.Op("H")(cond)
+        for iterable in blqs.Iterable("range(2)", blqs.Register("i")):
+            blqs.Op("X")(iterable)
+
+        def native_types():
+            return iter_value, temp_value, blqs_runtime
+
+        blqs.Op("Z")(native_types())
+
+    if_statement = blqs.If(blqs.Register("a"))
+    if_statement.if_block().append(blqs.Op("H")(1))
+    for_statement = blqs.For(blqs.Iterable("range(2)", blqs.Register("i")))
+    for_statement.loop_block().append(blqs.Op("X")(blqs.Register("i")))
+    expected = blqs.Program.of(
+        blqs.Assign(("enter_if",), blqs.Register("a")),
+        if_statement,
+        for_statement,
+        blqs.Op("Z")(([1], 2, 3)),
+    )
+    for config in (blqs.BuildConfig(), blqs.BuildConfig(native_fast_paths=False)):
+        assert blqs.build_with_config(config)(fn)() == expected
+
+
+def test_build_native_fast_paths_nested():
+    def fn():
+        for i in range(2):
+            for j in range(2):
+                for k in range(2):
+                    if i == j == k:
+                        blqs.Op("H")(i)
+                    if blqs.Register("r"):
+                        blqs.Op("X")(k)
+
+    fast = blqs.build(fn)()
+    slow = blqs.build_with_config(blqs.BuildConfig(native_fast_paths=False))(fn)()
+    assert fast == slow
+    assert len(fast) == 10
+
+
+def test_build_for_iter_evaluated_once():
+    calls = []
+
+    def iterable(val):
+        calls.append(val)
+        return val
+
+    def fn():
+        for _ in iterable([1, 2]):
+            pass
+        for x in iterable(blqs.Iterable("range(5)", blqs.Register("x"))):
+            blqs.Op("H")(x)
+
+    for config in (blqs.BuildConfig(), blqs.BuildConfig(native_fast_paths=False)):
+        calls.clear()
+        blqs.build_with_config(config)(fn)()
+        assert len(calls) == 2
+
+
+def _static_and_captured(n):
+    for q in range(n):
+        if q % 2 == 0:
+            blqs.Op("H")(q)
+        x = q * 2
+        while x > q:
+            x -= 1
+    a = blqs.Register("a")
+    if a:
+        blqs.Op("X")(n)
+    for r in blqs.Iterable("range(2)", blqs.Register("r")):
+        blqs.Op("Y")(r)
+
+
+class _Ordered:
+    """Ordering these returns a register, as ordering a tuple of them does."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __lt__(self, other):
+        return blqs.Register(f"{self.name}<{other.name}")
+
+
+def _container_ordering(n):
+    r, s = _Ordered("r"), _Ordered("s")
+    if (r,) < (s,):
+        blqs.Op("H")(n)
+    pair = [r, s]
+    if pair < [s, r]:
+        blqs.Op("X")(n)
+    for i in range(n):
+        if i < len(pair) <= i + 2:
+            blqs.Op("Y")(i)
+
+
+def test_build_stats_container_ordering():
+    # The assignments, the loop and the ordering of ints are native, the orderings of containers
+    # are not.
+    assert blqs.build_stats(_container_ordering).static_native_sites == 4
+
+
+def test_build_stats():
+    built = blqs.build(_static_and_captured)
+    assert blqs.build_stats(built) == blqs.BuildStats(
+        static_native_sites=4, fast_path_sites=3, captured_sites=0
+    )
+    assert blqs.build_stats(_static_and_captured) == blqs.build_stats(built)
+
+    config = blqs.BuildConfig(static_native_analysis=False, native_fast_paths=False)
+    assert blqs.build_stats(blqs.build_with_config(config)(_static_and_captured)) == (
+        blqs.BuildStats(static_native_sites=0, fast_path_sites=0, captured_sites=7)
+    )
+    config = blqs.BuildConfig(support_if=False, support_assign=False)
+    assert blqs.build_stats(_static_and_captured, config) == blqs.BuildStats(
+        static_native_sites=2, fast_path_sites=1, captured_sites=0
+    )
+
+
+def test_build_stats_uses_compile_cache():
+    blqs.clear_compile_cache()
+    built = blqs.build(_static_and_captured)
+    blqs.build_stats(built)
+    built(1)
+    assert blqs.compile_cache_info().misses == 1
+    assert blqs.compile_cache_info().hits == 1
+
+
+@pytest.mark.parametrize("ast_backend", ["gast", "ast"])
+def test_build_static_native_analysis_matches(ast_backend):
+    static = blqs.build_with_config(blqs.BuildConfig(ast_backend=ast_backend))
+    captured = blqs.build_with_config(
+        blqs.BuildConfig(
+            ast_backend=ast_backend, static_native_analysis=False, native_fast_paths=False
+        )
+    )
+    assert static(_static_and_captured)(4) == captured(_static_and_captured)(4)
+    assert static(_native_and_blqs)(4) == captured(_native_and_blqs)(4)
+    assert static(_all_statements)(0) == captured(_all_statements)(0)
+    assert static(_container_ordering)(1) == captured(_container_ordering)(1)
+    assert isinstance(static(_container_ordering)(1)[0], blqs.If)
+
+
+def test_build_static_native_analysis_shadowed_builtin():
+    def fn():
+        def range(n):  # pylint: disable=redefined-builtin
+            return blqs.Iterable(f"range({n})", blqs.Register("i"))
+
+        for i in range(2):
+            blqs.Op("H")(i)
+
+    assert blqs.build_stats(fn).static_native_sites == 0
+    statements = blqs.build(fn)().statements()
+    assert len(statements) == 1
+    assert isinstance(statements[0], blqs.For)
+
+
+def test_build_cache_results():
+    calls = []
+
+    def fn(n, reverse=False):
+        calls.append(n)
+        for i in reversed(range(n)) if reverse else range(n):
+            blqs.Op("H")(i)
+
+    built_fn = blqs.build_with_config(blqs.BuildConfig(cache_results=True, result_cache_maxsize=2))(
+        fn
+    )
+    program = built_fn(2)
+    assert program == blqs.Program.of(blqs.Op("H")(0), blqs.Op("H")(1))
+    assert program.is_frozen()
+    assert built_fn(2) is program
+    assert built_fn(2, reverse=True) == blqs.Program.of(blqs.Op("H")(1), blqs.Op("H")(0))
+    assert built_fn(2, reverse=True) is not program
+    assert calls == [2, 2]
+    with pytest.raises(ValueError, match="Frozen"):
+        program.append(blqs.Op("X")(0))
+    assert built_fn(2) == blqs.Program.of(blqs.Op("H")(0), blqs.Op("H")(1))
+
+
+def test_build_cache_results_in_block():
+    def fn():
+        blqs.Op("H")(0)
+
+    built_fn = blqs.build_with_config(blqs.BuildConfig(cache_results=True))(fn)
+    with blqs.Program() as program:
+        built_fn()
+        built_fn()
+    assert program == blqs.Program.of(
+        blqs.Block.of(blqs.Op("H")(0)), blqs.Block.of(blqs.Op("H")(0))
+    )
+    assert blqs.result_cache_info(built_fn).misses == 0
+    assert not program[0].is_frozen()
+
+
+def test_build_cache_results_shares_compiled_code():
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.clear_compile_cache()
+    blqs.build(fn)()
+    blqs.build_with_config(blqs.BuildConfig(cache_results=True, result_cache_weak_keys=True))(fn)()
+    assert blqs.compile_cache_info().misses == 1
+
+
+def test_build_config_result_cache_maxsize_invalid():
+    with pytest.raises(ValueError, match="result_cache_maxsize must be non-negative"):
+        blqs.BuildConfig(cache_results=True, result_cache_maxsize=-1)
+
+
+def test_build_emit_calls():
+    calls = []
+
+    @blqs.build_with_config(blqs.BuildConfig(emit_calls=True))
+    def sub(q, label=None):
+        calls.append((q, label))
+        blqs.Op("H")(q)
+
+    @blqs.build
+    def fn():
+        for _ in range(3):
+            sub(0)
+        sub(1, label="a")
+
+    program = fn()
+    assert len(program) == 4
+    assert all(isinstance(s, blqs.Call) for s in program)
+    body = blqs.Block.of(blqs.Op("H")(0))
+    assert program[0] == blqs.Call("sub", body, (0,))
+    assert program[0].block() is program[1].block() is program[2].block()
+    assert program[3] == blqs.Call("sub", blqs.Block.of(blqs.Op("H")(1)), (1,), {"label": "a"})
+    assert calls == [(0, None), (1, "a")]
+
+
+def test_build_emit_calls_outside_block():
+    @blqs.build_with_config(blqs.BuildConfig(emit_calls=True))
+    def sub(q):
+        blqs.Op("H")(q)
+
+    program = sub(0)
+    assert program == blqs.Program.of(blqs.Op("H")(0))
+    assert not program.is_frozen()
+    with blqs.Block() as b:
+        body = sub(0)
+    assert b == blqs.Block.of(blqs.Call("sub", body, (0,)))
+    assert body == blqs.Block.of(blqs.Op("H")(0))
+
+
+def test_build_emit_calls_returns_value():
+    @blqs.build_with_config(blqs.BuildConfig(emit_calls=True))
+    def sub():
+        blqs.Op("H")(0)
+        return 1
+
+    with pytest.raises(ValueError, match="must not return a value"):
+        with blqs.Block():
+            sub()
+
+
+def test_build_emit_calls_with_cache_results():
+    @blqs.build_with_config(blqs.BuildConfig(emit_calls=True, cache_results=True))
+    def sub(q):
+        blqs.Op("H")(q)
+
+    assert sub(0) is sub(0)
+    with blqs.Block() as b:
+        sub(0)
+    assert b[0].block() == sub(0)
+
+
+def test_build_emit_calls_list_args():
+    calls = []
+
+    @blqs.build_with_config(blqs.BuildConfig(emit_calls=True))
+    def layer(qubits):
+        calls.append(qubits)
+        for q in qubits:
+            blqs.Op("H")(q)
+
+    @blqs.build
+    def fn():
+        layer([0, 1])
+        layer([0, 1])
+
+    program = fn()
+    assert program[0].block() is program[1].block()
+    assert program[0].args() == ((0, 1),)
+    assert calls == [[0, 1]]
+    assert hash(program.freeze())
+
+    @blqs.build_with_config(blqs.BuildConfig(cache_results=True))
+    def cached_fn(n):
+        for _ in range(n):
+            layer([0, 1])
+
+    cached = cached_fn(3)
+    assert cached.is_frozen()
+    assert cached_fn(3) is cached
+    assert cached[0].block() is cached[2].block() is program[0].block()
+    assert calls == [[0, 1]]
+
+
+def test_build_cache_results_unhashable_statements():
+    calls = []
+
+    @blqs.build_with_config(blqs.BuildConfig(cache_results=True))
+    def fn():
+        calls.append(1)
+        blqs.Op("H")([0, 1])
+
+    program = fn()
+    assert program == blqs.Program.of(blqs.Op("H")([0, 1]))
+    assert not program.is_frozen()
+    program.append(blqs.Op("X")(0))
+    assert fn() == blqs.Program.of(blqs.Op("H")([0, 1]))
+    assert calls == [1, 1]
+    assert blqs.result_cache_info(fn).currsize == 0
+
+
+def test_build_cache_results_returned_values():
+    @blqs.build_with_config(blqs.BuildConfig(cache_results=True))
+    def mutable_fn():
+        return [1]
+
+    result = mutable_fn()
+    result.append(2)
+    assert mutable_fn() == [1]
+
+    @blqs.build_with_config(blqs.BuildConfig(cache_results=True))
+    def immutable_fn():
+        return (1, "a")
+
+    assert immutable_fn() is immutable_fn()
+    assert blqs.result_cache_info(mutable_fn).currsize == 0
+    assert blqs.result_cache_info(immutable_fn).currsize == 1
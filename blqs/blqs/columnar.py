@@ -0,0 +1,238 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Columnar storage of the statements of large blocks.
+
+A block of millions of instructions stored as a list of `blqs.Instruction`s holds an object and a
+tuple of targets for each of them. Columnar storage instead stores each distinct op and target
+once, in tables, and each instruction as the index of its op in the op table and the indices of
+its targets in the target table, in arrays of machine integers.
+"""
+
+from __future__ import annotations
+
+import array
+import collections.abc
+import itertools
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Tuple, TYPE_CHECKING
+
+from blqs import instruction, register, statement
+
+if TYPE_CHECKING:
+    import blqs  # coverage: ignore
+
+
+class ColumnarStatements(collections.abc.Sequence):
+    """The statements of a block, with its instructions stored in columns.
+
+    Each statement has a code. Instructions have the index of their op in the op table as their
+    code, and the indices of their targets in the target table, stored consecutively in a flat
+    array. The targets of the statement at index `i` are at the indices from `offsets[i]` to
+    `offsets[i + 1]` of this flat array. Other statements, and instructions which are instances of
+    subclasses of `blqs.Instruction` or have unhashable ops or targets, are stored as they are, and
+    their code is the negative of one more than their index in the list of such statements.
+
+    Instructions are created when they are accessed, so accessing the same instruction twice
+    returns equal, but not identical, instructions. Ops and targets which are equal and of the same
+    type are stored once, and so are shared by the instructions created from them.
+
+    This is the storage of the blocks created with `blqs.Block(columnar=True)`, and is not
+    typically used directly.
+    """
+
+    __slots__ = (
+        "_codes",
+        "_offsets",
+        "_flat_targets",
+        "_ops",
+        "_op_ids",
+        "_targets",
+        "_target_ids",
+        "_others",
+        "_frozen",
+    )
+
+    def __init__(self, statements: Iterable[Any] = ()):
+        # Indices into the tables are 32 bit, and offsets into the flat targets 64 bit.
+        self._codes = array.array("i")
+        self._offsets = array.array("q", (0,))
+        self._flat_targets = array.array("i")
+        self._ops: List[blqs.Op] = []
+        self._op_ids: Dict[Hashable, int] = {}
+        self._targets: List[Any] = []
+        self._target_ids: Dict[Hashable, int] = {}
+        self._others: List[Any] = []
+        self._frozen = False
+        self.extend(statements)
+
+    def append(self, stmt: Any):
+        if self._frozen:
+            raise ValueError("Frozen blocks cannot be modified.")
+        if stmt.__class__ is instruction.Instruction:
+            try:
+                op_id = self._id(stmt.op(), self._ops, self._op_ids)
+                targets, target_ids = self._targets, self._target_ids
+                ids = []
+                for target in stmt.targets():
+                    key = _target_key(target)
+                    target_id = target_ids.get(key)
+                    if target_id is None:
+                        target_id = target_ids[key] = len(targets)
+                        targets.append(target)
+                    ids.append(target_id)
+            except TypeError:
+                # Unhashable ops and targets are not stored in the tables.
+                pass
+            else:
+                self._codes.append(op_id)
+                self._flat_targets.extend(ids)
+                self._offsets.append(len(self._flat_targets))
+                return
+        self._others.append(stmt)
+        self._codes.append(-len(self._others))
+        self._offsets.append(len(self._flat_targets))
+
+    def extend(self, statements: Iterable[Any]):
+        for stmt in statements:
+            self.append(stmt)
+
+    @staticmethod
+    def _id(value: Any, table: List[Any], ids: Dict[Hashable, int]) -> int:
+        key = (value.__class__, value)
+        value_id = ids.get(key)
+        if value_id is None:
+            value_id = ids[key] = len(table)
+            table.append(value)
+        return value_id
+
+    def freeze(self):
+        """Freezes the statements which are not stored in columns, and prevents appending."""
+        if not self._frozen:
+            for stmt in self._others:
+                if isinstance(stmt, statement.Statement):
+                    stmt.freeze()
+            self._frozen = True
+
+    def is_frozen(self) -> bool:
+        return self._frozen
+
+    def num_instructions(self) -> int:
+        """The number of instructions stored in columns."""
+        return len(self._codes) - len(self._others)
+
+    def ops(self) -> Tuple[blqs.Op, ...]:
+        """The table of the distinct ops of the instructions stored in columns."""
+        return tuple(self._ops)
+
+    def op_counts(self) -> Dict[blqs.Op, int]:
+        """The number of instructions stored in columns with each op, without creating them."""
+        counts = collections.Counter(self._codes)
+        return {self._ops[code]: count for code, count in counts.items() if code >= 0}
+
+    def _statement(self, index: int) -> Any:
+        code = self._codes[index]
+        if code < 0:
+            return self._others[-code - 1]
+        targets = self._targets
+        return instruction.Instruction._from_fields(
+            self._ops[code],
+            tuple(
+                targets[t]
+                for t in self._flat_targets[self._offsets[index] : self._offsets[index + 1]]
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._statement(i) for i in range(*key.indices(len(self._codes)))]
+        if key < 0:
+            key += len(self._codes)
+        if not 0 <= key < len(self._codes):
+            raise IndexError("statement index out of range")
+        return self._statement(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        ops, targets, others = self._ops, self._targets, self._others
+        flat_targets = self._flat_targets
+        from_fields = instruction.Instruction._from_fields
+        start = 0
+        # The offsets after the first are the ends of the targets of each statement.
+        for code, end in zip(self._codes, itertools.islice(self._offsets, 1, None)):
+            if code < 0:
+                yield others[-code - 1]
+            else:
+                yield from_fields(ops[code], tuple([targets[t] for t in flat_targets[start:end]]))
+            start = end
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnarStatements):
+            if self._ops == other._ops and self._targets == other._targets:
+                return (
+                    self._codes == other._codes
+                    and self._offsets == other._offsets
+                    and self._flat_targets == other._flat_targets
+                    and self._others == other._others
+                )
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore
+
+    def __getstate__(self):
+        # The indices of the ops and targets are computed again from the tables when unpickling.
+        return (
+            self._codes,
+            self._offsets,
+            self._flat_targets,
+            self._ops,
+            self._targets,
+            self._others,
+            self._frozen,
+        )
+
+    def __setstate__(self, state):
+        (
+            self._codes,
+            self._offsets,
+            self._flat_targets,
+            self._ops,
+            self._targets,
+            self._others,
+            self._frozen,
+        ) = state
+        self._op_ids = {(op.__class__, op): i for i, op in enumerate(self._ops)}
+        self._target_ids = {_target_key(t): i for i, t in enumerate(self._targets)}
+
+    def __repr__(self) -> str:
+        return f"blqs.ColumnarStatements({list(self)!r})"
+
+
+def _target_key(target: Any) -> Hashable:
+    """The key of a target in the table of targets of `ColumnarStatements`."""
+    cls = target.__class__
+    if cls is register.Register:
+        # Registers are equal if their names are, so their flags are part of the key.
+        return (
+            cls,
+            target.name(),
+            target._is_readable_(),
+            target._is_writable_(),
+            target._is_deletable_(),
+        )
+    # The type is part of the key so that, for example, targets 1 and True are not shared.
+    return cls, target
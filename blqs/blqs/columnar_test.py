@@ -0,0 +1,209 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import pickle
+
+import pymore
+import pytest
+
+import blqs
+
+H = blqs.Op("H")
+X = blqs.Op("X")
+
+
+def _statements():
+    with blqs.Block() as block:
+        H(0)
+        X(blqs.Register("a"), 1)
+        statement = blqs.If(blqs.Register("b"))
+        H()
+        H(0)
+    with statement.if_block():
+        H(2)
+    return block.statements()
+
+
+def test_columnar_statements():
+    statements = _statements()
+    columnar = blqs.ColumnarStatements(statements)
+    assert len(columnar) == 5
+    assert list(columnar) == list(statements)
+    assert columnar == statements
+    assert columnar == list(statements)
+    assert [columnar[i] for i in range(5)] == list(statements)
+    assert columnar[-1] == H(0)
+    assert columnar[1:4] == list(statements[1:4])
+    assert columnar[::-2] == list(statements[::-2])
+    with pytest.raises(IndexError):
+        _ = columnar[5]
+    with pytest.raises(IndexError):
+        _ = columnar[-6]
+
+
+def test_columnar_statements_tables():
+    statements = _statements()
+    columnar = blqs.ColumnarStatements(statements)
+    assert columnar.ops() == (H, X)
+    assert columnar.num_instructions() == 4
+    assert columnar.op_counts() == {H: 3, X: 1}
+    # The If is stored as it is.
+    assert columnar[2] is statements[2]
+
+
+def test_columnar_statements_shares_targets():
+    columnar = blqs.ColumnarStatements()
+    register = blqs.Register("a")
+    columnar.append(H(register))
+    columnar.append(X(blqs.Register("a")))
+    assert columnar[0].targets()[0] is register
+    assert columnar[1].targets()[0] is register
+
+
+def test_columnar_statements_register_flags():
+    columnar = blqs.ColumnarStatements()
+    columnar.append(H(blqs.Register("a")))
+    columnar.append(H(blqs.Register("a", is_readable=False)))
+    assert [blqs.is_readable(s.targets()[0]) for s in columnar] == [True, False]
+    copied = pickle.loads(pickle.dumps(columnar))
+    copied.append(H(blqs.Register("a", is_readable=False)))
+    assert [blqs.is_readable(s.targets()[0]) for s in copied] == [True, False, False]
+
+
+def test_columnar_statements_target_types():
+    columnar = blqs.ColumnarStatements([H(1), H(True), H(1.0)])
+    assert [type(s.targets()[0]) for s in columnar] == [int, bool, float]
+
+
+def test_columnar_statements_not_stored_in_columns():
+    class MyInstruction(blqs.Instruction):
+        pass
+
+    unhashable = H([0])
+    subclass = MyInstruction(H, 0)
+    columnar = blqs.ColumnarStatements([unhashable, subclass, "a"])
+    assert columnar.num_instructions() == 0
+    assert columnar[0] is unhashable
+    assert columnar[1] is subclass
+    assert list(columnar) == [unhashable, subclass, "a"]
+
+
+def test_columnar_statements_instructions_not_added_to_block():
+    columnar = blqs.ColumnarStatements([H(0)])
+    with blqs.Block() as block:
+        _ = columnar[0]
+        _ = list(columnar)
+    assert not block
+
+
+def test_columnar_statements_eq():
+    eq = pymore.EqualsTester()
+    eq.make_equality_group(lambda: blqs.ColumnarStatements(_statements()))
+    eq.make_equality_group(lambda: blqs.ColumnarStatements([H(0), H(1)]))
+    eq.make_equality_group(lambda: blqs.ColumnarStatements([H(0), X(1)]))
+    eq.make_equality_group(lambda: blqs.ColumnarStatements([H(0), H(1), H(0)]))
+    eq.make_equality_group(lambda: blqs.ColumnarStatements([X(1), H(0)]))
+
+
+def test_columnar_statements_eq_different_tables():
+    # The ops and targets are in the tables in different orders.
+    c1 = blqs.ColumnarStatements([H(0), X(1), H(0)])
+    c2 = blqs.ColumnarStatements([X(1), H(0)])
+    c2.extend([X(1), H(0)])
+    c3 = blqs.ColumnarStatements([X(1)])
+    c3.extend([H(0), X(1), H(0)])
+    assert c1 != c2
+    assert blqs.ColumnarStatements(c2[1:]) == c1
+    assert c2 == c3
+
+
+def test_columnar_statements_unhashable():
+    with pytest.raises(TypeError):
+        hash(blqs.ColumnarStatements())
+
+
+def test_columnar_statements_freeze():
+    columnar = blqs.ColumnarStatements(_statements())
+    columnar.freeze()
+    assert columnar.is_frozen()
+    assert columnar[2].if_block().is_frozen()
+    with pytest.raises(ValueError, match="Frozen"):
+        columnar.append(H(0))
+
+
+def test_columnar_statements_copy_and_pickle():
+    columnar = blqs.ColumnarStatements(_statements())
+    for copied in (copy.deepcopy(columnar), pickle.loads(pickle.dumps(columnar))):
+        assert copied == columnar
+        copied.append(H(0))
+        copied.append(blqs.Op("Y")(5))
+        assert copied.ops() == (H, X, blqs.Op("Y"))
+        assert copied[-2:] == [H(0), blqs.Op("Y")(5)]
+
+
+def test_columnar_statements_repr():
+    assert repr(blqs.ColumnarStatements(["a", "b"])) == "blqs.ColumnarStatements(['a', 'b'])"
+
+
+def test_columnar_block():
+    with blqs.Program(columnar=True) as program:
+        H(0)
+        X(1)
+        with blqs.Block():
+            H(2)
+    assert program.is_columnar()
+    assert program == blqs.Program.of(H(0), X(1), blqs.Block.of(H(2)))
+    assert blqs.Program.of(H(0), X(1), blqs.Block.of(H(2))) == program
+    assert hash(program) == hash(blqs.Program.of(H(0), X(1), blqs.Block.of(H(2))))
+    assert str(program) == "H 0\nX 1\n  H 2"
+    assert not blqs.Block().is_columnar()
+    assert program.statements_view()[1:] == (X(1), blqs.Block.of(H(2)))
+
+
+def test_columnar_block_freeze():
+    with blqs.Program(columnar=True) as program:
+        H(0)
+        with blqs.Block():
+            H(2)
+    program.freeze()
+    assert program.is_frozen()
+    assert program.is_columnar()
+    assert program[1].is_frozen()
+    assert hash(program) == hash(blqs.Program.of(H(0), blqs.Block.of(H(2))))
+    with pytest.raises(ValueError, match="Frozen"):
+        program.append(H(0))
+
+
+def test_columnar_block_pickle():
+    with blqs.Program(columnar=True) as program:
+        H(0)
+        X(blqs.Register("a"))
+    unpickled = pickle.loads(pickle.dumps(program))
+    assert unpickled == program
+    assert unpickled.is_columnar()
+
+
+def test_columnar_block_build():
+    @blqs.build
+    def builder():
+        H(0)
+        for i in range(3):
+            X(i)
+
+    with blqs.Program(columnar=True) as program:
+        builder()
+    (block,) = program
+    assert block.is_columnar()
+    assert block == blqs.Block.of(H(0), X(0), X(1), X(2))
+    assert not builder().is_columnar()
@@ -0,0 +1,259 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A cache of the code produced by compiling `blqs.build` functions."""
+
+import collections
+import dataclasses
+import inspect
+import linecache
+import threading
+import types
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from blqs import stats as stats_lib
+
+DEFAULT_MAXSIZE = 1024
+
+
+@dataclasses.dataclass(frozen=True)
+class CompileCacheInfo:
+    """Statistics about the compile cache.
+
+    Attributes:
+        hits: The number of builder calls that reused already compiled code. This includes calls
+            which waited for another thread to finish compiling the builder.
+        misses: The number of builder calls that had to compile the builder.
+        maxsize: The maximum number of compiled builders held in the cache. When this is exceeded
+            the least recently used compiled builder is evicted.
+        currsize: The number of compiled builders currently held in the cache.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _CompiledBuilder:
+    """The result of compiling a `blqs.build` function."""
+
+    def __init__(
+        self,
+        code: types.CodeType,
+        line_map_fn: Callable[[], Dict[int, int]],
+        filename: str,
+        source: Optional[str] = None,
+        stats: Optional[stats_lib.BuildStats] = None,
+    ):
+        """Initialize the compiled builder.
+
+        Args:
+            code: The code object of the transformed function. This is bound to the globals and
+                closure of the original function before being called.
+            line_map_fn: Called to produce the map from line numbers in the generated code to the
+                line numbers (relative to the start of the function) in the original code. This
+                is only needed when an exception is raised, so it is computed lazily.
+            filename: The filename of the generated code.
+            source: If supplied, the generated source code. This is registered with `linecache`
+                under `filename` so that tracebacks through the generated code show its source,
+                until `release` is called.
+            stats: Statistics about the generated code.
+        """
+        self.code = code
+        self.filename = filename
+        self.source = source
+        self.stats = stats
+        self._line_map_fn: Optional[Callable[[], Dict[int, int]]] = line_map_fn
+        self._line_map: Optional[Dict[int, int]] = None
+        if source is not None:
+            # An mtime of None marks the entry as not backed by a file, so `linecache.checkcache`
+            # leaves it alone.
+            linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+            self._registered_source = True
+        else:
+            self._registered_source = False
+
+    def line_map(self) -> Dict[int, int]:
+        if self._line_map is None:
+            assert self._line_map_fn is not None
+            self._line_map = self._line_map_fn()
+            self._line_map_fn = None
+        return self._line_map
+
+    def release(self):
+        """Releases the resources held for the generated code outside of this object."""
+        if self._registered_source:
+            linecache.cache.pop(self.filename, None)
+            self._registered_source = False
+
+
+class _InFlight:
+    """A compilation in progress, which threads needing the same compiled builder wait for."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.entry: Optional[_CompiledBuilder] = None
+
+
+class _CompileCache:
+    """A least recently used cache from a function's code object and build config to compiled code.
+
+    Evicted compiled builders are released, so that the memory held by the cache, including the
+    generated source registered for tracebacks, stays bounded in long lived processes.
+
+    The cache is thread safe, and does not rely on the global interpreter lock to be. Each builder
+    is compiled at most once at a time: when several threads need the same compiled builder, one
+    compiles it and the others wait for it. Different builders compile concurrently.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self._entries: collections.OrderedDict[Tuple[types.CodeType, Hashable], _CompiledBuilder]
+        self._entries = collections.OrderedDict()
+        self._in_flight: Dict[Tuple[types.CodeType, Hashable], _InFlight] = {}
+        # Guards all of the above and below, but is not held while compiling.
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_compile(
+        self,
+        code: types.CodeType,
+        config_key: Hashable,
+        compile_fn: Callable[[], _CompiledBuilder],
+    ) -> _CompiledBuilder:
+        """Returns the cached compilation for the given key, compiling it if it is not present.
+
+        If another thread is already compiling the function with this configuration, this waits
+        for it to finish and returns its result instead of compiling it again. If that compilation
+        raises, the exception is raised in the thread that compiled it, and the waiting threads
+        try again.
+
+        Args:
+            code: The code object of the function being built.
+            config_key: A hashable key for the configuration the function is built with.
+            compile_fn: Called with no arguments to compile the function on a cache miss.
+
+        Returns:
+            The compiled builder.
+        """
+        key = (code, config_key)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._hits += 1
+                    self._entries.move_to_end(key)
+                    return entry
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    self._misses += 1
+                    in_flight = self._in_flight[key] = _InFlight()
+                    break
+            in_flight.done.wait()
+            if in_flight.entry is not None:
+                with self._lock:
+                    self._hits += 1
+                return in_flight.entry
+
+        try:
+            entry = compile_fn()
+        except BaseException:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+            raise
+        in_flight.entry = entry
+        with self._lock:
+            del self._in_flight[key]
+            self._entries[key] = entry
+            self._evict()
+        in_flight.done.set()
+        return entry
+
+    def info(self) -> CompileCacheInfo:
+        with self._lock:
+            return CompileCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._maxsize,
+                currsize=len(self._entries),
+            )
+
+    def set_maxsize(self, maxsize: int):
+        if maxsize < 0:
+            raise ValueError(f"Compile cache maxsize must be non-negative, was {maxsize}.")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self, code: Optional[types.CodeType] = None):
+        with self._lock:
+            if code is None:
+                for entry in self._entries.values():
+                    entry.release()
+                self._entries.clear()
+                self._hits = 0
+                self._misses = 0
+                return
+            for key in [k for k in self._entries if k[0] is code]:
+                self._entries.pop(key).release()
+
+    def _evict(self):
+        """Evicts the least recently used entries beyond the maximum size. Requires the lock."""
+        while len(self._entries) > self._maxsize:
+            _, entry = self._entries.popitem(last=False)
+            entry.release()
+
+
+_default_compile_cache = _CompileCache()
+
+
+def compile_cache_info() -> CompileCacheInfo:
+    """Returns the hit and miss statistics of the global compile cache.
+
+    The first call of a function built with `blqs.build` (or `blqs.build_with_config`) transforms
+    and compiles the function. This compiled code is cached, keyed on the function's code object
+    and the build configuration, and later calls reuse it.
+    """
+    return _default_compile_cache.info()
+
+
+def clear_compile_cache(func: Optional[Callable] = None):
+    """Invalidates compiled code in the global compile cache.
+
+    Args:
+        func: If supplied, only the compiled code for this function is invalidated. This can be
+            either the original function or the function returned by `blqs.build`. If not
+            supplied, the entire cache is cleared and its statistics are reset.
+    """
+    if func is None:
+        _default_compile_cache.clear()
+        return
+    _default_compile_cache.clear(inspect.unwrap(func).__code__)
+
+
+def set_compile_cache_maxsize(maxsize: int):
+    """Sets the maximum number of compiled builders held by the global compile cache.
+
+    If the cache currently holds more than `maxsize` compiled builders, the least recently used
+    ones are evicted. A `maxsize` of zero disables caching, so every call of a builder compiles it.
+
+    Args:
+        maxsize: The maximum number of compiled builders to keep.
+
+    Raises:
+        ValueError: If `maxsize` is negative.
+    """
+    _default_compile_cache.set_maxsize(maxsize)
@@ -0,0 +1,333 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import importlib
+import linecache
+import sys
+import threading
+import time
+
+import pytest
+
+import blqs
+from blqs import compile_cache
+
+build_module = importlib.import_module("blqs.build")
+
+
+def _info(hits, misses, currsize):
+    return blqs.CompileCacheInfo(
+        hits=hits, misses=misses, maxsize=compile_cache.DEFAULT_MAXSIZE, currsize=currsize
+    )
+
+
+def test_compile_cache_hits_and_misses():
+    def fn(x):
+        blqs.Op("H")(x)
+
+    blqs.clear_compile_cache()
+    built_fn = blqs.build(fn)
+    assert built_fn(0) == blqs.Program.of(blqs.Op("H")(0))
+    assert blqs.compile_cache_info() == _info(hits=0, misses=1, currsize=1)
+    assert built_fn(1) == blqs.Program.of(blqs.Op("H")(1))
+    assert built_fn(2) == blqs.Program.of(blqs.Op("H")(2))
+    assert blqs.compile_cache_info() == _info(hits=2, misses=1, currsize=1)
+
+
+def test_compile_cache_shared_across_build_calls():
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.clear_compile_cache()
+    blqs.build(fn)()
+    blqs.build(fn)()
+    assert blqs.compile_cache_info() == _info(hits=1, misses=1, currsize=1)
+
+
+def test_compile_cache_keyed_on_config():
+    def fn():
+        a = blqs.Register("a")
+        blqs.Op("H")(a)
+
+    blqs.clear_compile_cache()
+    assert blqs.build(fn)() == blqs.Program.of(
+        blqs.Assign(("a",), blqs.Register("a")), blqs.Op("H")(blqs.Register("a"))
+    )
+    no_assign_fn = blqs.build_with_config(blqs.BuildConfig(support_assign=False))(fn)
+    assert no_assign_fn() == blqs.Program.of(blqs.Op("H")(blqs.Register("a")))
+    assert blqs.compile_cache_info() == _info(hits=0, misses=2, currsize=2)
+
+
+def test_compile_cache_config_key_computed_once(monkeypatch):
+    def fn():
+        blqs.Op("H")(0)
+
+    calls = []
+    key = blqs.BuildConfig._key
+
+    def counting_key(self):
+        calls.append(self)
+        return key(self)
+
+    monkeypatch.setattr(blqs.BuildConfig, "_key", counting_key)
+    built_fn = blqs.build(fn)
+    for _ in range(3):
+        assert built_fn() == blqs.Program.of(blqs.Op("H")(0))
+    assert len(calls) == 1
+
+
+def test_compile_cache_rebinds_closure():
+    def make_fn(x):
+        def fn():
+            blqs.Op("H")(x)
+
+        return fn
+
+    blqs.clear_compile_cache()
+    assert blqs.build(make_fn(0))() == blqs.Program.of(blqs.Op("H")(0))
+    assert blqs.build(make_fn(1))() == blqs.Program.of(blqs.Op("H")(1))
+    assert blqs.compile_cache_info() == _info(hits=1, misses=1, currsize=1)
+
+
+def test_clear_compile_cache_for_function():
+    def fn():
+        blqs.Op("H")(0)
+
+    def other_fn():
+        blqs.Op("H")(1)
+
+    blqs.clear_compile_cache()
+    built_fn = blqs.build(fn)
+    built_fn()
+    blqs.build(other_fn)()
+    assert blqs.compile_cache_info().currsize == 2
+
+    blqs.clear_compile_cache(built_fn)
+    assert blqs.compile_cache_info().currsize == 1
+    blqs.clear_compile_cache(other_fn)
+    assert blqs.compile_cache_info().currsize == 0
+
+    assert built_fn() == blqs.Program.of(blqs.Op("H")(0))
+    assert blqs.compile_cache_info() == _info(hits=0, misses=3, currsize=1)
+
+
+def test_clear_compile_cache():
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.build(fn)()
+    blqs.clear_compile_cache()
+    assert blqs.compile_cache_info() == _info(hits=0, misses=0, currsize=0)
+
+
+def test_compile_cache_does_not_grow_sys_modules():
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.clear_compile_cache()
+    num_modules = len(sys.modules)
+    for _ in range(3):
+        blqs.clear_compile_cache()
+        blqs.build(fn)()
+    assert len(sys.modules) == num_modules
+
+
+def test_compile_cache_maxsize_evicts_least_recently_used():
+    def fn0():
+        blqs.Op("H")(0)
+
+    def fn1():
+        blqs.Op("H")(1)
+
+    def fn2():
+        blqs.Op("H")(2)
+
+    blqs.clear_compile_cache()
+    try:
+        blqs.set_compile_cache_maxsize(2)
+        blqs.build(fn0)()
+        blqs.build(fn1)()
+        blqs.build(fn0)()
+        blqs.build(fn2)()
+        assert blqs.compile_cache_info() == blqs.CompileCacheInfo(
+            hits=1, misses=3, maxsize=2, currsize=2
+        )
+        # fn1 was the least recently used, so it was evicted.
+        blqs.build(fn0)()
+        blqs.build(fn2)()
+        blqs.build(fn1)()
+        assert blqs.compile_cache_info() == blqs.CompileCacheInfo(
+            hits=3, misses=4, maxsize=2, currsize=2
+        )
+    finally:
+        blqs.set_compile_cache_maxsize(compile_cache.DEFAULT_MAXSIZE)
+
+
+def test_compile_cache_zero_maxsize():
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.clear_compile_cache()
+    try:
+        blqs.set_compile_cache_maxsize(0)
+        assert blqs.build(fn)() == blqs.Program.of(blqs.Op("H")(0))
+        assert blqs.build(fn)() == blqs.Program.of(blqs.Op("H")(0))
+        assert blqs.compile_cache_info() == blqs.CompileCacheInfo(
+            hits=0, misses=2, maxsize=0, currsize=0
+        )
+    finally:
+        blqs.set_compile_cache_maxsize(compile_cache.DEFAULT_MAXSIZE)
+
+
+def test_compile_cache_negative_maxsize():
+    with pytest.raises(ValueError, match="non-negative"):
+        blqs.set_compile_cache_maxsize(-1)
+
+
+def test_compile_cache_generated_source_in_linecache():
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.clear_compile_cache()
+    built_fn = blqs.build_with_config(blqs.BuildConfig(debug_generated_code=True))(fn)
+    built_fn()
+    filename = next(
+        f for f in linecache.cache if isinstance(f, str) and f.startswith("<blqs generated")
+    )
+    assert "fn" in filename
+    assert any("H" in line for line in linecache.getlines(filename))
+    linecache.checkcache()
+    assert linecache.getlines(filename)
+
+    blqs.clear_compile_cache(built_fn)
+    assert filename not in linecache.cache
+
+
+def test_compile_cache_single_flight_stress(monkeypatch):
+    def fn(x):
+        blqs.Op("H")(x)
+        if blqs.Register("a"):
+            blqs.Op("X")(x)
+
+    num_threads = 64
+    num_calls = 20
+    compiles = []
+    transform_and_compile = build_module._transform_and_compile
+
+    def slow_transform_and_compile(*args):
+        compiles.append(threading.current_thread())
+        # Give the other threads time to find the builder is being compiled.
+        time.sleep(0.05)
+        return transform_and_compile(*args)
+
+    monkeypatch.setattr(build_module, "_transform_and_compile", slow_transform_and_compile)
+    blqs.clear_compile_cache()
+    built_fn = blqs.build(fn)
+    barrier = threading.Barrier(num_threads)
+    results = {}
+    errors = []
+
+    def call(index):
+        try:
+            barrier.wait()
+            results[index] = [built_fn(i) for i in range(num_calls)]
+        except Exception as e:  # coverage: ignore
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(compiles) == 1
+    expected = [blqs.build(fn)(i) for i in range(num_calls)]
+    assert all(results[index] == expected for index in range(num_threads))
+    assert blqs.compile_cache_info() == _info(
+        hits=num_threads * num_calls - 1 + num_calls, misses=1, currsize=1
+    )
+
+
+def test_compile_cache_single_flight_failure():
+    cache = compile_cache._CompileCache()
+    compiling = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def failing_compile():
+        calls.append("fail")
+        compiling.set()
+        release.wait()
+        raise RuntimeError("compile failed")
+
+    def compile_fn():
+        calls.append("compile")
+        return compile_cache._CompiledBuilder(fn.__code__, dict, "file")
+
+    def fn():
+        pass  # coverage: ignore
+
+    results = []
+    errors = []
+
+    def first():
+        try:
+            cache.get_or_compile(fn.__code__, (), failing_compile)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    compiling.wait()
+    waiter = threading.Thread(
+        target=lambda: results.append(cache.get_or_compile(fn.__code__, (), compile_fn))
+    )
+    waiter.start()
+    release.set()
+    thread.join()
+    waiter.join()
+
+    # The waiting thread compiles the builder itself when the first compilation fails.
+    assert calls == ["fail", "compile"]
+    assert len(errors) == 1
+    assert results[0].filename == "file"
+    assert cache.info() == blqs.CompileCacheInfo(
+        hits=0, misses=2, maxsize=compile_cache.DEFAULT_MAXSIZE, currsize=1
+    )
+
+
+def test_compile_cache_compiles_different_builders_concurrently():
+    cache = compile_cache._CompileCache()
+    second_compiled = threading.Event()
+
+    def fn0():
+        pass  # coverage: ignore
+
+    def fn1():
+        pass  # coverage: ignore
+
+    def compile_fn0():
+        # This would time out if compiling fn1 waited for this to finish.
+        assert second_compiled.wait(timeout=10)
+        return compile_cache._CompiledBuilder(fn0.__code__, dict, "file0")
+
+    def compile_fn1():
+        second_compiled.set()
+        return compile_cache._CompiledBuilder(fn1.__code__, dict, "file1")
+
+    thread = threading.Thread(target=lambda: cache.get_or_compile(fn0.__code__, (), compile_fn0))
+    thread.start()
+    assert cache.get_or_compile(fn1.__code__, (), compile_fn1).filename == "file1"
+    thread.join()
+    assert cache.info().currsize == 2
@@ -14,7 +14,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
-from blqs import block, protocols, statement
+from blqs import block, printer, protocols, serialization, statement
 
 
 if TYPE_CHECKING:
@@ -22,6 +22,8 @@ if TYPE_CHECKING:
 
 
 class If(statement.Statement):
+    __slots__ = ("_condition", "_if_block", "_else_block")
+
     def __init__(self, condition: blqs.SupportsIsReadable):
         super().__init__()
         assert protocols.is_readable(condition), (
@@ -41,10 +43,19 @@ class If(statement.Statement):
     def else_block(self) -> blqs.Block:
         return self._else_block
 
-    def __str__(self):
-        if_str = f"if {self._condition}:\n{self._if_block}"
-        else_str = f"\nelse:\n{self._else_block}"
-        return if_str + else_str if self._else_block else if_str
+    def freeze(self) -> If:
+        self._if_block.freeze()
+        self._else_block.freeze()
+        return self
+
+    __str__ = printer.print_str
+
+    def _print_(self, p: printer.Printer):
+        p.write(f"if {self._condition}:\n")
+        p.print(self._if_block)
+        if self._else_block:
+            p.write("\nelse:\n")
+            p.print(self._else_block)
 
     def __eq__(self, other):
         if not isinstance(other, type(self)):
@@ -57,3 +68,14 @@ class If(statement.Statement):
 
     def __hash__(self):
         return hash((self._condition, self._if_block, self._else_block))
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is If:
+            return serialization.loads_statement, (serialization.dumps_statement(self),)
+        return super().__reduce_ex__(protocol)
+
+    def __copy__(self):
+        return statement.copy_statement(self)
+
+    def __deepcopy__(self, memo):
+        return statement.copy_statement(self, memo)
@@ -66,3 +66,12 @@ def test_if_context_manager():
     expected.if_block().append(s1)
     expected.else_block().append(s2)
     assert b == expected
+
+
+def test_if_freeze():
+    statement = blqs.If(blqs.Register("a"))
+    with statement.if_block():
+        blqs.Op("H")(0)
+    assert statement.freeze() is statement
+    assert statement.if_block().is_frozen()
+    assert statement.else_block().is_frozen()
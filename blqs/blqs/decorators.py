@@ -11,15 +11,18 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import collections
 import dataclasses
 import inspect
+import operator
+import threading
 import types
-from typing import Any, Callable, Dict, Iterable, Sequence, Set
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Set, Tuple
 
 import gast
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True)
 class DecoratorSpec:
     """Specification of a decorator.
 
@@ -52,7 +55,10 @@ class DecoratorSpec:
 
 
 def _remove_decorators(
-    decorators: Sequence, module_aliases: Iterable[str], method_aliases: Iterable[str]
+    decorators: Sequence,
+    module_aliases: Iterable[str],
+    method_aliases: Iterable[str],
+    ast_module: types.ModuleType = gast,
 ) -> Sequence:
     """Removes decorators specified as a `blqs.DecoratorSpec` from the decorator node list.
 
@@ -76,6 +82,7 @@ def _remove_decorators(
         decorators: The list of AST nodes coming from a function type.
         module_aliases: The matching module aliases to remove.
         method_aliases: The matching method names to remove.
+        ast_module: The module of the AST nodes, either `gast` or `ast`.
 
     Raises:
         ValueError: If there is a decorator after the blqs build decorator.
@@ -85,29 +92,29 @@ def _remove_decorators(
 
     for d in decorators:
         # @build style decorator.
-        if isinstance(d, gast.Name) and d.id in method_aliases:
+        if isinstance(d, ast_module.Name) and d.id in method_aliases:
             break
         # @blqs.build style decorator.
         elif (
-            isinstance(d, gast.Attribute)
+            isinstance(d, ast_module.Attribute)
             and d.attr in method_aliases
-            and isinstance(d.value, gast.Name)
+            and isinstance(d.value, ast_module.Name)
             and d.value.id in module_aliases
         ):
             break
         # @build_with_config(config) style decorator.
         elif (
-            isinstance(d, gast.Call)
-            and isinstance(d.func, gast.Name)
+            isinstance(d, ast_module.Call)
+            and isinstance(d.func, ast_module.Name)
             and d.func.id in method_aliases
         ):
             break
         # @blqs.build_with_config(config) style decorator.
         elif (
-            isinstance(d, gast.Call)
-            and isinstance(d.func, gast.Attribute)
+            isinstance(d, ast_module.Call)
+            and isinstance(d.func, ast_module.Attribute)
             and d.func.attr in method_aliases
-            and isinstance(d.func.value, gast.Name)
+            and isinstance(d.func.value, ast_module.Name)
             and d.func.value.id in module_aliases
         ):
             break
@@ -143,3 +150,67 @@ def _compute_method_aliases(match_decorators, variables: Dict[str, Any]) -> Set:
     method_aliases = get_aliases(lambda o: inspect.isfunction(o) and o in valid_methods)
     method_aliases.update(m.__name__ for m in valid_methods)
     return method_aliases
+
+
+class _AliasCache:
+    """A least recently used cache of the aliases of decorators in globals dictionaries.
+
+    Computing the aliases inspects every value of the globals. The cache is keyed by the identity
+    of the globals dictionary and the decorator specs, and each entry keeps a fingerprint of the
+    globals it was computed from: their keys, and the ids of their values. An entry is only used if
+    the globals still hold the same keys, and values with the same ids, which is much cheaper than
+    recomputing the aliases. Any other change to the globals invalidates the entry.
+
+    Only the ids of the values are kept, so that the cache does not keep the values of the
+    globals alive. An id can be reused by a new value once its value has been collected, but the
+    aliases only depend on which values are the modules and methods of the specs, which are kept
+    alive by the specs in the key, so cannot take the id of another value.
+
+    The cache is thread safe, since builders may be compiled on many threads at once.
+    """
+
+    def __init__(self, maxsize: int):
+        self._entries: collections.OrderedDict[Tuple[int, Tuple[DecoratorSpec, ...]], Tuple]
+        self._entries = collections.OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+
+    def aliases(
+        self, decorator_specs: Sequence[DecoratorSpec], variables: Dict[str, Any]
+    ) -> Tuple[Set[str], Set[str]]:
+        """Returns the module and method aliases of the decorators in `variables`.
+
+        See `_compute_module_aliases` and `_compute_method_aliases`.
+        """
+        key = (id(variables), tuple(decorator_specs))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                keys, value_ids, module_aliases, method_aliases = entry
+                if _unchanged(variables, keys, value_ids):
+                    self._entries.move_to_end(key)
+                    return module_aliases, method_aliases
+        module_aliases = _compute_module_aliases(decorator_specs, variables)
+        method_aliases = _compute_method_aliases(decorator_specs, variables)
+        entry = (list(variables), list(map(id, variables.values())), module_aliases, method_aliases)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return module_aliases, method_aliases
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _unchanged(variables: Dict[str, Any], keys: List[str], value_ids: List[int]) -> bool:
+    return (
+        len(variables) == len(keys)
+        and list(map(id, variables.values())) == value_ids
+        and all(map(operator.is_, variables, keys))
+    )
+
+
+_default_alias_cache = _AliasCache(maxsize=64)
@@ -11,7 +11,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import ast
+import gc
+import threading
 import types
+import weakref
 import pytest
 import gast
 
@@ -67,6 +71,22 @@ def test_remove_decorator_attribute():
         )
 
 
+def test_remove_decorator_ast_nodes():
+    match_node = ast.Attribute(ast.Name("module", ast.Load()), "match", ast.Load())
+    call_node = ast.Call(ast.Name("match", ast.Load()), [], [])
+    nonmatch_node = ast.Name("nonmatch", ast.Load())
+    for node in (match_node, call_node):
+        assert (
+            decorators._remove_decorators(
+                [node], module_aliases=["module"], method_aliases=["match"], ast_module=ast
+            )
+            == []
+        )
+    assert decorators._remove_decorators(
+        [nonmatch_node], module_aliases=["module"], method_aliases=["match"], ast_module=ast
+    ) == [nonmatch_node]
+
+
 def test_remove_decorator_call_name():
     match_node = gast.Call(gast.Name("match", gast.Load(), None, None), [], [])
     nonmatch_node = gast.Call(gast.Name("nonmatch", gast.Load(), None, None), [], [])
@@ -183,3 +203,105 @@ def test_compute_function_aliases_empty():
     base_module.func = func
 
     assert decorators._compute_method_aliases([], locals()) == set()
+
+
+def _alias_cache_variables():
+    base_module = types.ModuleType("my_module")
+
+    def func():
+        pass
+
+    base_module.func = func
+    spec = blqs.DecoratorSpec(module=base_module, method=func)
+    return spec, {"mod": base_module, "func": func, "other": 1}
+
+
+def test_alias_cache_reuses_aliases():
+    cache = decorators._AliasCache(maxsize=2)
+    spec, variables = _alias_cache_variables()
+    module_aliases, method_aliases = cache.aliases([spec], variables)
+    assert module_aliases == {"my_module", "mod"}
+    assert method_aliases == {"func"}
+    again = cache.aliases([spec], variables)
+    assert again[0] is module_aliases and again[1] is method_aliases
+
+
+def test_alias_cache_invalidated_on_mutation():
+    cache = decorators._AliasCache(maxsize=2)
+    spec, variables = _alias_cache_variables()
+    first = cache.aliases([spec], variables)
+
+    # Rebinding a name, without changing the size of the globals.
+    variables["other"] = variables["func"]
+    assert cache.aliases([spec], variables)[1] == {"func", "other"}
+
+    # Adding and removing names.
+    variables["mod_alias"] = variables["mod"]
+    assert cache.aliases([spec], variables)[0] == {"my_module", "mod", "mod_alias"}
+    del variables["mod_alias"]
+    del variables["other"]
+    assert cache.aliases([spec], variables) == first
+
+    # Replacing a name by another of the same value.
+    variables["other_func"] = variables.pop("func")
+    assert cache.aliases([spec], variables)[1] == {"func", "other_func"}
+
+
+def test_alias_cache_keyed_by_specs():
+    cache = decorators._AliasCache(maxsize=2)
+    spec, variables = _alias_cache_variables()
+    assert cache.aliases([spec], variables)[1] == {"func"}
+    assert cache.aliases([], variables) == (set(), set())
+
+
+def test_alias_cache_evicts_least_recently_used():
+    cache = decorators._AliasCache(maxsize=2)
+    spec, first = _alias_cache_variables()
+    _, second = _alias_cache_variables()
+    _, third = _alias_cache_variables()
+    first_aliases = cache.aliases([spec], first)
+    cache.aliases([spec], second)
+    assert cache.aliases([spec], first)[0] is first_aliases[0]
+    cache.aliases([spec], third)
+    # The second globals were evicted, the first were used more recently.
+    assert len(cache._entries) == 2
+    assert cache.aliases([spec], first)[0] is first_aliases[0]
+    cache.clear()
+    assert cache.aliases([spec], first)[0] is not first_aliases[0]
+
+
+def test_alias_cache_does_not_keep_values_alive():
+    class Value:
+        pass
+
+    cache = decorators._AliasCache(maxsize=2)
+    spec, variables = _alias_cache_variables()
+    variables["value"] = Value()
+    ref = weakref.ref(variables["value"])
+    cache.aliases([spec], variables)
+    del variables["value"]
+    gc.collect()
+    assert ref() is None
+
+
+def test_alias_cache_threads():
+    cache = decorators._AliasCache(maxsize=2)
+    spec, _ = _alias_cache_variables()
+    all_variables = [_alias_cache_variables()[1] for _ in range(8)]
+    errors = []
+
+    def run(variables):
+        try:
+            for _ in range(500):
+                for v in (variables, *all_variables[:3]):
+                    assert cache.aliases([spec], v)[1] == {"func"}
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(v,)) for v in all_variables]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache._entries) <= 2
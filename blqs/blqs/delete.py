@@ -13,10 +13,12 @@
 # limitations under the License.
 from typing import Sequence
 
-from blqs import statement
+from blqs import serialization, statement
 
 
 class Delete(statement.Statement):
+    __slots__ = ("_delete_names",)
+
     def __init__(self, delete_names: Sequence[str]):
         super().__init__()
         self._delete_names = delete_names
@@ -34,3 +36,14 @@ class Delete(statement.Statement):
 
     def __str__(self):
         return f"del {', '.join(self._delete_names)}"
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is Delete:
+            return serialization.loads_statement, (serialization.dumps_statement(self),)
+        return super().__reduce_ex__(protocol)
+
+    def __copy__(self):
+        return statement.copy_statement(self)
+
+    def __deepcopy__(self, memo):
+        return statement.copy_statement(self, memo)
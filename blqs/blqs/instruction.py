@@ -12,9 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from __future__ import annotations
-from typing import Tuple, TYPE_CHECKING
+from typing import Iterable, Tuple, TYPE_CHECKING
 
-from blqs import protocols, statement
+from blqs import protocols, serialization, statement
 
 if TYPE_CHECKING:
     import blqs  # coverage: ignore
@@ -27,10 +27,21 @@ class Instruction(statement.Statement):
     on the targets.
     """
 
+    __slots__ = ("_op", "_targets", "__weakref__")
+
     def __init__(self, op: blqs.Op, *targets):
-        super().__init__()
         self._op = op
         self._targets = tuple(targets)
+        # Added to the current block once complete, since columnar blocks read it when added.
+        super().__init__()
+
+    @classmethod
+    def _from_fields(cls, op: blqs.Op, targets: Tuple) -> Instruction:
+        """Creates an instruction, without adding it to the current block."""
+        new_instruction = cls.__new__(cls)
+        new_instruction._op = op
+        new_instruction._targets = targets
+        return new_instruction
 
     def op(self) -> blqs.Op:
         """The `blqs.Op` for this instruction."""
@@ -57,3 +68,65 @@ class Instruction(statement.Statement):
 
     def __hash__(self):
         return hash((self._op, *self._targets))
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is Instruction:
+            return Instruction._from_fields, (self._op, self._targets)
+        return super().__reduce_ex__(protocol)
+
+
+class BroadcastInstruction(statement.Statement):
+    """A `blqs.Op` applied to each of a sequence of targets.
+
+    This is equivalent to the sequence of `blqs.Instruction`s of the op on each target, but is a
+    single statement, so that it is added to the current block once, and stores the targets in a
+    single tuple. Typically these are constructed with `blqs.Op.on_each`:
+
+    ```
+    H = blqs.Op('H')
+    # Equivalent to H(0), H(1), H(2)
+    H.on_each(0, 1, 2)
+    ```
+    """
+
+    __slots__ = ("_op", "_targets")
+
+    def __init__(self, op: blqs.Op, targets: Iterable):
+        self._op = op
+        self._targets = tuple(targets)
+        super().__init__()
+
+    def op(self) -> blqs.Op:
+        """The `blqs.Op` applied to each target."""
+        return self._op
+
+    def targets(self) -> Tuple:
+        """A tuple of the targets the op is applied to, one for each instruction."""
+        return self._targets
+
+    def instructions(self) -> Tuple[Instruction, ...]:
+        """The equivalent instructions, which are not added to the current block."""
+        op = self._op
+        return tuple(Instruction._from_fields(op, (t,)) for t in self._targets)
+
+    def _readable_targets_(self) -> Tuple:
+        return tuple(t for t in self._targets if protocols.is_readable(t))
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def __str__(self):
+        return f"{self._op} on each {', '.join(str(t) for t in self._targets)}"
+
+    def __eq__(self, other):
+        if not isinstance(other, type(self)):
+            return NotImplemented
+        return self._op == other._op and self._targets == other._targets
+
+    def __hash__(self):
+        return hash((self._op, self._targets))
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is BroadcastInstruction:
+            return serialization.loads_statement, (serialization.dumps_statement(self),)
+        return super().__reduce_ex__(protocol)
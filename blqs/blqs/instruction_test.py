@@ -54,3 +54,31 @@ def test_instruction_readable_targets():
     i = blqs.Instruction(blqs.Op("a"), 0, blqs.Register("b"))
     assert i._readable_targets_() == (blqs.Register("b"),)
     assert blqs.readable_targets(i) == (blqs.Register("b"),)
+
+
+def test_broadcast_instruction():
+    op = blqs.Op("a")
+    broadcast = blqs.BroadcastInstruction(op, [0, 1, blqs.Register("b")])
+    assert broadcast.op() == op
+    assert broadcast.targets() == (0, 1, blqs.Register("b"))
+    assert len(broadcast) == 3
+    assert broadcast.instructions() == (op(0), op(1), op(blqs.Register("b")))
+    assert blqs.readable_targets(broadcast) == (blqs.Register("b"),)
+    assert str(broadcast) == "a on each 0, 1, R(b)"
+
+
+def test_broadcast_instruction_added_to_block_once():
+    op = blqs.Op("a")
+    with blqs.Block() as block:
+        broadcast = blqs.BroadcastInstruction(op, range(3))
+        _ = broadcast.instructions()
+    assert block == blqs.Block.of(broadcast)
+
+
+def test_broadcast_instruction_eq():
+    tester = pymore.EqualsTester()
+    tester.make_equality_group(lambda: blqs.BroadcastInstruction(blqs.Op("a"), ()))
+    tester.make_equality_group(lambda: blqs.BroadcastInstruction(blqs.Op("a"), (0, 1)))
+    tester.make_equality_group(lambda: blqs.BroadcastInstruction(blqs.Op("a"), [1, 0]))
+    tester.make_equality_group(lambda: blqs.BroadcastInstruction(blqs.Op("b"), (0, 1)))
+    tester.add_equality_group(blqs.Instruction(blqs.Op("a"), 0, 1))
@@ -0,0 +1,207 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Opt-in interning of instructions, ops and registers.
+
+Large programs repeat the same instructions on the same registers many times. When interning is
+enabled, equal `blqs.Op`s, `blqs.Register`s and the `blqs.Instruction`s created by calling an op
+are shared, so that each distinct one is stored once. The interning table holds its objects
+weakly, so objects no longer used by any program are freed.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import weakref
+from typing import Optional, Tuple, TYPE_CHECKING
+
+from blqs import (
+    block,
+    columnar,
+    conditional,
+    instruction,
+    loops,
+    op,
+    register,
+    statement,
+    subroutine,
+)
+
+if TYPE_CHECKING:
+    import blqs  # coverage: ignore
+
+
+@dataclasses.dataclass(frozen=True)
+class InterningInfo:
+    """Information about the interning table.
+
+    Attributes:
+        enabled: Whether interning is enabled.
+        instructions: The number of distinct instructions in the table.
+        ops: The number of distinct ops in the table.
+        registers: The number of distinct registers in the table.
+    """
+
+    enabled: bool
+    instructions: int
+    ops: int
+    registers: int
+
+
+class _InternTable:
+    """Tables of the interned objects of each kind, holding them weakly."""
+
+    def __init__(self) -> None:
+        self._instructions: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._ops: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._registers: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def instruction(self, op: blqs.Op, targets: Tuple) -> blqs.Instruction:
+        """Returns the interned instruction of the op on the targets, adding it to the block.
+
+        Like creating an instruction, this adds the instruction to the current block, if any.
+        Instructions with unhashable targets are not interned.
+        """
+        # The targets are keyed as in columnar statements, by type, so that for example targets 1
+        # and True are not shared, and registers by their flags as well as their names.
+        key = (type(op), op, tuple(map(columnar._target_key, targets)))
+        try:
+            interned = self._instructions.get(key)
+        except TypeError:
+            return instruction.Instruction(op, *targets)
+        if interned is None:
+            interned = instruction.Instruction(op, *targets)
+            self._instructions[key] = interned
+        else:
+            statement.Statement.__init__(interned)
+        return interned
+
+    def intern(self, new_object):
+        """Returns the interned op or register equal to the newly created `new_object`."""
+        if isinstance(new_object, op.Op):
+            return self._ops.setdefault(new_object.name(), new_object)
+        key = (
+            new_object.name(),
+            new_object._is_readable_(),
+            new_object._is_writable_(),
+            new_object._is_deletable_(),
+        )
+        return self._registers.setdefault(key, new_object)
+
+    def info(self) -> InterningInfo:
+        return InterningInfo(
+            enabled=True,
+            instructions=len(self._instructions),
+            ops=len(self._ops),
+            registers=len(self._registers),
+        )
+
+
+_default_intern_table: Optional[_InternTable] = None
+
+
+def _interned_classes() -> Tuple[type, ...]:
+    """The classes whose construction is interned.
+
+    Subclasses are not interned, since they may have state their equality does not depend on.
+    """
+    return (op.Op, register.Register)
+
+
+def _interning_new(cls, *args, **kwargs):
+    """The `__new__` of the interned classes.
+
+    It is installed when interning is first enabled, so that creating objects does not pay for it
+    otherwise. It stays installed, since the `__new__` of `object` cannot be restored.
+    """
+    new_object = object.__new__(cls)
+    # Unpickling and copying create objects without arguments, and set their state afterwards.
+    if _default_intern_table is None or cls not in _interned_classes() or not (args or kwargs):
+        return new_object
+    # The interned object is initialized again by the constructor, with the same arguments.
+    new_object.__init__(*args, **kwargs)
+    return _default_intern_table.intern(new_object)
+
+
+def enable_interning():
+    """Enables interning of instructions, ops and registers.
+
+    While interning is enabled:
+        * Creating a `blqs.Op` returns the existing op with the same name, if any.
+        * Creating a `blqs.Register` returns the existing register with the same name and the
+          same readable, writable and deletable properties, if any.
+        * Calling an op returns the existing instruction of an equal op on equal targets, of the
+          same types, if any. As when creating an instruction, it is added to the current block.
+          Instructions created directly with `blqs.Instruction` are not interned.
+
+    Sharing objects reduces the memory used by programs which repeat the same instructions, and
+    makes comparing them cheaper, since equal statements are identical. The table holding the
+    interned objects does not keep them alive. Subclasses of `blqs.Op` and `blqs.Register` are
+    not interned.
+
+    Enabling interning when it is already enabled does nothing.
+    """
+    global _default_intern_table
+    if _default_intern_table is None:
+        _default_intern_table = _InternTable()
+        for cls in _interned_classes():
+            if cls.__new__ is not _interning_new:
+                cls.__new__ = _interning_new  # type: ignore
+
+
+def disable_interning():
+    """Disables interning, and forgets the interned objects.
+
+    Objects created while interning was enabled are unchanged, and may still be shared.
+    """
+    global _default_intern_table
+    _default_intern_table = None
+
+
+def interning_info() -> InterningInfo:
+    """Returns information about the interning table."""
+    if _default_intern_table is None:
+        return InterningInfo(enabled=False, instructions=0, ops=0, registers=0)
+    return _default_intern_table.info()
+
+
+def count_distinct_instructions(program: blqs.Block) -> int:
+    """Returns the number of distinct instructions in a block.
+
+    This counts the instructions in the block, and in the blocks of the `blqs.If`, `blqs.For`,
+    `blqs.While` and `blqs.Call` statements and of the blocks nested in it, and counts equal
+    instructions once. The block of a subroutine is counted once however many calls share it. The
+    instructions of a `blqs.BroadcastInstruction` are counted as separate instructions.
+    When the instructions were created with interning enabled, equal instructions are identical,
+    which makes counting them cheaper.
+    """
+    distinct = set()
+    # The ids of the blocks of the subroutines visited, whose calls share them.
+    subroutines = set()
+    blocks = [program]
+    while blocks:
+        for stmt in blocks.pop():
+            if isinstance(stmt, instruction.Instruction):
+                distinct.add(stmt)
+            elif isinstance(stmt, instruction.BroadcastInstruction):
+                distinct.update(stmt.instructions())
+            elif isinstance(stmt, block.Block):
+                blocks.append(stmt)
+            elif isinstance(stmt, conditional.If):
+                blocks.extend((stmt.if_block(), stmt.else_block()))
+            elif isinstance(stmt, (loops.For, loops.While)):
+                blocks.extend((stmt.loop_block(), stmt.else_block()))
+            elif isinstance(stmt, subroutine.Call) and id(stmt.block()) not in subroutines:
+                subroutines.add(id(stmt.block()))
+                blocks.append(stmt.block())
+    return len(distinct)
@@ -0,0 +1,206 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import gc
+import pickle
+
+import pytest
+
+import blqs
+
+
+@pytest.fixture
+def interning():
+    blqs.enable_interning()
+    yield
+    blqs.disable_interning()
+
+
+def test_interning_disabled():
+    assert blqs.interning_info() == blqs.InterningInfo(
+        enabled=False, instructions=0, ops=0, registers=0
+    )
+    assert blqs.Op("H") is not blqs.Op("H")
+    assert blqs.Register("a") is not blqs.Register("a")
+    h = blqs.Op("H")
+    assert h(0) is not h(0)
+
+
+def test_interning_ops(interning):
+    assert blqs.Op("H") is blqs.Op("H")
+    assert blqs.Op(name="H") is blqs.Op("H")
+    assert blqs.Op("H") is not blqs.Op("X")
+    assert blqs.Op("H").name() == "H"
+
+
+def test_interning_registers(interning):
+    assert blqs.Register("a") is blqs.Register("a")
+    assert blqs.Register("a") is not blqs.Register("b")
+    not_readable = blqs.Register("a", is_readable=False)
+    assert not_readable is not blqs.Register("a")
+    assert not blqs.is_readable(not_readable)
+    assert blqs.Register("a", is_readable=False) is not_readable
+
+
+def test_interning_subclasses_not_interned(interning):
+    class MyOp(blqs.Op):
+        pass
+
+    class MyRegister(blqs.Register):
+        pass
+
+    assert MyOp("H") is not MyOp("H")
+    assert MyRegister("a") is not MyRegister("a")
+
+
+def test_interning_instructions(interning):
+    h = blqs.Op("H")
+    assert h(0) is h(0)
+    assert h(blqs.Register("a"), 1) is blqs.Op("H")(blqs.Register("a"), 1)
+    assert h(0) is not h(1)
+    assert h(0) is not blqs.Op("X")(0)
+    # Directly created instructions are not interned.
+    assert blqs.Instruction(h, 0) is not h(0)
+
+
+def test_interning_instructions_targets_of_different_types(interning):
+    h = blqs.Op("H")
+    assert h(1) is not h(True)
+    assert h(True).targets() == (True,)
+    assert type(h(1.0).targets()[0]) == float
+
+
+def test_interning_instructions_register_flags(interning):
+    h = blqs.Op("H")
+    readable = h(blqs.Register("a"))
+    not_readable = h(blqs.Register("a", is_readable=False))
+    assert not_readable is not readable
+    assert blqs.is_readable(readable.targets()[0])
+    assert not blqs.is_readable(not_readable.targets()[0])
+    assert blqs.readable_targets(readable) == (blqs.Register("a"),)
+    assert blqs.readable_targets(not_readable) == ()
+    assert h(blqs.Register("a", is_readable=False)) is not_readable
+
+
+def test_interning_instructions_unhashable_targets(interning):
+    h = blqs.Op("H")
+    assert h([0]) is not h([0])
+    assert h([0]) == h([0])
+
+
+def test_interning_instructions_added_to_block(interning):
+    h = blqs.Op("H")
+    with blqs.Block() as block:
+        h(0)
+        h(1)
+        h(0)
+    assert block == blqs.Block.of(
+        blqs.Instruction(h, 0), blqs.Instruction(h, 1), blqs.Instruction(h, 0)
+    )
+    assert block[0] is block[2]
+
+
+def test_interning_weak(interning):
+    h = blqs.Op("H")
+    instruction = h(blqs.Register("a"))
+    assert blqs.interning_info() == blqs.InterningInfo(
+        enabled=True, instructions=1, ops=1, registers=1
+    )
+    del instruction
+    gc.collect()
+    assert blqs.interning_info() == blqs.InterningInfo(
+        enabled=True, instructions=0, ops=1, registers=0
+    )
+
+
+def test_interning_copy_and_pickle(interning):
+    h = blqs.Op("H")
+    instruction = h(blqs.Register("a"))
+    assert copy.deepcopy(instruction) == instruction
+    assert pickle.loads(pickle.dumps(instruction)) == instruction
+    assert pickle.loads(pickle.dumps(blqs.Register("a", is_writable=False))) == blqs.Register("a")
+
+
+def test_disable_interning():
+    blqs.enable_interning()
+    op = blqs.Op("H")
+    blqs.enable_interning()
+    assert blqs.Op("H") is op
+    blqs.disable_interning()
+    assert blqs.Op("H") is not op
+    assert not blqs.interning_info().enabled
+
+
+def test_interning_block_eq(interning):
+    h = blqs.Op("H")
+    with blqs.Block() as block1:
+        h(0)
+        h(1)
+    with blqs.Block() as block2:
+        h(0)
+        h(1)
+    assert block1 == block2
+    assert block1[0] is block2[0]
+    assert block1 == block1
+
+
+def test_count_distinct_instructions():
+    h, x = blqs.Op("H"), blqs.Op("X")
+    with blqs.Program() as program:
+        h(0)
+        h(0)
+        x(0)
+        with blqs.If(blqs.Register("a")).if_block():
+            h(0)
+            h(1)
+        with blqs.For(blqs.Iterable("range(5)", blqs.Register("b"))).else_block():
+            x(1)
+        with blqs.While(blqs.Register("c")).loop_block():
+            h(2)
+        with blqs.Block():
+            h(3)
+        h.on_each(3, 4)
+    assert blqs.count_distinct_instructions(program) == 7
+    assert blqs.count_distinct_instructions(blqs.Block()) == 0
+
+
+def test_count_distinct_instructions_interned(interning):
+    h = blqs.Op("H")
+    with blqs.Program() as program:
+        for _ in range(10):
+            h(0)
+            h(1)
+    assert blqs.count_distinct_instructions(program) == 2
+
+
+def test_count_distinct_instructions_calls():
+    h = blqs.Op("H")
+    body = blqs.Block.of(h(0), blqs.Block.of(h(1)))
+    with blqs.Program() as program:
+        for _ in range(3):
+            blqs.Call("sub", body)
+        blqs.Call("other", blqs.Block.of(h(0), h(2)))
+    assert blqs.count_distinct_instructions(program) == 3
+
+    @blqs.build_with_config(blqs.BuildConfig(emit_calls=True))
+    def layer(q):
+        h(q)
+        h(q + 1)
+
+    @blqs.build
+    def fn():
+        for i in range(10):
+            layer(i % 2)
+
+    assert blqs.count_distinct_instructions(fn()) == 3
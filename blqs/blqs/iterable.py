@@ -17,6 +17,8 @@ from blqs import protocols
 class Iterable:
     """An object that is iterable."""
 
+    __slots__ = ("_name", "_loop_vars")
+
     def __init__(self, name: str, *loop_vars):
         """Create the iterable.
 
@@ -50,3 +52,8 @@ class Iterable:
 
     def __hash__(self):
         return hash((self._name, self._loop_vars))
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is Iterable:
+            return Iterable, (self._name, *self._loop_vars)
+        return super().__reduce_ex__(protocol)
@@ -14,7 +14,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
-from blqs import block, protocols, statement
+from blqs import block, printer, protocols, serialization, statement
 
 
 if TYPE_CHECKING:
@@ -22,6 +22,8 @@ if TYPE_CHECKING:
 
 
 class For(statement.Statement):
+    __slots__ = ("_iterable", "_loop_block", "_else_block")
+
     def __init__(self, iterable: blqs.SupportsIterable):
         super().__init__()
         assert protocols.is_iterable(iterable), (
@@ -44,11 +46,20 @@ class For(statement.Statement):
     def else_block(self) -> blqs.Block:
         return self._else_block
 
-    def __str__(self):
+    def freeze(self) -> For:
+        self._loop_block.freeze()
+        self._else_block.freeze()
+        return self
+
+    __str__ = printer.print_str
+
+    def _print_(self, p: printer.Printer):
         loop_var_str = ", ".join(str(x) for x in protocols.loop_vars(self._iterable))
-        loop_str = f"for {loop_var_str} in {self._iterable}:\n{self._loop_block}"
-        else_str = f"\nelse:\n{self._else_block}"
-        return loop_str + else_str if self._else_block else loop_str
+        p.write(f"for {loop_var_str} in {self._iterable}:\n")
+        p.print(self._loop_block)
+        if self._else_block:
+            p.write("\nelse:\n")
+            p.print(self._else_block)
 
     def __eq__(self, other):
         if not isinstance(other, type(self)):
@@ -62,8 +73,21 @@ class For(statement.Statement):
     def __hash__(self):
         return hash((self._iterable, self._loop_block, self._else_block))
 
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is For:
+            return serialization.loads_statement, (serialization.dumps_statement(self),)
+        return super().__reduce_ex__(protocol)
+
+    def __copy__(self):
+        return statement.copy_statement(self)
+
+    def __deepcopy__(self, memo):
+        return statement.copy_statement(self, memo)
+
 
 class While(statement.Statement):
+    __slots__ = ("_condition", "_loop_block", "_else_block")
+
     def __init__(self, condition: protocols.SupportsIsReadable):
         super().__init__()
         assert protocols.is_readable(condition), (
@@ -83,10 +107,20 @@ class While(statement.Statement):
     def else_block(self) -> blqs.Block:
         return self._else_block
 
-    def __str__(self):
-        loop_str = f"while {self._condition}:\n{self._loop_block}\n"
-        else_str = f"else:\n{self._else_block}"
-        return loop_str + else_str if self._else_block else loop_str
+    def freeze(self) -> While:
+        self._loop_block.freeze()
+        self._else_block.freeze()
+        return self
+
+    __str__ = printer.print_str
+
+    def _print_(self, p: printer.Printer):
+        p.write(f"while {self._condition}:\n")
+        p.print(self._loop_block)
+        p.write("\n")
+        if self._else_block:
+            p.write("else:\n")
+            p.print(self._else_block)
 
     def __eq__(self, other):
         if not isinstance(other, type(self)):
@@ -99,3 +133,14 @@ class While(statement.Statement):
 
     def __hash__(self):
         return hash((self._condition, self._loop_block, self._else_block))
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is While:
+            return serialization.loads_statement, (serialization.dumps_statement(self),)
+        return super().__reduce_ex__(protocol)
+
+    def __copy__(self):
+        return statement.copy_statement(self)
+
+    def __deepcopy__(self, memo):
+        return statement.copy_statement(self, memo)
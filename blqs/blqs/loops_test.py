@@ -127,3 +127,17 @@ def test_while_blocks():
     with loop.else_block():
         s2 = blqs.Statement()
     assert loop.else_block() == blqs.Block.of(s2)
+
+
+def test_for_freeze():
+    statement = blqs.For(blqs.Iterable("range(5)", blqs.Register("a")))
+    assert statement.freeze() is statement
+    assert statement.loop_block().is_frozen()
+    assert statement.else_block().is_frozen()
+
+
+def test_while_freeze():
+    statement = blqs.While(blqs.Register("a"))
+    assert statement.freeze() is statement
+    assert statement.loop_block().is_frozen()
+    assert statement.else_block().is_frozen()
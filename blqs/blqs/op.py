@@ -14,7 +14,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
-from blqs import instruction
+from blqs import instruction, interning
 
 
 if TYPE_CHECKING:
@@ -30,9 +30,13 @@ class Op:
     o = Op('H')
     # Create an Instruction
     o(0)
+    # Create a BroadcastInstruction, equivalent to o(0), o(1), o(2)
+    o.on_each(0, 1, 2)
     ```
     """
 
+    __slots__ = ("_name", "__weakref__")
+
     def __init__(self, name: str):
         self._name = name
 
@@ -43,8 +47,19 @@ class Op:
         return str(self._name)
 
     def __call__(self, *targets) -> blqs.Instruction:
+        intern_table = interning._default_intern_table
+        if intern_table is not None:
+            return intern_table.instruction(self, targets)
         return instruction.Instruction(self, *targets)
 
+    def on_each(self, *targets) -> blqs.BroadcastInstruction:
+        """Applies the op to each of the targets, as a single `blqs.BroadcastInstruction`.
+
+        This is equivalent to calling the op on each target in turn, but adds a single statement
+        to the current block, which is cheaper for many targets.
+        """
+        return instruction.BroadcastInstruction(self, targets)
+
     def __eq__(self, other):
         if not isinstance(self, type(other)):
             return NotImplemented
@@ -52,3 +67,8 @@ class Op:
 
     def __hash__(self):
         return hash(self._name)
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is Op:
+            return Op, (self._name,)
+        return super().__reduce_ex__(protocol)
@@ -34,3 +34,12 @@ def test_call():
     o = blqs.Op("a")
     assert o(0) == blqs.Instruction(o, 0)
     assert o(0, "a") == blqs.Instruction(o, 0, "a")
+
+
+def test_on_each():
+    o = blqs.Op("a")
+    with blqs.Block() as block:
+        broadcast = o.on_each(0, 1, "a")
+    assert broadcast == blqs.BroadcastInstruction(o, (0, 1, "a"))
+    assert block == blqs.Block.of(broadcast)
+    assert o.on_each() == blqs.BroadcastInstruction(o, ())
@@ -0,0 +1,281 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""An opt-in on-disk cache of the code produced by compiling `blqs.build` functions."""
+
+import dataclasses
+import hashlib
+import importlib.util
+import marshal
+import os
+import tempfile
+import threading
+import types
+from typing import Iterable, Optional
+
+from blqs import compile_cache, stats, _version
+
+# The environment variable which, if set, enables the persistent cache in this directory.
+CACHE_DIR_ENV_VAR = "BLQS_CACHE_DIR"
+
+DEFAULT_MAX_SIZE_BYTES = 64 * 1024 * 1024
+
+# Bump this whenever the layout of the cache files, or the code generated by the build, changes.
+_FORMAT_VERSION = 4
+
+_SUFFIX = ".blqsc"
+
+
+@dataclasses.dataclass(frozen=True)
+class PersistentCacheInfo:
+    """Statistics about the persistent compile cache.
+
+    Attributes:
+        directory: The directory the cache is stored in.
+        max_size_bytes: The maximum total size of the cache files in the directory.
+        hits: The number of compilations that were loaded from the cache.
+        misses: The number of compilations that were not found in the cache.
+        writes: The number of compilations written to the cache by this process.
+    """
+
+    directory: str
+    max_size_bytes: int
+    hits: int
+    misses: int
+    writes: int
+
+
+class _PersistentCache:
+    """A directory of marshalled compiled builders, keyed by a hash of what produced them.
+
+    Writers write to a temporary file in the directory and atomically rename it into place, so
+    concurrent processes sharing the directory never observe partially written entries. Entries
+    that cannot be read, for whatever reason, are treated as misses.
+    """
+
+    def __init__(self, directory: str, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES):
+        if max_size_bytes < 0:
+            raise ValueError(f"max_size_bytes must be non-negative, was {max_size_bytes}.")
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_size_bytes = max_size_bytes
+        # Guards the statistics below, which threads compiling different builders update.
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    def load(self, key: str, filename: str) -> Optional[compile_cache._CompiledBuilder]:
+        """Loads the compiled builder stored under `key`, or returns None if there is none.
+
+        Args:
+            key: The key of the entry, see `cache_key`.
+            filename: The filename to give the generated code of the loaded entry, if the entry
+                was compiled from generated source code.
+
+        Returns:
+            The compiled builder or None if the cache does not contain a valid entry for the key.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = marshal.load(f)
+            format_version, stored_key, code, source, line_map, stats_values = data
+            if format_version != _FORMAT_VERSION or stored_key != key:
+                raise ValueError("Mismatched cache entry.")
+            if not isinstance(code, types.CodeType):
+                raise ValueError("Cache entry does not contain code.")
+            build_stats = stats.BuildStats(*stats_values)
+            # Mark the entry as recently used for eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+        except (OSError, EOFError, ValueError, TypeError):
+            with self._lock:
+                self._misses += 1
+            _remove(path)
+            return None
+        with self._lock:
+            self._hits += 1
+        if source is None:
+            # The code was compiled directly, and refers to the original file.
+            filename = code.co_filename
+        else:
+            code = _replace_filename(code, filename)
+        return compile_cache._CompiledBuilder(
+            code=code,
+            line_map_fn=lambda: line_map,
+            filename=filename,
+            source=source,
+            stats=build_stats,
+        )
+
+    def store(self, key: str, compiled: compile_cache._CompiledBuilder):
+        """Stores the compiled builder under `key`.
+
+        Args:
+            key: The key of the entry, see `cache_key`.
+            compiled: The compiled builder.
+        """
+        try:
+            line_map = compiled.line_map()
+        except AssertionError:
+            # The line mapping could not be determined consistently, so don't persist this.
+            return
+        stats_values = dataclasses.astuple(compiled.stats) if compiled.stats else ()
+        data = marshal.dumps(
+            (_FORMAT_VERSION, key, compiled.code, compiled.source, line_map, stats_values)
+        )
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self._directory, prefix=".tmp-", suffix=_SUFFIX)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                _remove(temp_path)
+                raise
+        except OSError:
+            # The cache is best effort, failing to write to it should not fail the build.
+            return
+        with self._lock:
+            self._writes += 1
+        self._evict()
+
+    def info(self) -> PersistentCacheInfo:
+        with self._lock:
+            return PersistentCacheInfo(
+                directory=self._directory,
+                max_size_bytes=self._max_size_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                writes=self._writes,
+            )
+
+    def clear(self):
+        for entry in self._entries():
+            _remove(entry.path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + _SUFFIX)
+
+    def _entries(self) -> Iterable[os.DirEntry]:
+        try:
+            with os.scandir(self._directory) as it:
+                return [e for e in it if e.name.endswith(_SUFFIX) and not e.name.startswith(".")]
+        except OSError:
+            return []
+
+    def _evict(self):
+        """Removes the least recently used entries until the cache fits in its maximum size."""
+        sized_entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            sized_entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in sized_entries)
+        for _, size, path in sorted(sized_entries):
+            if total_size <= self._max_size_bytes:
+                break
+            _remove(path)
+            total_size -= size
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _replace_filename(code: types.CodeType, filename: str) -> types.CodeType:
+    """Returns the code with its filename, and that of all code nested in it, replaced."""
+    consts = tuple(
+        _replace_filename(c, filename) if isinstance(c, types.CodeType) else c
+        for c in code.co_consts
+    )
+    return code.replace(co_filename=filename, co_consts=consts)
+
+
+def cache_key(*parts: str) -> str:
+    """Returns the key for an entry produced from the given parts.
+
+    The key also depends on the blqs version, the version of the persistent cache format and the
+    Python bytecode version.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        _version.__version__,
+        str(_FORMAT_VERSION),
+        importlib.util.MAGIC_NUMBER.hex(),
+        *parts,
+    ):
+        encoded = part.encode("utf-8", "surrogatepass")
+        digest.update(len(encoded).to_bytes(8, "little"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def _from_environment() -> Optional[_PersistentCache]:
+    directory = os.environ.get(CACHE_DIR_ENV_VAR)
+    if not directory:
+        return None
+    try:
+        return _PersistentCache(directory)
+    except OSError:
+        return None
+
+
+_default_persistent_cache: Optional[_PersistentCache] = _from_environment()
+
+
+def enable_persistent_cache(directory: str, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES):
+    """Enables a persistent, on-disk cache of the code compiled for `blqs.build` functions.
+
+    When enabled, the first time a process compiles a builder it looks for the compiled code in
+    `directory`, and if present, loads it rather than transforming the builder. Otherwise it
+    transforms the builder and writes the result to the directory. This makes starting new
+    processes that use the same builders cheaper. Entries are keyed by a hash of the builder's
+    source code and location, the build configuration, the blqs version and the Python version,
+    so stale entries are never used.
+
+    Multiple processes may share the same directory. When the total size of the entries exceeds
+    `max_size_bytes`, the least recently used entries are removed.
+
+    The persistent cache can also be enabled by setting the environment variable `BLQS_CACHE_DIR`
+    to the directory to use before importing blqs.
+
+    Args:
+        directory: The directory to store the cache in. Created if it does not exist.
+        max_size_bytes: The maximum total size of the cache entries.
+
+    Raises:
+        ValueError: If `max_size_bytes` is negative.
+    """
+    global _default_persistent_cache
+    _default_persistent_cache = _PersistentCache(directory, max_size_bytes)
+
+
+def disable_persistent_cache():
+    """Disables the persistent cache. This does not delete the cache's directory."""
+    global _default_persistent_cache
+    _default_persistent_cache = None
+
+
+def persistent_cache_info() -> Optional[PersistentCacheInfo]:
+    """Returns statistics about the persistent cache, or None if it is not enabled."""
+    return _default_persistent_cache.info() if _default_persistent_cache else None
@@ -0,0 +1,222 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import importlib
+import os
+import types
+
+import pytest
+
+import blqs
+import blqs.testing_samples as ts
+from blqs import persistent_cache
+
+# The build module is shadowed by the `blqs.build` function.
+build_module = importlib.import_module("blqs.build")
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    blqs.enable_persistent_cache(str(tmp_path))
+    blqs.clear_compile_cache()
+    yield tmp_path
+    blqs.disable_persistent_cache()
+    blqs.clear_compile_cache()
+
+
+def _cache_files(directory):
+    return [f for f in os.listdir(directory) if f.endswith(".blqsc")]
+
+
+def _fail_transform(*args, **kwargs):
+    raise AssertionError("Builder was transformed.")  # coverage: ignore
+
+
+def test_persistent_cache_writes_and_loads(cache_dir, monkeypatch):
+    def fn(x):
+        blqs.Op("H")(x)
+
+    assert blqs.build(fn)(1) == blqs.Program.of(blqs.Op("H")(1))
+    assert len(_cache_files(cache_dir)) == 1
+    info = blqs.persistent_cache_info()
+    assert (info.hits, info.misses, info.writes) == (0, 1, 1)
+
+    # A cold in memory cache loads from disk, without transforming the builder.
+    blqs.clear_compile_cache()
+    monkeypatch.setattr(build_module, "_transform_and_compile", _fail_transform)
+    assert blqs.build(fn)(2) == blqs.Program.of(blqs.Op("H")(2))
+    info = blqs.persistent_cache_info()
+    assert (info.hits, info.misses, info.writes) == (1, 1, 1)
+
+
+def test_persistent_cache_keyed_on_config(cache_dir):
+    def fn():
+        a = blqs.Register("a")
+        blqs.Op("H")(a)
+
+    blqs.build(fn)()
+    blqs.build_with_config(blqs.BuildConfig(support_assign=False))(fn)()
+    assert len(_cache_files(cache_dir)) == 2
+
+    blqs.clear_compile_cache()
+    assert blqs.build_with_config(blqs.BuildConfig(support_assign=False))(fn)() == (
+        blqs.Program.of(blqs.Op("H")(blqs.Register("a")))
+    )
+    assert blqs.persistent_cache_info().hits == 1
+
+
+def test_persistent_cache_keyed_on_globals(cache_dir):
+    def fn(n):
+        for i in range(n):
+            blqs.Op("H")(i)
+
+    assert blqs.build(fn)(2) == blqs.Program.of(blqs.Op("H")(0), blqs.Op("H")(1))
+
+    # The same code with globals in which range is shadowed, so is not native.
+    variables = dict(fn.__globals__)
+    variables["range"] = lambda n: blqs.Iterable(f"range({n})", blqs.Register("i"))
+    shadowed_fn = types.FunctionType(fn.__code__, variables, fn.__name__)
+    blqs.clear_compile_cache()
+    statements = blqs.build(shadowed_fn)(2).statements()
+    assert len(statements) == 1
+    assert isinstance(statements[0], blqs.For)
+    assert len(_cache_files(cache_dir)) == 2
+    assert blqs.persistent_cache_info().hits == 0
+
+
+def test_persistent_cache_loaded_exception_line_mapping(cache_dir):
+    with pytest.raises(ts.LocatedException):
+        ts.if_native()
+    blqs.clear_compile_cache()
+    with pytest.raises(ts.LocatedException) as e:
+        ts.if_native()
+    assert blqs.persistent_cache_info().hits == 1
+    cause = e.value.__cause__
+    assert type(cause) == blqs.GeneratedCodeException
+    assert e.value.lineno in cause.linenos_dict().values()
+
+
+def test_persistent_cache_build_stats(cache_dir):
+    def fn(n):
+        for i in range(n):
+            blqs.Op("H")(i)
+
+    build_stats = blqs.build_stats(fn)
+    blqs.clear_compile_cache()
+    assert blqs.build_stats(fn) == build_stats
+    assert blqs.persistent_cache_info().hits == 1
+
+
+def test_persistent_cache_debug_generated_code(cache_dir, monkeypatch):
+    config = blqs.BuildConfig(debug_generated_code=True)
+    with pytest.raises(ts.LocatedException):
+        blqs.build_with_config(config)(ts.only_raise.__wrapped__)()
+    blqs.clear_compile_cache()
+
+    monkeypatch.setattr(build_module, "_transform_and_compile", _fail_transform)
+    with pytest.raises(ts.LocatedException) as e:
+        blqs.build_with_config(config)(ts.only_raise.__wrapped__)()
+    cause = e.value.__cause__
+    assert cause.generated_filename().startswith("<blqs generated")
+    assert e.value.lineno in cause.linenos_dict().values()
+
+
+def test_persistent_cache_corrupt_entry(cache_dir):
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.build(fn)()
+    (entry,) = _cache_files(cache_dir)
+    with open(os.path.join(cache_dir, entry), "wb") as f:
+        f.write(b"not marshalled code")
+
+    blqs.clear_compile_cache()
+    assert blqs.build(fn)() == blqs.Program.of(blqs.Op("H")(0))
+    info = blqs.persistent_cache_info()
+    assert (info.hits, info.misses, info.writes) == (0, 2, 2)
+    assert len(_cache_files(cache_dir)) == 1
+
+
+def test_persistent_cache_evicts_to_max_size(tmp_path):
+    def fn0():
+        blqs.Op("H")(0)
+
+    def fn1():
+        blqs.Op("H")(1)
+
+    blqs.enable_persistent_cache(str(tmp_path), max_size_bytes=0)
+    try:
+        blqs.clear_compile_cache()
+        blqs.build(fn0)()
+        blqs.build(fn1)()
+        assert blqs.persistent_cache_info().writes == 2
+        assert len(_cache_files(tmp_path)) == 0
+    finally:
+        blqs.disable_persistent_cache()
+        blqs.clear_compile_cache()
+
+
+def test_persistent_cache_evicts_least_recently_used(tmp_path):
+    cache = persistent_cache._PersistentCache(str(tmp_path))
+
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.clear_compile_cache()
+    blqs.build(fn)()
+    compiled = next(iter(blqs.compile_cache._default_compile_cache._entries.values()))
+    cache.store("a", compiled)
+    cache.store("b", compiled)
+    os.utime(os.path.join(tmp_path, "a.blqsc"), (0, 0))
+    os.utime(os.path.join(tmp_path, "b.blqsc"), (1, 1))
+    assert cache.load("a", "<a>") is not None
+
+    cache._max_size_bytes = os.path.getsize(os.path.join(tmp_path, "a.blqsc"))
+    cache._evict()
+    assert _cache_files(tmp_path) == ["a.blqsc"]
+
+
+def test_persistent_cache_clear(cache_dir):
+    def fn():
+        blqs.Op("H")(0)
+
+    blqs.build(fn)()
+    persistent_cache._default_persistent_cache.clear()
+    assert len(_cache_files(cache_dir)) == 0
+
+
+def test_persistent_cache_disabled():
+    blqs.disable_persistent_cache()
+    assert blqs.persistent_cache_info() is None
+
+
+def test_persistent_cache_negative_max_size(tmp_path):
+    with pytest.raises(ValueError, match="non-negative"):
+        blqs.enable_persistent_cache(str(tmp_path), max_size_bytes=-1)
+
+
+def test_persistent_cache_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(persistent_cache.CACHE_DIR_ENV_VAR, str(tmp_path / "cache"))
+    cache = persistent_cache._from_environment()
+    assert cache is not None
+    assert cache.info().directory == str(tmp_path / "cache")
+    assert os.path.isdir(tmp_path / "cache")
+
+    monkeypatch.delenv(persistent_cache.CACHE_DIR_ENV_VAR)
+    assert persistent_cache._from_environment() is None
+
+
+def test_cache_key():
+    assert persistent_cache.cache_key("a", "b") == persistent_cache.cache_key("a", "b")
+    assert persistent_cache.cache_key("a", "b") != persistent_cache.cache_key("ab")
+    assert persistent_cache.cache_key("a", "b") != persistent_cache.cache_key("b", "a")
@@ -0,0 +1,167 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Streaming printing of statements, for their `__str__` and for writing them to files.
+
+The string of a block is the strings of its statements, one per line, with each line indented.
+Rather than indenting the string of each nested block once for each block it is nested in,
+`Printer` writes the strings of statements to a file as it goes, and indents each line once, by the
+indentation of all the blocks it is in.
+"""
+
+import contextlib
+import io
+import sys
+from typing import Any, Iterable, Iterator, List, Optional, TextIO
+
+# The characters `str.splitlines` splits lines at.
+_LINE_BOUNDARIES = frozenset("\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
+
+
+class Printer:
+    """Writes the strings of statements to a file, indenting the lines of nested blocks.
+
+    Statements whose `__str__` is `print_str` are printed by calling their `_print_` method with
+    the printer, which writes their string using `write`, `print` and `indented`. Other objects are
+    printed by writing their `str`.
+
+    Like `textwrap.indent`, lines which consist only of whitespace are not indented.
+    """
+
+    def __init__(self, file: TextIO):
+        """Create a printer.
+
+        Args:
+            file: The file to write to. Only its `write` method is used.
+        """
+        self._write = file.write
+        self._prefix = ""
+        # The whitespace at the start of the current line, which is written once it is known
+        # whether the line is indented, or None if the line has content.
+        self._pending: Optional[str] = ""
+
+    def write(self, text: str):
+        """Writes text, indenting its lines by the indentation of the current block."""
+        if not text:
+            return
+        pending = self._pending
+        if not self._prefix:
+            last = text[-1]
+            if last in _LINE_BOUNDARIES:
+                self._write(text if pending is None else pending + text)
+                self._pending = ""
+                return
+            if not last.isspace():
+                self._write(text if pending is None else pending + text)
+                self._pending = None
+                return
+        lines = text.splitlines(True)
+        # A last line of only whitespace is not written until it is known whether it is indented.
+        tail = lines[-1]
+        if tail[-1] in _LINE_BOUNDARIES or tail.strip():
+            tail = ""
+        else:
+            lines.pop()
+        if lines:
+            prefix = self._prefix
+            first = lines[0]
+            if pending is not None:
+                first = (prefix + pending + first) if first.strip() else (pending + first)
+            if prefix:
+                rest = "".join([prefix + line if line.strip() else line for line in lines[1:]])
+            else:
+                rest = "".join(lines[1:])
+            self._write(first + rest)
+            pending = "" if lines[-1][-1] in _LINE_BOUNDARIES else None
+        if tail:
+            if pending is None:
+                self._write(tail)
+            else:
+                pending += tail
+        self._pending = pending
+
+    def print(self, obj: Any):
+        """Writes the string of an object."""
+        if type(obj).__str__ is print_str:
+            obj._print_(self)
+        else:
+            self.write(str(obj))
+
+    def print_joined(self, objs: Iterable[Any], separator: str):
+        """Writes the strings of objects, with a separator between each of them.
+
+        The strings of consecutive objects which are not printed by `_print_` are written at once.
+        """
+        chunk: List[str] = []
+        first = True
+        for obj in objs:
+            if not first:
+                chunk.append(separator)
+            first = False
+            if type(obj).__str__ is print_str:
+                if chunk:
+                    self.write("".join(chunk))
+                    chunk = []
+                obj._print_(self)
+            else:
+                chunk.append(str(obj))
+        if chunk:
+            self.write("".join(chunk))
+
+    def flush(self):
+        """Writes the whitespace at the end of the last line, if it has not been written.
+
+        Whitespace at the start of a line is not written until it is known whether the line is
+        indented. This should be called once all text has been written.
+        """
+        if self._pending:
+            self._write(self._pending)
+            self._pending = ""
+
+    @contextlib.contextmanager
+    def indented(self, indent: str) -> Iterator[None]:
+        """A context within which lines are further indented by `indent`.
+
+        Lines are indented by the indentation in effect when their first character which is not
+        whitespace is written.
+        """
+        prefix = self._prefix
+        self._prefix = prefix + indent
+        try:
+            yield
+        finally:
+            self._prefix = prefix
+
+
+def print_str(self) -> str:
+    """The `__str__` of statements which are printed with a `Printer`, see `Printer.print`."""
+    out = io.StringIO()
+    p = Printer(out)
+    self._print_(p)
+    p.flush()
+    return out.getvalue()
+
+
+def write_str(obj: Any, file: Optional[TextIO] = None):
+    """Writes the string of an object to a file, without creating the whole string.
+
+    For blocks and the statements containing them, this writes the same string as `str`, but
+    writes each statement as it is printed.
+
+    Args:
+        obj: The object to write.
+        file: The file to write to. If None, this is standard output.
+    """
+    p = Printer(sys.stdout if file is None else file)
+    p.print(obj)
+    p.flush()
@@ -0,0 +1,190 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+import textwrap
+
+import pytest
+
+import blqs
+
+H = blqs.Op("H")
+
+
+class _Text(blqs.Statement):
+    def __init__(self, text: str):
+        super().__init__()
+        self._text = text
+
+    def __str__(self):
+        return self._text
+
+
+def _printed(*texts, indent="  "):
+    out = io.StringIO()
+    printer = blqs.Printer(out)
+    with printer.indented(indent):
+        for text in texts:
+            printer.write(text)
+    printer.flush()
+    return out.getvalue()
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "a",
+        "a\nb",
+        "a\n",
+        "\n",
+        "a\n\nb",
+        "  a\n  \n\tb",
+        "a\n   ",
+        "   ",
+        "a\r\nb\rc\x0bd\x0ce\x1cf\x85g h ",
+        " \n \r\n x",
+    ],
+)
+def test_printer_write_matches_textwrap(text):
+    expected = textwrap.indent(text, "  ")
+    assert _printed(text) == expected
+    assert _printed(text, indent="") == text
+    # Written in pieces.
+    assert _printed(*text) == expected
+    for i in range(len(text)):
+        assert _printed(text[:i], text[i:]) == expected
+
+
+def test_printer_indent_decided_by_first_content():
+    out = io.StringIO()
+    printer = blqs.Printer(out)
+    printer.write("a\n  ")
+    with printer.indented("> "):
+        printer.write("b\n")
+        printer.write(" ")
+    printer.write("c\n ")
+    with printer.indented("> "):
+        printer.write("\n")
+    assert out.getvalue() == "a\n>   b\n c\n \n"
+
+
+def test_printer_indented_nested():
+    out = io.StringIO()
+    printer = blqs.Printer(out)
+    with printer.indented("  "):
+        printer.write("a\n")
+        with printer.indented("  "):
+            printer.write("b\nc\n")
+        printer.write("d")
+    assert out.getvalue() == "  a\n    b\n    c\n  d"
+
+
+def test_printer_print():
+    out = io.StringIO()
+    printer = blqs.Printer(out)
+    printer.print(H(0))
+    printer.write("\n")
+    printer.print(blqs.Block.of(H(1), blqs.Block.of(H(2))))
+    assert out.getvalue() == "H 0\n  H 1\n    H 2"
+
+
+def test_printer_print_joined():
+    out = io.StringIO()
+    printer = blqs.Printer(out)
+    printer.print_joined([H(0), blqs.Block.of(H(1)), "a", "b"], ", ")
+    printer.print_joined([], ", ")
+    # The block is not indented, since the line already has content.
+    assert out.getvalue() == "H 0, H 1, a, b"
+
+
+def test_print_str():
+    class Statement(blqs.Statement):
+        __str__ = blqs.print_str
+
+        def _print_(self, p):
+            p.write("statement:\n")
+            p.print(blqs.Block.of(H(0)))
+
+    assert str(Statement()) == "statement:\n  H 0"
+
+
+def test_write_str(capsys):
+    with blqs.Program() as program:
+        H(0)
+        with blqs.Block():
+            H(1)
+    out = io.StringIO()
+    blqs.write_str(program, out)
+    assert out.getvalue() == str(program) == "H 0\n  H 1"
+    blqs.write_str(program)
+    assert capsys.readouterr().out == "H 0\n  H 1"
+
+
+def _textwrap_str(stmt) -> str:
+    """The string of statements, as created by indenting the strings of nested blocks."""
+    if isinstance(stmt, blqs.Program):
+        return "\n".join(_textwrap_str(s) for s in stmt)
+    if isinstance(stmt, blqs.Block):
+        return textwrap.indent("\n".join(_textwrap_str(s) for s in stmt), "  ")
+    if isinstance(stmt, blqs.If):
+        if_str = f"if {stmt.condition()}:\n{_textwrap_str(stmt.if_block())}"
+        else_str = f"\nelse:\n{_textwrap_str(stmt.else_block())}"
+        return if_str + else_str if stmt.else_block() else if_str
+    if isinstance(stmt, blqs.While):
+        loop_str = f"while {stmt.condition()}:\n{_textwrap_str(stmt.loop_block())}\n"
+        else_str = f"else:\n{_textwrap_str(stmt.else_block())}"
+        return loop_str + else_str if stmt.else_block() else loop_str
+    return str(stmt)
+
+
+def test_program_str_matches_textwrap():
+    with blqs.Program() as program:
+        H(0)
+        _Text("  \n a\r\n\n b\x0c c  \n")
+        _Text("   ")
+        _Text("")
+        if_statement = blqs.If(blqs.Register("a"))
+        with if_statement.if_block():
+            H(1)
+            _Text(" x\n  ")
+            while_statement = blqs.While(blqs.Register("b"))
+            with while_statement.loop_block():
+                H(2)
+            with blqs.Block():
+                blqs.Block()
+                with blqs.Block():
+                    _Text("y\n\nz")
+        with if_statement.else_block():
+            while_statement = blqs.While(blqs.Register("c"))
+            with while_statement.loop_block():
+                H(3)
+            with while_statement.else_block():
+                _Text("\n\n w")
+        H(4)
+        with blqs.Block():
+            _Text("v\n  ")
+    assert str(program) == _textwrap_str(program)
+
+
+def test_deeply_nested_str():
+    depth = 200
+    program = blqs.Program()
+    blocks = [blqs.Block() for _ in range(depth)]
+    current = program
+    for block in blocks:
+        current.append(block)
+        block.append(H(0))
+        current = block
+    lines = str(program).split("\n")
+    assert lines == [f"{'  ' * (i + 1)}H 0" for i in range(depth)]
@@ -11,17 +11,30 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from blqs import block, block_stack
+from blqs import block, block_stack, printer, serialization
 
 
 class Program(block.Block):
     """The top level Block containing the entirety of a program."""
 
-    def __init__(self):
-        super().__init__(parent_statement=None)
+    __slots__ = ()
+
+    def __init__(self, columnar: bool = False):
+        """Construct a program.
+
+        Args:
+            columnar: Whether to store the instructions of the program in columns. See
+                `blqs.Block`.
+        """
+        super().__init__(parent_statement=None, columnar=columnar)
         assert (
             block_stack.get_current_block() is None
         ), "Program should only be created when the current block stack is empty."
 
-    def __str__(self):
-        return "\n".join(str(e) for e in self)
+    def _print_(self, p: printer.Printer):
+        p.print_joined(self._statements, "\n")
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is Program:
+            return serialization.loads, (serialization.dumps(self),)
+        return super().__reduce_ex__(protocol)
@@ -11,6 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import copy
+import pickle
+
 import pymore
 import pytest
 
@@ -35,3 +38,43 @@ def test_program_equality():
     eq.make_equality_group(lambda: blqs.Program.of("a", "b"))
     eq.add_equality_group(blqs.Program.of(blqs.Block.of()))
     eq.add_equality_group(blqs.Program.of(blqs.Block.of("a")))
+
+
+def test_program_pickle():
+    with blqs.Program() as program:
+        blqs.Op("H")(0)
+        with blqs.Block():
+            blqs.Op("X")(blqs.Register("a"))
+    program.append("a")
+    data = pickle.dumps(program)
+    with blqs.Block() as b:
+        unpickled = pickle.loads(data)
+    assert not b
+    assert type(unpickled) is blqs.Program
+    assert unpickled == program
+    assert type(unpickled[1]) is blqs.Block
+
+
+def test_program_pickle_deeply_nested():
+    program = blqs.Program()
+    current = program
+    for _ in range(5000):
+        nested = blqs.Block()
+        current.append(nested)
+        current = nested
+    current.append(blqs.Op("H")(0))
+    unpickled = pickle.loads(pickle.dumps(program))
+    for _ in range(5000):
+        (unpickled,) = unpickled
+    assert unpickled == blqs.Block.of(blqs.Op("H")(0))
+
+
+def test_program_copy():
+    with blqs.Program() as program:
+        with blqs.Block() as inner:
+            blqs.Op("H")(0)
+    for copied in (copy.copy(program), copy.deepcopy(program)):
+        assert type(copied) is blqs.Program
+        assert copied == program
+    assert copy.copy(program)[0] is inner
+    assert copy.deepcopy(program)[0] is not inner
@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import types
 from typing import Any, Tuple
 
 try:
@@ -18,6 +19,37 @@ try:
 except ImportError:  # coverage: ignore
     from typing_extensions import Protocol  # type:ignore
 
+# Builtin types. Attributes cannot be added to these types, so their instances never support any
+# of the protocols below. Code generated by `blqs.build` uses this to skip checking the protocols
+# for such values.
+_NATIVE_TYPES = frozenset(
+    (
+        bool,
+        bytearray,
+        bytes,
+        complex,
+        dict,
+        enumerate,
+        filter,
+        float,
+        frozenset,
+        int,
+        list,
+        map,
+        range,
+        reversed,
+        set,
+        str,
+        tuple,
+        type(None),
+        types.GeneratorType,
+        zip,
+        type({}.items()),
+        type({}.keys()),
+        type({}.values()),
+    )
+)
+
 
 class SupportsIsReadable(Protocol):
     """A protocol for objects that are readable.
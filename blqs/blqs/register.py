@@ -20,6 +20,8 @@ class Register:
     `blqs.SupportsIsDeletable`.
     """
 
+    __slots__ = ("_name", "_is_readable", "_is_writable", "_is_deletable", "__weakref__")
+
     def __init__(
         self,
         name: str,
@@ -62,3 +64,8 @@ class Register:
 
     def __hash__(self):
         return hash((self._name,))
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is Register:
+            return Register, (self._name, self._is_readable, self._is_writable, self._is_deletable)
+        return super().__reduce_ex__(protocol)
@@ -0,0 +1,243 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A cache of the results of builders, keyed on the arguments they are called with."""
+
+import collections
+import dataclasses
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from blqs import block
+
+DEFAULT_MAXSIZE = 128
+
+
+@dataclasses.dataclass(frozen=True)
+class ResultCacheInfo:
+    """Statistics about the result cache of a builder.
+
+    Attributes:
+        hits: The number of calls that returned a cached result.
+        misses: The number of calls that built their result. This includes calls with arguments
+            that are not hashable, whose results are not cached.
+        maxsize: The maximum number of results held in the cache. When this is exceeded the least
+            recently used result is evicted.
+        currsize: The number of results currently held in the cache.
+        weak_keys: Whether arguments which can be weakly referenced are.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    weak_keys: bool
+
+
+class ResultCache:
+    """A least recently used cache of the results of a builder, keyed on the arguments of each call.
+
+    The key of a call is its positional and keyword arguments, and their types, so that calls with
+    arguments that are equal but of different types, such as `1` and `1.0`, are cached separately.
+    Arguments must be hashable for the call to be cached.
+
+    If `weak_keys` is True, arguments which can be weakly referenced, such as instances of most
+    classes, are held by weak references, and the results of calls are evicted from the cache
+    once any of their arguments is garbage collected. This only happens if the result itself does
+    not refer to the argument.
+
+    The results are returned as they are on each hit, so only immutable results, for example
+    frozen programs, should be cached, see the `cacheable` argument of `get_or_build`. The cache is
+    thread safe.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, weak_keys: bool = False):
+        """Initializes the cache.
+
+        Args:
+            maxsize: The maximum number of results to hold.
+            weak_keys: Whether to hold the arguments which can be weakly referenced by weak
+                references.
+
+        Raises:
+            ValueError: If `maxsize` is negative.
+        """
+        if maxsize < 0:
+            raise ValueError(f"Result cache maxsize must be non-negative, was {maxsize}.")
+        self._maxsize = maxsize
+        self._weak_keys = weak_keys
+        self._entries: collections.OrderedDict[Hashable, Any] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        # Set by the callbacks of weak references when their referent is collected. Those can run
+        # at any point, including while the lock is held, so they only set this, and the entries
+        # with dead references are removed by the next call which takes the lock.
+        self._has_dead_keys = False
+
+    def get_or_build(
+        self,
+        args: Sequence[Any],
+        kwargs: Dict[str, Any],
+        build_fn: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Returns the cached result for the arguments, building and caching it if not present.
+
+        Args:
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call.
+            build_fn: Called with no arguments to build the result on a cache miss.
+            cacheable: If not None, called with the result built on a cache miss, which is only
+                cached if this returns True.
+
+        Returns:
+            The result.
+        """
+        try:
+            key = self._key(args, kwargs, None)
+            hash(key)
+        except TypeError:
+            key = None
+        with self._lock:
+            if self._has_dead_keys:
+                self._remove_dead_keys()
+            if key is not None:
+                result = self._entries.get(key, _MISSING)
+                if result is not _MISSING:
+                    self._hits += 1
+                    self._entries.move_to_end(key)
+                    return result
+            self._misses += 1
+        result = build_fn()
+        if key is None or self._maxsize == 0 or (cacheable is not None and not cacheable(result)):
+            return result
+        if self._weak_keys:
+            # The weak references of the stored key notify the cache when they die.
+            key = self._key(args, kwargs, self._on_dead_key)
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def info(self) -> ResultCacheInfo:
+        with self._lock:
+            if self._has_dead_keys:
+                self._remove_dead_keys()
+            return ResultCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._maxsize,
+                currsize=len(self._entries),
+                weak_keys=self._weak_keys,
+            )
+
+    def clear(self):
+        """Removes all of the results from the cache, and resets its statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def _key(
+        self, args: Sequence[Any], kwargs: Dict[str, Any], callback: Optional[Callable]
+    ) -> Tuple:
+        values = (*args, *kwargs.values())
+        types = tuple(value.__class__ for value in values)
+        if self._weak_keys:
+            values = tuple(
+                weakref.ref(value, callback) if value.__class__.__weakrefoffset__ else value
+                for value in values
+            )
+        return values, tuple(kwargs), types
+
+    def _on_dead_key(self, _: weakref.ref):
+        self._has_dead_keys = True
+
+    def _remove_dead_keys(self):
+        """Removes the entries with arguments which have been collected. Requires the lock."""
+        self._has_dead_keys = False
+        for key in [k for k in self._entries if any(_is_dead(value) for value in k[0])]:
+            del self._entries[key]
+
+
+_MISSING = object()
+
+
+def _is_dead(value: Any) -> bool:
+    return value.__class__ is weakref.ref and value() is None
+
+
+# The types of values which are immutable, if they are hashable, so can be cached as they are.
+_IMMUTABLE_TYPES = frozenset((type(None), bool, int, float, complex, str, bytes, tuple, frozenset))
+
+
+def is_immutable(value: Any) -> bool:
+    """Whether a value is None, a number, string or bytes, or a hashable tuple or frozenset."""
+    if value.__class__ not in _IMMUTABLE_TYPES:
+        return False
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def freeze_result(result: Any) -> Any:
+    """Freezes a program returned by a builder, so that it can be cached.
+
+    Programs with statements which are not hashable cannot be frozen, and are returned as they
+    are, as are results which are not programs.
+    """
+    if not isinstance(result, block.Block):
+        return result
+    try:
+        hash(result)
+    except TypeError:
+        return result
+    return result.freeze()
+
+
+def is_cacheable(result: Any) -> bool:
+    """Whether a result of a builder can be cached: a frozen program, or a value `is_immutable`."""
+    if isinstance(result, block.Block):
+        return result.is_frozen()
+    return is_immutable(result)
+
+
+def result_cache_info(func: Callable) -> Optional[ResultCacheInfo]:
+    """Returns the statistics of the result cache of a builder.
+
+    Args:
+        func: A function returned by `blqs.build_with_config`, or `blqs_cirq.build_with_config`,
+            with a config which caches results.
+
+    Returns:
+        The statistics, or None if the builder does not cache its results.
+    """
+    cache = getattr(func, "_blqs_result_cache", None)
+    return cache.info() if cache is not None else None
+
+
+def clear_result_cache(func: Callable):
+    """Removes the cached results of a builder, and resets its statistics.
+
+    Args:
+        func: A function returned by `blqs.build_with_config`, or `blqs_cirq.build_with_config`.
+            This does nothing if it does not cache its results.
+    """
+    cache = getattr(func, "_blqs_result_cache", None)
+    if cache is not None:
+        cache.clear()
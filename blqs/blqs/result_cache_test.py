@@ -0,0 +1,194 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import gc
+import threading
+
+import pytest
+
+import blqs
+
+
+class Layout:
+    def __init__(self, size):
+        self.size = size
+
+
+class Calls:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, value):
+        def build():
+            self.count += 1
+            return value
+
+        return build
+
+
+def _info(hits, misses, currsize, maxsize=128, weak_keys=False):
+    return blqs.ResultCacheInfo(
+        hits=hits, misses=misses, maxsize=maxsize, currsize=currsize, weak_keys=weak_keys
+    )
+
+
+def test_result_cache():
+    cache = blqs.ResultCache()
+    calls = Calls()
+    assert cache.get_or_build((1, 2), {}, calls("a")) == "a"
+    assert cache.get_or_build((1, 2), {}, calls("b")) == "a"
+    assert cache.get_or_build((1, 3), {}, calls("c")) == "c"
+    assert cache.get_or_build((1, 2), {"x": 1}, calls("d")) == "d"
+    assert cache.get_or_build((1, 2), {"x": 1}, calls("e")) == "d"
+    assert calls.count == 3
+    assert cache.info() == _info(hits=2, misses=3, currsize=3)
+    cache.clear()
+    assert cache.info() == _info(hits=0, misses=0, currsize=0)
+
+
+def test_result_cache_typed():
+    cache = blqs.ResultCache()
+    calls = Calls()
+    assert cache.get_or_build((1,), {}, calls("int")) == "int"
+    assert cache.get_or_build((1.0,), {}, calls("float")) == "float"
+    assert cache.get_or_build((True,), {}, calls("bool")) == "bool"
+    assert cache.get_or_build((1,), {}, calls("other")) == "int"
+    assert calls.count == 3
+
+
+def test_result_cache_unhashable():
+    cache = blqs.ResultCache()
+    calls = Calls()
+    assert cache.get_or_build(([1],), {}, calls("a")) == "a"
+    assert cache.get_or_build(([1],), {}, calls("b")) == "b"
+    assert cache.get_or_build((), {"x": {}}, calls("c")) == "c"
+    assert cache.info() == _info(hits=0, misses=3, currsize=0)
+
+
+def test_result_cache_cacheable():
+    cache = blqs.ResultCache()
+    calls = Calls()
+    assert cache.get_or_build((1,), {}, calls([1]), blqs.result_cache.is_immutable) == [1]
+    assert cache.get_or_build((1,), {}, calls([2]), blqs.result_cache.is_immutable) == [2]
+    assert cache.get_or_build((1,), {}, calls((3,)), blqs.result_cache.is_immutable) == (3,)
+    assert cache.get_or_build((1,), {}, calls((4,)), blqs.result_cache.is_immutable) == (3,)
+    assert cache.info() == _info(hits=1, misses=3, currsize=1)
+
+
+def test_is_immutable():
+    for value in (None, True, 1, 1.5, 1j, "a", b"a", (1, "a"), frozenset((1,))):
+        assert blqs.result_cache.is_immutable(value)
+    for value in ([1], {1}, {"a": 1}, ([1],), Layout(1), blqs.Program()):
+        assert not blqs.result_cache.is_immutable(value)
+
+
+def test_freeze_result():
+    program = blqs.Program.of(blqs.Op("H")(0))
+    assert blqs.result_cache.freeze_result(program) is program
+    assert program.is_frozen()
+    assert blqs.result_cache.is_cacheable(program)
+    unhashable = blqs.Program.of(blqs.Op("H")([0]))
+    assert blqs.result_cache.freeze_result(unhashable) is unhashable
+    assert not unhashable.is_frozen()
+    assert not blqs.result_cache.is_cacheable(unhashable)
+    value = [1]
+    assert blqs.result_cache.freeze_result(value) is value
+    assert not blqs.result_cache.is_cacheable(value)
+    assert blqs.result_cache.is_cacheable((1, "a"))
+
+
+def test_result_cache_maxsize():
+    cache = blqs.ResultCache(maxsize=2)
+    calls = Calls()
+    cache.get_or_build((0,), {}, calls(0))
+    cache.get_or_build((1,), {}, calls(1))
+    cache.get_or_build((0,), {}, calls(0))
+    cache.get_or_build((2,), {}, calls(2))
+    # 1 was the least recently used, so was evicted.
+    assert cache.get_or_build((1,), {}, calls(1)) == 1
+    assert calls.count == 4
+    assert cache.info() == _info(hits=1, misses=4, currsize=2, maxsize=2)
+
+    cache = blqs.ResultCache(maxsize=0)
+    cache.get_or_build((0,), {}, calls(0))
+    cache.get_or_build((0,), {}, calls(0))
+    assert cache.info() == _info(hits=0, misses=2, currsize=0, maxsize=0)
+
+    with pytest.raises(ValueError, match="non-negative"):
+        blqs.ResultCache(maxsize=-1)
+
+
+def test_result_cache_weak_keys():
+    cache = blqs.ResultCache(weak_keys=True)
+    calls = Calls()
+    layout = Layout(3)
+    other_layout = Layout(3)
+    assert cache.get_or_build((layout, 1), {}, calls("a")) == "a"
+    assert cache.get_or_build((layout, 1), {}, calls("b")) == "a"
+    assert cache.get_or_build((other_layout, 1), {}, calls("c")) == "c"
+    assert cache.get_or_build((), {"layout": layout}, calls("d")) == "d"
+    assert cache.info() == _info(hits=1, misses=3, currsize=3, weak_keys=True)
+
+    del layout
+    gc.collect()
+    assert cache.info() == _info(hits=1, misses=3, currsize=1, weak_keys=True)
+    assert cache.get_or_build((other_layout, 1), {}, calls("e")) == "c"
+
+
+def test_result_cache_strong_keys():
+    cache = blqs.ResultCache()
+    layout = Layout(3)
+    cache.get_or_build((layout,), {}, Calls()("a"))
+    del layout
+    gc.collect()
+    assert cache.info().currsize == 1
+
+
+def test_result_cache_threads():
+    cache = blqs.ResultCache(maxsize=10)
+    barrier = threading.Barrier(16)
+    errors = []
+
+    def call(index):
+        try:
+            barrier.wait()
+            for i in range(200):
+                value = (index + i) % 20
+                assert cache.get_or_build((value,), {}, lambda: value) == value
+        except Exception as e:  # coverage: ignore
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    info = cache.info()
+    assert info.hits + info.misses == 16 * 200
+    assert info.currsize == 10
+
+
+def test_result_cache_info_of_builder():
+    def fn():
+        blqs.Op("H")(0)
+
+    assert blqs.result_cache_info(blqs.build(fn)) is None
+    blqs.clear_result_cache(blqs.build(fn))
+
+    built_fn = blqs.build_with_config(blqs.BuildConfig(cache_results=True))(fn)
+    built_fn()
+    built_fn()
+    assert blqs.result_cache_info(built_fn) == _info(hits=1, misses=1, currsize=1)
+    blqs.clear_result_cache(built_fn)
+    assert blqs.result_cache_info(built_fn) == _info(hits=0, misses=0, currsize=0)
@@ -0,0 +1,672 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A compact, versioned binary format for `blqs.Program`s.
+
+A serialized program consists of
+
+    * a header of the magic bytes `BLQS`, the format version, flags, and the sizes of the rest,
+    * tables of the strings, ops and targets used by the program, serialized with `marshal`,
+    * a flat stream of the statements of the program, as little-endian 32 bit words.
+
+Each statement in the stream is a word of its kind and a count, followed by the indices of its
+op, targets and names in the tables. Statements containing blocks are followed by the number of
+statements in each block, and whether it is frozen, and then those statements. Instructions on the
+same op and targets share the table entries of these, so that the stream of a program of many
+instructions takes a few words per instruction. The block of a subroutine follows the first call
+of it, and later calls of it refer to it by index, so that it is only stored once.
+
+Instructions, broadcast instructions, assignments, deletions, if statements, for and while loops,
+calls and blocks are serialized, as are ops, registers, iterables, and targets which are ints,
+floats, complex numbers, strings, bytes, booleans or None. Other statements, ops and targets, such
+as the statements and qubits of `blqs_cirq`, are pickled, and so as with pickle, only trusted data
+should be loaded. The names of assignments and deletions are loaded as tuples.
+
+Blocks, and the statements above, are pickled in this format, so that pickling them is fast,
+compact, and does not recurse into nested blocks.
+"""
+
+import array
+import itertools
+import marshal
+import mmap
+import pickle
+import struct
+import sys
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from blqs import (
+    assignment,
+    block,
+    block_stack,
+    conditional,
+    delete,
+    instruction,
+    iterable,
+    loops,
+    op as op_lib,
+    program,
+    protocols,
+    register,
+    statement,
+    subroutine,
+)
+
+_MAGIC = b"BLQS"
+
+# Bump this whenever the format changes.
+_FORMAT_VERSION = 3
+
+# The magic bytes, format version, flags, length of the tables in bytes, number of words in the
+# statement stream and number of statements in the program.
+_HEADER = struct.Struct("<4sHHQQQ")
+
+# Flags of the header.
+_COLUMNAR = 1
+_FROZEN = 2
+
+# The kinds of statements, in the low bits of their first word. The rest of the word is a count.
+_INSTRUCTION = 0
+_BROADCAST_INSTRUCTION = 1
+_ASSIGN = 2
+_DELETE = 3
+_IF = 4
+_FOR = 5
+_WHILE = 6
+_BLOCK = 7
+_PICKLED_STATEMENT = 8
+_CALL = 9
+_KIND_BITS = 4
+_KIND_MASK = (1 << _KIND_BITS) - 1
+
+# The kinds of entries of the op and target tables.
+_VALUE = 0
+_OP = 1
+_REGISTER = 2
+_ITERABLE = 3
+_PICKLED = 4
+
+# The number of statements `ProgramReader` decodes at a time.
+_READ_BATCH_SIZE = 1024
+
+# Targets of these types are stored in the target table by `marshal`.
+_VALUE_TYPES = frozenset((int, float, complex, str, bytes, bool, type(None)))
+
+
+class _Count:
+    """A number of statements, written to the stream between the blocks of a statement."""
+
+    __slots__ = ("count",)
+
+    def __init__(self, count: int):
+        self.count = count
+
+
+def _count(b: block.Block) -> int:
+    """The word of the number of statements in a block, and whether it is frozen."""
+    return len(b) << 1 | b.is_frozen()
+
+
+class _Encoder:
+    """Builds the tables and statement stream of a program."""
+
+    __slots__ = (
+        "_strings",
+        "_op_ids",
+        "_ops",
+        "_target_ids",
+        "_targets",
+        "_statements",
+        "_subroutine_ids",
+        "_words",
+    )
+
+    def __init__(self) -> None:
+        self._strings: Dict[str, int] = {}
+        self._op_ids: Dict[Any, int] = {}
+        self._ops: List[Tuple] = []
+        self._target_ids: Dict[Any, int] = {}
+        self._targets: List[Tuple] = []
+        self._statements: List[bytes] = []
+        # The index of the block of each subroutine, keyed by its id. The blocks are kept alive by
+        # the statements being encoded.
+        self._subroutine_ids: Dict[int, int] = {}
+        self._words = array.array("I")
+
+    def _string(self, value: str) -> int:
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+        return index
+
+    def _op(self, value: Any) -> int:
+        key: Any = (value.__class__, value)
+        try:
+            index = self._op_ids.get(key)
+        except TypeError:
+            index, key = None, None
+        if index is None:
+            if value.__class__ is op_lib.Op and value.name().__class__ is str:
+                entry: Tuple = (_OP, self._string(value.name()))
+            else:
+                entry = (_PICKLED, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            index = len(self._ops)
+            self._ops.append(entry)
+            if key is not None:
+                self._op_ids[key] = index
+        return index
+
+    def _target(self, value: Any) -> int:
+        cls = value.__class__
+        if cls is register.Register:
+            # Registers are equal if their names are, so their flags are part of the key.
+            key: Any = (
+                cls,
+                value.name(),
+                value._is_readable_(),
+                value._is_writable_(),
+                value._is_deletable_(),
+            )
+        else:
+            key = (cls, value)
+        try:
+            index = self._target_ids.get(key)
+        except TypeError:
+            index, key = None, None
+        if index is None:
+            if cls in _VALUE_TYPES:
+                entry: Tuple = (_VALUE, value)
+            elif cls is register.Register and value.name().__class__ is str:
+                entry = (_REGISTER, self._string(value.name()), *key[2:])
+            elif cls is iterable.Iterable and value.name().__class__ is str:
+                loop_vars = tuple(self._target(v) for v in protocols.loop_vars(value))
+                entry = (_ITERABLE, self._string(value.name()), loop_vars)
+            else:
+                entry = (_PICKLED, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            index = len(self._targets)
+            self._targets.append(entry)
+            if key is not None:
+                self._target_ids[key] = index
+        return index
+
+    def encode(self, statements: Iterable[statement.Statement]):
+        """Appends the statements, and those nested in them, to the statement stream.
+
+        Nested blocks are encoded without recursion, so that deeply nested programs can be encoded.
+        """
+        append = self._words.append
+        target = self._target
+        stack: List[Iterator] = [iter(statements)]
+        while stack:
+            for stmt in stack[-1]:
+                cls = stmt.__class__
+                if cls is instruction.Instruction:
+                    targets = stmt.targets()
+                    append(_INSTRUCTION | len(targets) << _KIND_BITS)
+                    append(self._op(stmt.op()))
+                    for t in targets:
+                        append(target(t))
+                elif cls is _Count:
+                    append(stmt.count)
+                elif cls is block.Block:
+                    append(_BLOCK | stmt.is_columnar() << _KIND_BITS)
+                    append(_count(stmt))
+                    stack.append(iter(stmt))
+                    break
+                elif cls is conditional.If:
+                    append(_IF)
+                    append(target(stmt.condition()))
+                    stack.append(self._blocks(stmt.if_block(), stmt.else_block()))
+                    break
+                elif cls is loops.For:
+                    append(_FOR)
+                    append(target(stmt.iterable()))
+                    stack.append(self._blocks(stmt.loop_block(), stmt.else_block()))
+                    break
+                elif cls is loops.While:
+                    append(_WHILE)
+                    append(target(stmt.condition()))
+                    stack.append(self._blocks(stmt.loop_block(), stmt.else_block()))
+                    break
+                elif cls is instruction.BroadcastInstruction:
+                    targets = stmt.targets()
+                    append(_BROADCAST_INSTRUCTION | len(targets) << _KIND_BITS)
+                    append(self._op(stmt.op()))
+                    for t in targets:
+                        append(target(t))
+                elif cls is assignment.Assign:
+                    names = stmt.assign_names()
+                    append(_ASSIGN | len(names) << _KIND_BITS)
+                    append(target(stmt.value()))
+                    for name in names:
+                        append(self._string(name))
+                elif cls is delete.Delete:
+                    names = stmt.delete_names()
+                    append(_DELETE | len(names) << _KIND_BITS)
+                    for name in names:
+                        append(self._string(name))
+                elif cls is subroutine.Call:
+                    args = stmt.args()
+                    kwargs = stmt.kwargs()
+                    append(_CALL | len(args) << _KIND_BITS)
+                    append(self._string(stmt.name()))
+                    for a in args:
+                        append(target(a))
+                    append(len(kwargs))
+                    for name, value in kwargs.items():
+                        append(self._string(name))
+                        append(target(value))
+                    body = stmt.block()
+                    index = self._subroutine_ids.get(id(body))
+                    if index is not None:
+                        append(index << 1)
+                        continue
+                    index = self._subroutine_ids[id(body)] = len(self._subroutine_ids)
+                    append(index << 1 | 1)
+                    append(body.is_columnar())
+                    append(_count(body))
+                    stack.append(iter(body))
+                    break
+                else:
+                    append(_PICKLED_STATEMENT)
+                    append(len(self._statements))
+                    self._statements.append(pickle.dumps(stmt, pickle.HIGHEST_PROTOCOL))
+            else:
+                stack.pop()
+
+    def _blocks(self, first: block.Block, second: block.Block) -> Iterator:
+        self._words.append(_count(first))
+        return itertools.chain(first, (_Count(_count(second)),), second)
+
+    def tables(self) -> bytes:
+        return marshal.dumps(
+            (
+                tuple(self._strings),
+                tuple(self._ops),
+                tuple(self._targets),
+                tuple(self._statements),
+            ),
+            4,
+        )
+
+    def words(self) -> bytes:
+        words = self._words
+        if sys.byteorder == "big":
+            words = array.array("I", words)  # coverage: ignore
+            words.byteswap()  # coverage: ignore
+        return words.tobytes()
+
+
+def dumps(prog: block.Block) -> bytes:
+    """Serializes a program to bytes.
+
+    Args:
+        prog: The program, or block, to serialize.
+
+    Returns:
+        The serialized program, which can be loaded with `blqs.loads`.
+
+    Raises:
+        pickle.PicklingError: If the program contains statements, ops or targets which must be
+            pickled, see `blqs.serialization`, but cannot be.
+    """
+    flags = (_COLUMNAR if prog.is_columnar() else 0) | (_FROZEN if prog.is_frozen() else 0)
+    return _dumps(prog, flags)
+
+
+def _dumps(statements: Union[block.Block, Sequence[statement.Statement]], flags: int) -> bytes:
+    encoder = _Encoder()
+    encoder.encode(statements)
+    tables = encoder.tables()
+    words = encoder.words()
+    padding = b"\0" * (-len(tables) % 4)
+    header = _HEADER.pack(
+        _MAGIC, _FORMAT_VERSION, flags, len(tables) + len(padding), len(words) // 4, len(statements)
+    )
+    return b"".join((header, tables, padding, words))
+
+
+def dump(prog: block.Block, file: BinaryIO):
+    """Serializes a program to a binary file. See `blqs.dumps`."""
+    file.write(dumps(prog))
+
+
+class _Serialized:
+    """The header and tables of a serialized program, and its statement stream."""
+
+    __slots__ = (
+        "flags",
+        "num_statements",
+        "strings",
+        "ops",
+        "targets",
+        "statements",
+        "words",
+    )
+
+    def __init__(self, data: Any):
+        if len(data) < _HEADER.size:
+            raise ValueError("Data is not a serialized blqs program.")
+        magic, version, flags, tables_size, num_words, num_statements = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Data is not a serialized blqs program.")
+        if version != _FORMAT_VERSION:
+            raise ValueError(
+                f"Serialized blqs program has format version {version}, but only version "
+                f"{_FORMAT_VERSION} is supported."
+            )
+        words_start = _HEADER.size + tables_size
+        words_end = words_start + 4 * num_words
+        if len(data) != words_end:
+            raise ValueError("Serialized blqs program is truncated or corrupt.")
+        self.flags = flags
+        self.num_statements = num_statements
+        try:
+            self.strings, ops, targets, self.statements = marshal.loads(
+                data[_HEADER.size : words_start]
+            )
+            with block_stack.detached():
+                self.ops = [self._entry(e, None) for e in ops]
+                self.targets: List[Any] = []
+                for entry in targets:
+                    self.targets.append(self._entry(entry, self.targets))
+        except (EOFError, ValueError, TypeError, IndexError) as e:
+            raise ValueError("Serialized blqs program is truncated or corrupt.") from e
+        words: Any = memoryview(data)[words_start:words_end].cast("I")
+        if sys.byteorder == "big":
+            words = array.array("I", words)  # coverage: ignore
+            words.byteswap()  # coverage: ignore
+        self.words = words
+
+    def _entry(self, entry: Tuple, targets: Optional[List[Any]]) -> Any:
+        kind = entry[0]
+        if kind == _VALUE and targets is not None:
+            return entry[1]
+        if kind == _OP and targets is None:
+            return op_lib.Op(self.strings[entry[1]])
+        if kind == _REGISTER and targets is not None:
+            return register.Register(self.strings[entry[1]], *entry[2:])
+        if kind == _ITERABLE and targets is not None:
+            return iterable.Iterable(self.strings[entry[1]], *(targets[i] for i in entry[2]))
+        if kind == _PICKLED:
+            return pickle.loads(entry[1])
+        raise ValueError(f"Unknown table entry {entry!r}.")
+
+    def decode(self, words: Iterator[int], dest: Any, count: int, subroutines: List[block.Block]):
+        """Decodes statements from the stream, appending them to `dest`.
+
+        Args:
+            words: An iterator over the statement stream.
+            dest: A block, or list, to append the statements to.
+            count: The number of statements to decode, not counting those nested in them.
+            subroutines: The blocks of the subroutines decoded so far from `words`, in the order of
+                their indices. The blocks of new subroutines are appended to this. Each pass over
+                the stream starts with an empty list.
+
+        Raises:
+            ValueError: If the stream is corrupt.
+        """
+        try:
+            with block_stack.detached():
+                self._decode(words, dest, count, subroutines)
+        except (StopIteration, ValueError, TypeError, IndexError, AssertionError) as e:
+            raise ValueError("Serialized blqs program is truncated or corrupt.") from e
+
+    def _decode(self, words: Iterator[int], dest: Any, count: int, subroutines: List[block.Block]):
+        ops = self.ops
+        targets = self.targets
+        get_target = targets.__getitem__
+        from_fields = instruction.Instruction._from_fields
+        islice = itertools.islice
+        # The statements decoded for the current block, which are added to it once it is complete,
+        # the number of its statements left to decode, the block to decode after it, if any, and
+        # whether to freeze it. The state of the blocks containing it is on the stack.
+        decoded: List[statement.Statement] = []
+        after: Any = None
+        frozen = 0
+        stack: List[Tuple[Any, List[statement.Statement], int, Any, int]] = []
+        while True:
+            while count:
+                count -= 1
+                header = next(words)
+                kind = header & _KIND_MASK
+                if kind == _INSTRUCTION:
+                    op = ops[next(words)]
+                    num_targets = header >> _KIND_BITS
+                    if num_targets == 1:
+                        instruction_targets: Tuple = (targets[next(words)],)
+                    elif num_targets == 2:
+                        instruction_targets = (targets[next(words)], targets[next(words)])
+                    else:
+                        instruction_targets = tuple(map(get_target, islice(words, num_targets)))
+                    decoded.append(from_fields(op, instruction_targets))
+                    continue
+                if kind == _BROADCAST_INSTRUCTION:
+                    op = ops[next(words)]
+                    stmt: Any = instruction.BroadcastInstruction(
+                        op, tuple(map(get_target, islice(words, header >> _KIND_BITS)))
+                    )
+                elif kind == _ASSIGN:
+                    value = targets[next(words)]
+                    names = islice(words, header >> _KIND_BITS)
+                    stmt = assignment.Assign(tuple(map(self.strings.__getitem__, names)), value)
+                elif kind == _DELETE:
+                    names = islice(words, header >> _KIND_BITS)
+                    stmt = delete.Delete(tuple(map(self.strings.__getitem__, names)))
+                elif kind == _BLOCK:
+                    stmt = block.Block(columnar=bool(header >> _KIND_BITS))
+                    decoded.append(stmt)
+                    stack.append((dest, decoded, count, after, frozen))
+                    word = next(words)
+                    dest, decoded, count, after, frozen = stmt, [], word >> 1, None, word & 1
+                    continue
+                elif kind in (_IF, _FOR, _WHILE):
+                    condition = targets[next(words)]
+                    if kind == _IF:
+                        stmt = conditional.If(condition)
+                        first, second = stmt.if_block(), stmt.else_block()
+                    else:
+                        stmt = (loops.For if kind == _FOR else loops.While)(condition)
+                        first, second = stmt.loop_block(), stmt.else_block()
+                    decoded.append(stmt)
+                    stack.append((dest, decoded, count, after, frozen))
+                    word = next(words)
+                    dest, decoded, count, after, frozen = first, [], word >> 1, second, word & 1
+                    continue
+                elif kind == _CALL:
+                    name = self.strings[next(words)]
+                    args = tuple(map(get_target, islice(words, header >> _KIND_BITS)))
+                    kwargs = tuple(
+                        (self.strings[next(words)], targets[next(words)])
+                        for _ in range(next(words))
+                    )
+                    word = next(words)
+                    if not word & 1:
+                        stmt = subroutine.Call._from_fields(
+                            name, subroutines[word >> 1], args, kwargs
+                        )
+                    else:
+                        if word >> 1 != len(subroutines):
+                            raise ValueError("Subroutine index out of order.")
+                        body = block.Block(columnar=bool(next(words)))
+                        subroutines.append(body)
+                        decoded.append(subroutine.Call._from_fields(name, body, args, kwargs))
+                        stack.append((dest, decoded, count, after, frozen))
+                        word = next(words)
+                        dest, decoded, count, after, frozen = body, [], word >> 1, None, word & 1
+                        continue
+                elif kind == _PICKLED_STATEMENT:
+                    stmt = pickle.loads(self.statements[next(words)])
+                else:
+                    raise ValueError(f"Unknown statement kind {kind}.")
+                decoded.append(stmt)
+            dest.extend(decoded)
+            if frozen:
+                dest.freeze()
+            if after is not None:
+                word = next(words)
+                dest, decoded, count, after, frozen = after, [], word >> 1, None, word & 1
+            elif stack:
+                dest, decoded, count, after, frozen = stack.pop()
+            else:
+                return
+
+    def statements_list(self) -> List[statement.Statement]:
+        decoded: List[statement.Statement] = []
+        self._decode_all(decoded)
+        return decoded
+
+    def block(self, cls: Type[block.Block]) -> Any:
+        with block_stack.detached():
+            decoded = cls(columnar=bool(self.flags & _COLUMNAR))
+        self._decode_all(decoded)
+        if self.flags & _FROZEN:
+            decoded.freeze()
+        return decoded
+
+    def _decode_all(self, dest: Any):
+        words = iter(self.words)
+        self.decode(words, dest, self.num_statements, [])
+        if next(words, None) is not None:
+            raise ValueError("Serialized blqs program is truncated or corrupt.")
+
+
+def loads(data: bytes) -> program.Program:
+    """Loads a program serialized by `blqs.dumps`.
+
+    Args:
+        data: The serialized program, as bytes or any other object supporting the buffer protocol.
+
+    Returns:
+        The program. This is not added to the current block.
+
+    Raises:
+        ValueError: If the data is not a serialized program, has a different format version, or is
+            corrupt.
+    """
+    return _Serialized(data).block(program.Program)
+
+
+def load(file: BinaryIO) -> program.Program:
+    """Loads a program serialized by `blqs.dump` from a binary file. See `blqs.loads`."""
+    return loads(file.read())
+
+
+def dumps_statement(stmt: statement.Statement) -> bytes:
+    """Serializes a single statement, for pickling it."""
+    return _dumps((stmt,), 0)
+
+
+def loads_statement(data: bytes) -> statement.Statement:
+    """Loads a statement serialized by `dumps_statement`."""
+    (stmt,) = _Serialized(data).statements_list()
+    return stmt
+
+
+def loads_block(data: bytes) -> block.Block:
+    """Loads a block serialized by `blqs.dumps`, as a `blqs.Block` rather than a program."""
+    return _Serialized(data).block(block.Block)
+
+
+class ProgramReader:
+    """Reads a program serialized by `blqs.dump` from a memory mapped file.
+
+    Iterating over the reader decodes the statements of the program one at a time, without reading
+    the statement stream of the whole program into memory. Only the tables of the program are
+    read when the reader is opened.
+
+    ```
+    with blqs.ProgramReader(path) as reader:
+        for statement in reader:
+            ...
+    ```
+
+    The reader should be closed with `close`, or used in a `with` statement, which closes it on
+    exit. Statements already read remain valid after it is closed.
+    """
+
+    __slots__ = ("_mmap", "_serialized")
+
+    def __init__(self, path: str):
+        """Opens the reader.
+
+        Args:
+            path: The path of the file containing the serialized program.
+
+        Raises:
+            ValueError: If the file does not contain a serialized program, see `blqs.loads`.
+        """
+        with open(path, "rb") as f:
+            size = f.seek(0, 2)
+            if size < _HEADER.size:
+                raise ValueError("Data is not a serialized blqs program.")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._serialized: Optional[_Serialized] = _Serialized(self._mmap)
+        except BaseException:
+            self._mmap.close()
+            raise
+
+    def __len__(self) -> int:
+        """The number of statements in the program, not counting those nested in them."""
+        return self._open().num_statements
+
+    def __iter__(self) -> Iterator[statement.Statement]:
+        serialized = self._open()
+        words = iter(serialized.words)
+        subroutines: List[block.Block] = []
+        remaining = serialized.num_statements
+        while remaining:
+            # The reader may have been closed while the statements of the last batch were used.
+            self._open()
+            # Statements are decoded in batches, since each decoding has some overhead.
+            decoded: List[statement.Statement] = []
+            serialized.decode(words, decoded, min(remaining, _READ_BATCH_SIZE), subroutines)
+            remaining -= len(decoded)
+            yield from decoded
+
+    def program(self) -> program.Program:
+        """Reads the whole program."""
+        return self._open().block(program.Program)
+
+    def close(self):
+        """Closes the reader and unmaps the file. Closing a closed reader does nothing."""
+        if self._serialized is not None:
+            words = self._serialized.words
+            self._serialized = None
+            if isinstance(words, memoryview):
+                words.release()
+            self._mmap.close()
+
+    def __enter__(self) -> "ProgramReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open(self) -> _Serialized:
+        if self._serialized is None:
+            raise ValueError("The reader is closed.")
+        return self._serialized
@@ -0,0 +1,346 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+import pickle
+import struct
+
+import pytest
+
+import blqs
+
+H = blqs.Op("H")
+X = blqs.Op("X")
+
+
+class Qubit:
+    def __init__(self, index):
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, Qubit) and self.index == other.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+
+class MyOp(blqs.Op):
+    pass
+
+
+class MyInstruction(blqs.Instruction):
+    pass
+
+
+class MyBlock(blqs.Block):
+    pass
+
+
+def _program():
+    with blqs.Program() as program:
+        H(0)
+        X(blqs.Register("a"), 1)
+        blqs.Assign(("b", "c"), blqs.Register("d"))
+        blqs.Delete(("b",))
+        if_statement = blqs.If(blqs.Register("e"))
+        with if_statement.if_block():
+            H(1)
+            with blqs.Block():
+                H(2)
+        with if_statement.else_block():
+            X(3)
+        for_statement = blqs.For(blqs.Iterable("range(5)", blqs.Register("f")))
+        with for_statement.loop_block():
+            H(blqs.Register("f"))
+        with for_statement.else_block():
+            H()
+        while_statement = blqs.While(blqs.Register("g"))
+        with while_statement.else_block():
+            X.on_each(4, 5, 6)
+        blqs.Block()
+        H(0)
+    return program
+
+
+def test_dumps_loads():
+    program = _program()
+    loaded = blqs.loads(blqs.dumps(program))
+    assert isinstance(loaded, blqs.Program)
+    assert loaded == program
+    assert str(loaded) == str(program)
+
+
+def test_dumps_loads_targets():
+    targets = (1, True, 1.5, 2j, "s", b"b", None, 2**100, Qubit(0), Qubit(0), [1])
+    loaded = blqs.loads(blqs.dumps(blqs.Program.of(H(*targets))))
+    (instruction,) = loaded
+    assert instruction == H(*targets)
+    assert [type(t) for t in instruction.targets()] == [type(t) for t in targets]
+    assert instruction.targets()[8] is instruction.targets()[9]
+
+
+def test_dumps_loads_registers():
+    registers = (
+        blqs.Register("a"),
+        blqs.Register("a", is_readable=False),
+        blqs.Register("a", is_writable=False, is_deletable=False),
+    )
+    loaded = blqs.loads(blqs.dumps(blqs.Program.of(H(*registers))))
+    for loaded_register, register in zip(loaded[0].targets(), registers):
+        assert loaded_register.name() == "a"
+        assert blqs.is_readable(loaded_register) == blqs.is_readable(register)
+        assert blqs.is_writable(loaded_register) == blqs.is_writable(register)
+        assert blqs.is_deletable(loaded_register) == blqs.is_deletable(register)
+
+
+def test_dumps_loads_iterable():
+    iterable = blqs.Iterable("zip(a, b)", blqs.Register("a"), blqs.Register("b"))
+    program = blqs.Program.of(blqs.For(iterable))
+    (loop,) = blqs.loads(blqs.dumps(program))
+    assert loop.iterable() == iterable
+    assert blqs.loop_vars(loop.iterable()) == (blqs.Register("a"), blqs.Register("b"))
+
+
+def test_dumps_loads_pickled_op():
+    program = blqs.Program.of(MyOp("H")(0), H(0))
+    loaded = blqs.loads(blqs.dumps(program))
+    assert loaded == program
+    assert type(loaded[0].op()) is MyOp
+
+
+def test_dumps_shares_tables():
+    size = len(blqs.dumps(blqs.Program.of(H(0, 1))))
+    # Each further instruction on the same op and targets takes four words.
+    assert len(blqs.dumps(blqs.Program.of(*[H(0, 1)] * 11))) == size + 10 * 16
+
+
+def test_dumps_loads_pickled_statements():
+    program = blqs.Program.of(
+        H(0), blqs.Block.of(MyInstruction(H, 0), "a"), MyBlock.of(H(1)), blqs.Block.of(H(2))
+    )
+    loaded = blqs.loads(blqs.dumps(program))
+    assert loaded == program
+    assert type(loaded[1][0]) is MyInstruction
+    assert type(loaded[2]) is MyBlock
+    # Equal statements which are pickled are not shared.
+    program = blqs.Program.of(MyBlock(), MyBlock())
+    loaded = blqs.loads(blqs.dumps(program))
+    assert loaded[0] is not loaded[1]
+
+
+def test_dumps_unpicklable_statement():
+    class LocalInstruction(blqs.Instruction):
+        pass
+
+    with pytest.raises((AttributeError, pickle.PicklingError)):
+        blqs.dumps(blqs.Program.of(LocalInstruction(H, 0)))
+
+
+def test_dumps_loads_block():
+    loaded = blqs.loads(blqs.dumps(blqs.Block.of(H(0), blqs.Block.of(H(1)))))
+    assert loaded == blqs.Program.of(H(0), blqs.Block.of(H(1)))
+
+
+def test_dumps_loads_columnar():
+    with blqs.Program(columnar=True) as program:
+        H(0)
+        with blqs.Block(columnar=True):
+            X(1)
+        with blqs.Block():
+            X(2)
+    loaded = blqs.loads(blqs.dumps(program))
+    assert loaded == program
+    assert loaded.is_columnar()
+    assert loaded[1].is_columnar()
+    assert not loaded[2].is_columnar()
+
+
+def test_dumps_loads_frozen():
+    program = _program().freeze()
+    loaded = blqs.loads(blqs.dumps(program))
+    assert loaded == program
+    assert loaded.is_frozen()
+    assert loaded[4].if_block().is_frozen()
+    assert loaded[4].if_block()[1].is_frozen()
+    assert hash(loaded) == hash(program)
+
+    with blqs.Program() as program:
+        with blqs.Block():
+            H(0)
+        if_statement = blqs.If(blqs.Register("a"))
+    program[0].freeze()
+    if_statement.else_block().freeze()
+    loaded = blqs.loads(blqs.dumps(program))
+    assert [loaded.is_frozen(), loaded[0].is_frozen()] == [False, True]
+    assert [loaded[1].if_block().is_frozen(), loaded[1].else_block().is_frozen()] == [False, True]
+
+
+def test_loads_in_block():
+    data = blqs.dumps(_program())
+    with blqs.Block() as block:
+        loaded = blqs.loads(data)
+    assert not block
+    assert loaded == _program()
+
+
+def test_dumps_loads_deeply_nested():
+    depth = 5000
+    program = blqs.Program()
+    current = program
+    for _ in range(depth):
+        if_statement = blqs.If(blqs.Register("a"))
+        current.append(if_statement)
+        current = if_statement.else_block()
+    current.append(H(0))
+
+    current = blqs.loads(blqs.dumps(program))
+    for _ in range(depth):
+        (if_statement,) = current
+        assert not if_statement.if_block()
+        current = if_statement.else_block()
+    assert current == blqs.Block.of(H(0))
+
+
+def test_dumps_loads_calls():
+    body = blqs.Block.of(H(0), blqs.Block.of(X(1)))
+    with blqs.Program() as program:
+        blqs.Call("sub", body, (Qubit(0),), {"a": "b"})
+        with blqs.Block():
+            blqs.Call("sub", body, (Qubit(0),), {"a": "b"})
+        blqs.Call("other", blqs.Block.of(), ())
+    loaded = blqs.loads(blqs.dumps(program))
+    assert loaded == program
+    assert loaded[0].block() is loaded[1][0].block()
+    assert loaded[0].block().is_frozen()
+    assert loaded[0].kwargs() == {"a": "b"}
+
+
+def test_dumps_calls_size():
+    body = blqs.Block.of(*(H(i) for i in range(100)))
+    one = blqs.dumps(blqs.Program.of(blqs.Call("sub", body)))
+    many = blqs.dumps(blqs.Program.of(*(blqs.Call("sub", body) for _ in range(100))))
+    # Each call after the first is two words, its header and the index of its block.
+    assert len(many) - len(one) <= 99 * 16
+
+
+def test_loads_invalid_call():
+    body = blqs.Block.of(H(0))
+    data = blqs.dumps(blqs.Program.of(blqs.Call("sub", body), blqs.Call("sub", body)))
+    # The last word is the index of the block of the second call, shifted by one, with the low
+    # bit set if the block follows. Replace it with the index of a block not yet loaded.
+    assert struct.unpack("<I", data[-4:]) == (0,)
+    with pytest.raises(ValueError, match="corrupt"):
+        blqs.loads(data[:-4] + struct.pack("<I", 1 << 1))
+    with pytest.raises(ValueError, match="corrupt") as e:
+        blqs.loads(data[:-4] + struct.pack("<I", 5 << 1 | 1))
+    assert "Subroutine index out of order" in str(e.value.__cause__)
+
+
+def test_dump_load():
+    file = io.BytesIO()
+    blqs.dump(_program(), file)
+    file.seek(0)
+    assert blqs.load(file) == _program()
+
+
+def test_loads_invalid():
+    data = blqs.dumps(_program())
+    with pytest.raises(ValueError, match="not a serialized"):
+        blqs.loads(b"")
+    with pytest.raises(ValueError, match="not a serialized"):
+        blqs.loads(b"PK" + data[2:])
+    with pytest.raises(ValueError, match="version 99"):
+        blqs.loads(data[:4] + struct.pack("<H", 99) + data[6:])
+    with pytest.raises(ValueError, match="corrupt"):
+        blqs.loads(data[:-4])
+    with pytest.raises(ValueError, match="corrupt"):
+        blqs.loads(data + b"\0\0\0\0")
+    # Corrupt the last word, the target of the last instruction.
+    with pytest.raises(ValueError, match="corrupt"):
+        blqs.loads(data[:-4] + b"\xff\xff\xff\xff")
+
+
+def test_program_reader(tmp_path):
+    path = str(tmp_path / "program.blqs")
+    with open(path, "wb") as f:
+        blqs.dump(_program(), f)
+    with blqs.ProgramReader(path) as reader:
+        assert len(reader) == len(_program())
+        assert list(reader) == list(_program())
+        assert reader.program() == _program()
+        # Statements are not added to the current block.
+        with blqs.Block() as block:
+            next(iter(reader))
+        assert not block
+
+
+def test_program_reader_many_statements(tmp_path):
+    path = str(tmp_path / "program.blqs")
+    program = blqs.Program.of(*(H(i) for i in range(3000)))
+    with open(path, "wb") as f:
+        blqs.dump(program, f)
+    with blqs.ProgramReader(path) as reader:
+        assert list(reader) == list(program)
+
+
+def test_program_reader_close(tmp_path):
+    path = str(tmp_path / "program.blqs")
+    with open(path, "wb") as f:
+        blqs.dump(_program(), f)
+    reader = blqs.ProgramReader(path)
+    statement = next(iter(reader))
+    reader.close()
+    reader.close()
+    assert statement == H(0)
+    with pytest.raises(ValueError, match="closed"):
+        list(reader)
+    with pytest.raises(ValueError, match="closed"):
+        len(reader)
+
+
+def test_program_reader_calls_read_twice(tmp_path, monkeypatch):
+    body = blqs.Block.of(H(0))
+    program = blqs.Program.of(*(blqs.Call("sub", body, (i % 2,)) for i in range(5)))
+    path = str(tmp_path / "program.blqs")
+    with open(path, "wb") as f:
+        blqs.dump(program, f)
+    monkeypatch.setattr(blqs.serialization, "_READ_BATCH_SIZE", 2)
+    with blqs.ProgramReader(path) as reader:
+        assert reader.program() == program
+        assert reader.program() == program
+        assert list(reader) == list(program)
+        first, second = iter(reader), iter(reader)
+        assert [next(first), next(second), next(first)] == [program[0], program[0], program[1]]
+        assert list(second) == list(program[1:])
+
+
+def test_program_reader_closed_while_iterating(tmp_path, monkeypatch):
+    path = str(tmp_path / "program.blqs")
+    with open(path, "wb") as f:
+        blqs.dump(blqs.Program.of(*(H(i) for i in range(5))), f)
+    monkeypatch.setattr(blqs.serialization, "_READ_BATCH_SIZE", 2)
+    reader = blqs.ProgramReader(path)
+    statements = iter(reader)
+    assert [next(statements), next(statements)] == [H(0), H(1)]
+    reader.close()
+    with pytest.raises(ValueError, match="The reader is closed"):
+        next(statements)
+
+
+def test_program_reader_invalid(tmp_path):
+    path = str(tmp_path / "program.blqs")
+    for data in (b"", b"not a program" * 10):
+        with open(path, "wb") as f:
+            f.write(data)
+        with pytest.raises(ValueError, match="not a serialized"):
+            blqs.ProgramReader(path)
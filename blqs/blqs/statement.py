@@ -11,6 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import copy
+from typing import Any, Dict, Optional
+
 from blqs import block_stack
 
 
@@ -29,8 +32,52 @@ class Statement:
     ```
     """
 
+    __slots__ = ()
+
     def __init__(self):
         # When in a block context, always append the statement on creation.
         current_block = block_stack.get_current_block()
         if current_block is not None:
             current_block.append(self)
+
+    def freeze(self) -> "Statement":
+        """Makes the statement immutable, along with the blocks it contains.
+
+        Statements which contain blocks override this to freeze them. See `blqs.Block.freeze`.
+
+        Returns:
+            The statement itself.
+        """
+        return self
+
+
+def copy_statement(stmt: Statement, memo: Optional[Dict[int, Any]] = None) -> Statement:
+    """Copies a statement as `copy.copy` does by default, or as `copy.deepcopy` does with a memo.
+
+    The statements which are pickled in the format of `blqs.dumps` use this to implement
+    `__copy__` and `__deepcopy__`, so that copying them copies their attributes, rather than
+    serializing them, which would require their ops and targets to be picklable.
+
+    Args:
+        stmt: The statement to copy.
+        memo: The memo of `copy.deepcopy`, or None for a shallow copy.
+
+    Returns:
+        The copy.
+    """
+    state = object.__reduce_ex__(stmt, 4)[2]
+    copied = stmt.__class__.__new__(stmt.__class__)
+    if memo is not None:
+        memo[id(stmt)] = copied
+        state = copy.deepcopy(state, memo)
+    if state is None:
+        return copied
+    if hasattr(copied, "__setstate__"):
+        copied.__setstate__(state)
+        return copied
+    dict_state, slot_state = state if isinstance(state, tuple) else (state, None)
+    if dict_state:
+        copied.__dict__.update(dict_state)
+    for name, value in (slot_state or {}).items():
+        setattr(copied, name, value)
+    return copied
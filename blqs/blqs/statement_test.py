@@ -11,6 +11,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import copy
+import pickle
+
+import pytest
+
 import blqs
 
 
@@ -49,3 +54,127 @@ def test_statement_no_default_block():
 
     assert s1 not in b
     assert s2 not in b
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        blqs.Block(),
+        blqs.Program(),
+        blqs.Op("H"),
+        blqs.Instruction(blqs.Op("H"), 0),
+        blqs.Register("a"),
+        blqs.Iterable("range(5)", blqs.Register("a")),
+        blqs.Assign(("a",), blqs.Register("a")),
+        blqs.Delete(("a",)),
+        blqs.If(blqs.Register("a")),
+        blqs.For(blqs.Iterable("range(5)", blqs.Register("a"))),
+        blqs.While(blqs.Register("a")),
+    ],
+)
+def test_statement_classes_have_no_instance_dict(value):
+    assert not hasattr(value, "__dict__")
+    with pytest.raises(AttributeError):
+        value.new_attribute = 1
+    assert copy.deepcopy(value) == value
+    assert pickle.loads(pickle.dumps(value)) == value
+
+
+def test_statement_has_no_instance_dict():
+    assert not hasattr(blqs.Statement(), "__dict__")
+
+
+def test_statement_subclass_instance_dict():
+    class MyInstruction(blqs.Instruction):
+        def __init__(self, op, *targets):
+            super().__init__(op, *targets)
+            self.label = "mine"
+
+    with blqs.Block() as b:
+        instruction = MyInstruction(blqs.Op("H"), 0)
+    assert instruction.label == "mine"
+    assert instruction.op() == blqs.Op("H")
+    assert b == blqs.Block.of(instruction)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        blqs.Block.of(blqs.Op("H")(0)),
+        blqs.Instruction(blqs.Op("H"), 0),
+        blqs.BroadcastInstruction(blqs.Op("H"), (0, 1)),
+        blqs.Assign(("a",), blqs.Register("a")),
+        blqs.Delete(("a",)),
+        blqs.If(blqs.Register("a")),
+        blqs.For(blqs.Iterable("range(5)", blqs.Register("a"))),
+        blqs.While(blqs.Register("a")),
+        blqs.Call("sub", blqs.Block.of(blqs.Op("H")(0)), (0,), {"a": 1}),
+    ],
+)
+def test_statement_unpickled_not_added_to_block(value):
+    data = pickle.dumps(value)
+    with blqs.Block() as b:
+        unpickled = pickle.loads(data)
+    assert unpickled == value
+    assert type(unpickled) is type(value)
+    assert not b
+
+
+def test_statement_subclass_pickle():
+    unpickled = pickle.loads(pickle.dumps(MyIf(blqs.Register("a"))))
+    assert type(unpickled) is MyIf
+    assert unpickled == MyIf(blqs.Register("a"))
+
+
+class MyIf(blqs.If):
+    pass
+
+
+class UnpicklableRegister(blqs.Register):
+    def __reduce_ex__(self, protocol):
+        raise TypeError("Unpicklable")
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _statements_with_unpicklable():
+    target = UnpicklableRegister("a")
+    return [
+        blqs.Block.of(blqs.Op("H")(target)),
+        blqs.Assign(("a",), target),
+        blqs.Delete(("a",)),
+        blqs.If(target),
+        blqs.For(blqs.Iterable("range(5)", target)),
+        blqs.While(target),
+        blqs.Call("sub", blqs.Block.of(blqs.Op("H")(target)), (target,)),
+    ]
+
+
+@pytest.mark.parametrize("value", _statements_with_unpicklable())
+def test_statement_copy_does_not_pickle(value):
+    shallow = copy.copy(value)
+    assert shallow == value
+    assert type(shallow) is type(value)
+    deep = copy.deepcopy(value)
+    assert deep == value
+    assert type(deep) is type(value)
+
+
+def test_statement_unpicklable_target():
+    with pytest.raises(TypeError, match="Unpicklable"):
+        pickle.dumps(_statements_with_unpicklable()[0])
+
+
+def test_statement_copy_is_shallow():
+    with blqs.Block() as inner:
+        blqs.Op("H")(0)
+    if_statement = blqs.If(blqs.Register("a"))
+    b = blqs.Block.of(inner, if_statement)
+    shallow = copy.copy(b)
+    assert shallow[0] is inner
+    assert copy.copy(if_statement).if_block() is if_statement.if_block()
+    deep = copy.deepcopy(b)
+    assert deep == b
+    assert deep[0] is not inner
+    assert deep[1].if_block() is not if_statement.if_block()
@@ -0,0 +1,38 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Statistics about the code generated by `blqs.build`."""
+
+import dataclasses
+
+
+@dataclasses.dataclass(frozen=True)
+class BuildStats:
+    """Statistics about the code generated for a builder.
+
+    Each `if`, `for` and `while` statement and assignment in a builder is a site that the build
+    may capture. Sites whose capture is disabled in the `blqs.BuildConfig` are not counted.
+
+    Attributes:
+        static_native_sites: The number of sites left as plain Python code, because it was shown
+            when building that their condition, iterable or assigned value is always of a builtin
+            type, and so can never be captured.
+        fast_path_sites: The number of sites given a fast path, taken when their value turns
+            out to be of a builtin type when the builder is run.
+        captured_sites: The number of sites which always check whether their value should be
+            captured.
+    """
+
+    static_native_sites: int = 0
+    fast_path_sites: int = 0
+    captured_sites: int = 0
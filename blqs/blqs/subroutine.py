@@ -0,0 +1,138 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from blqs import printer, serialization, statement
+
+if TYPE_CHECKING:
+    import blqs  # coverage: ignore
+
+
+class Call(statement.Statement):
+    """A call of a subroutine, a frozen block which is shared by the calls with the same arguments.
+
+    Unlike a nested block, the statements of the subroutine are not part of the block the call is
+    in, but are referred to by it. A program which calls the same subroutine many times only holds
+    its statements once. Builders add calls, rather than blocks, when they are called within
+    another block if their config has `emit_calls` set, see `blqs.BuildConfig`.
+
+    ```
+    with blqs.Block() as body:
+        H(0)
+    with blqs.Program() as program:
+        blqs.Call("sub", body, (0,))
+        blqs.Call("sub", body, (0,))
+    ```
+    """
+
+    __slots__ = ("_name", "_block", "_args", "_kwargs")
+
+    def __init__(
+        self,
+        name: str,
+        block: blqs.Block,
+        args: Sequence[Any] = (),
+        kwargs: Optional[Mapping[str, Any]] = None,
+    ):
+        """Constructs a call.
+
+        Args:
+            name: The name of the subroutine.
+            block: The statements of the subroutine. This is frozen, see `blqs.Block.freeze`, so
+                that it can be shared.
+            args: The positional arguments the subroutine was built with. Lists and sets in these
+                are stored as tuples and frozensets, see `hashable_arg`.
+            kwargs: The keyword arguments the subroutine was built with, stored as `args` are.
+        """
+        super().__init__()
+        self._name = name
+        self._block = block.freeze()
+        self._args = tuple(map(hashable_arg, args))
+        self._kwargs = tuple((k, hashable_arg(v)) for k, v in kwargs.items()) if kwargs else ()
+
+    @classmethod
+    def _from_fields(
+        cls,
+        name: str,
+        block: blqs.Block,
+        args: Tuple[Any, ...],
+        kwargs: Tuple[Tuple[str, Any], ...],
+    ) -> Call:
+        """Creates a call without adding it to the current block or freezing its block."""
+        call = cls.__new__(cls)
+        call._name = name
+        call._block = block
+        call._args = args
+        call._kwargs = kwargs
+        return call
+
+    def name(self) -> str:
+        return self._name
+
+    def block(self) -> blqs.Block:
+        return self._block
+
+    def args(self) -> Tuple[Any, ...]:
+        return self._args
+
+    def kwargs(self) -> Dict[str, Any]:
+        return dict(self._kwargs)
+
+    __str__ = printer.print_str
+
+    def _print_(self, p: printer.Printer):
+        args = ", ".join((*(str(a) for a in self._args), *(f"{k}={v}" for k, v in self._kwargs)))
+        p.write(f"call {self._name}({args}):\n")
+        p.print(self._block)
+
+    def __eq__(self, other):
+        if not isinstance(other, type(self)):
+            return NotImplemented
+        return (
+            self._name == other._name
+            and self._args == other._args
+            and self._kwargs == other._kwargs
+            and self._block == other._block
+        )
+
+    def __hash__(self):
+        # The block identifies the call, and its hash is cached, so the arguments, which may not be
+        # hashable, are not hashed.
+        return hash((self._name, self._block))
+
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is Call:
+            return serialization.loads_statement, (serialization.dumps_statement(self),)
+        return super().__reduce_ex__(protocol)
+
+    def __copy__(self):
+        return statement.copy_statement(self)
+
+    def __deepcopy__(self, memo):
+        return statement.copy_statement(self, memo)
+
+
+def hashable_arg(value: Any) -> Any:
+    """Returns an argument of a call with its lists and sets replaced by tuples and frozensets.
+
+    This is applied to the lists, tuples and sets within the argument, so that for example a list
+    of lists of qubits becomes a tuple of tuples of them. Other values are returned unchanged.
+    """
+    cls = value.__class__
+    if cls is list or cls is tuple:
+        return tuple(map(hashable_arg, value))
+    if cls is set or cls is frozenset:
+        return frozenset(map(hashable_arg, value))
+    return value
@@ -0,0 +1,98 @@
+# Copyright 2021 The Blqs Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pickle
+
+import pytest
+
+import blqs
+
+H = blqs.Op("H")
+
+
+def test_call():
+    body = blqs.Block.of(H(0))
+    with blqs.Block() as b:
+        call = blqs.Call("sub", body, [0], {"a": 1})
+    assert b == blqs.Block.of(call)
+    assert call.name() == "sub"
+    assert call.block() is body
+    assert body.is_frozen()
+    assert call.args() == (0,)
+    assert call.kwargs() == {"a": 1}
+    assert blqs.Call("sub", body).args() == ()
+    assert blqs.Call("sub", body).kwargs() == {}
+
+
+def test_call_eq():
+    body = blqs.Block.of(H(0))
+    assert blqs.Call("sub", body, (0,)) == blqs.Call("sub", blqs.Block.of(H(0)), (0,))
+    assert hash(blqs.Call("sub", body, (0,))) == hash(blqs.Call("sub", body, (0,)))
+    assert blqs.Call("sub", body, (0,)) != blqs.Call("other", body, (0,))
+    assert blqs.Call("sub", body, (0,)) != blqs.Call("sub", body, (1,))
+    assert blqs.Call("sub", body, (0,)) != blqs.Call("sub", body, (0,), {"a": 1})
+    assert blqs.Call("sub", body) != blqs.Call("sub", blqs.Block.of(H(1)))
+    assert blqs.Call("sub", body) != blqs.Block.of(H(0))
+
+
+def test_call_str():
+    call = blqs.Call("sub", blqs.Block.of(H(0), H(1)), (0,), {"a": 1})
+    assert str(call) == "call sub(0, a=1):\n  H 0\n  H 1"
+    assert str(blqs.Call("sub", blqs.Block.of(H(0)))) == "call sub():\n  H 0"
+
+
+def test_call_pickle_shares_block():
+    body = blqs.Block.of(H(0))
+    program = blqs.Program.of(blqs.Call("sub", body, (0,)), blqs.Call("sub", body, (0,)))
+    unpickled = pickle.loads(pickle.dumps(program))
+    assert unpickled == program
+    assert unpickled[0].block() is unpickled[1].block()
+    assert unpickled[0].block().is_frozen()
+
+
+class MyCall(blqs.Call):
+    pass
+
+
+def test_call_subclass_pickle():
+    unpickled = pickle.loads(pickle.dumps(MyCall("sub", blqs.Block.of(H(0)))))
+    assert type(unpickled) is MyCall
+    assert unpickled == MyCall("sub", blqs.Block.of(H(0)))
+
+
+def test_call_frozen_block_cannot_be_modified():
+    call = blqs.Call("sub", blqs.Block.of(H(0)))
+    with pytest.raises(ValueError, match="Frozen"):
+        call.block().append(H(1))
+
+
+def test_call_list_args():
+    body = blqs.Block.of(H(0))
+    call = blqs.Call("sub", body, ([0, [1, 2]], {3}), {"qubits": [4]})
+    assert call.args() == ((0, (1, 2)), frozenset({3}))
+    assert call.kwargs() == {"qubits": (4,)}
+    assert hash(call) == hash(blqs.Call("sub", body, ((0, (1, 2)), {3}), {"qubits": (4,)}))
+    assert blqs.Program.of(call).freeze().is_frozen()
+
+
+def test_call_unhashable_args():
+    call = blqs.Call("sub", blqs.Block.of(H(0)), ({"a": 1},))
+    assert hash(call) == hash(blqs.Call("sub", blqs.Block.of(H(0)), ({"a": 1},)))
+    assert call != blqs.Call("sub", blqs.Block.of(H(0)), ({"a": 2},))
+
+
+def test_hashable_arg():
+    assert blqs.subroutine.hashable_arg([1, (2, [3])]) == (1, (2, (3,)))
+    assert blqs.subroutine.hashable_arg({1, 2}) == frozenset({1, 2})
+    value = {"a": [1]}
+    assert blqs.subroutine.hashable_arg(value) is value
@@ -262,3 +262,11 @@ def blqs_build_with_only_decorator():
 @decorator_wrapped
 def blqs_build_with_only_decorator_wrapped():
     blqs.Op("X")(0)
+
+
+DEFAULT_TARGET = 3
+
+
+@blqs.build
+def default_args(a, b=DEFAULT_TARGET, *, c: int = 2):
+    blqs.Op("H")(a, b, c)
@@ -14,6 +14,7 @@
 
 from blqs_cirq.build import (
     build,
+    build_many,
     build_with_config,
     BuildConfig,
 )
@@ -129,6 +130,7 @@ from blqs_cirq.moment import (
 
 from blqs_cirq.protocols import (
     decode,
+    decode_each,
     SupportsDecoding,
     NotImplementedType,
 )
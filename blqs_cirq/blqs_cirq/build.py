@@ -11,9 +11,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import concurrent.futures
 import dataclasses
 import functools
-from typing import Optional, Callable
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple, Union
 
 import cirq
 
@@ -37,7 +38,19 @@ class BuildConfig:
             If they are included and support is off, a `ValueError` is thrown.
         support_insert_strategy: Whether or not `InsertStrategy` is supported.
         support_moment: Whether or not `Moment` is supported.
-
+        cache_results: Whether to cache the circuit returned by the builder for each of the
+            arguments it is called with, and return the cached circuit when it is called with the
+            same arguments again. The circuit is cached as a `cirq.FrozenCircuit`, and the program
+            as a frozen `blqs.Program` if `output_circuit` is False, so that it cannot be
+            modified. See the field of the same name of `blqs.BuildConfig` for more details.
+        result_cache_maxsize: The maximum number of circuits cached if `cache_results` is True.
+        result_cache_weak_keys: If `cache_results` is True, whether arguments which can be weakly
+            referenced are, so that their circuits are evicted once they are garbage collected.
+        emit_calls: Whether the builder adds a `blqs.Call` of a shared block when it is called
+            within another builder, rather than a new nested block, see the field of the same name
+            of `blqs.BuildConfig`. Calls are converted to `cirq.CircuitOperation`s, which share
+            the `cirq.FrozenCircuit` of each block, if `support_circuit_operation` is True. When
+            called within another builder, the builder returns this frozen circuit.
     """
 
     output_circuit: bool = True
@@ -46,6 +59,10 @@ class BuildConfig:
     support_circuit_operation: bool = True
     support_insert_strategy: bool = True
     support_moment: bool = True
+    cache_results: bool = False
+    result_cache_maxsize: int = blqs.result_cache.DEFAULT_MAXSIZE
+    result_cache_weak_keys: bool = False
+    emit_calls: bool = False
 
 
 def build(func: Callable) -> Callable:
@@ -94,40 +111,146 @@ def _build(func: Callable, build_config: Optional[BuildConfig] = None) -> Callab
     This method is not intended to be called directly, use build or build_with_config above.
     """
     build_config = build_config or BuildConfig()
+    # The blqs builder, created on the first call.
+    blqs_func: Optional[Callable] = None
+    # The frozen circuits of the shared blocks of the calls the builder adds to other blocks.
+    call_circuits = blqs.ResultCache(build_config.result_cache_maxsize)
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        import blqs_cirq as __blqs_cirq
-
-        blqs_build_config = build_config.blqs_build_config or blqs.BuildConfig()
-        blqs_build_config.additional_decorator_specs = [
-            blqs.DecoratorSpec(module=__blqs_cirq, method=build),
-            blqs.DecoratorSpec(module=__blqs_cirq, method=build_with_config),
-            *blqs_build_config.additional_decorator_specs,
-        ]
-        blqs_func = blqs.build_with_config(blqs_build_config)(func)
+        nonlocal blqs_func
+        if blqs_func is None:
+            blqs_build_config = build_config.blqs_build_config or blqs.BuildConfig()
+            blqs_build_config = dataclasses.replace(
+                blqs_build_config,
+                additional_decorator_specs=(
+                    *_decorator_specs(),
+                    *blqs_build_config.additional_decorator_specs,
+                ),
+                emit_calls=blqs_build_config.emit_calls or build_config.emit_calls,
+            )
+            blqs_func = blqs.build_with_config(blqs_build_config)(func)
         program = blqs_func(*args, **kwargs)
-        return _build_circuit(program, build_config) if build_config.output_circuit else program
+        if not build_config.output_circuit:
+            return program
+        if program.is_frozen() and blqs.get_current_block() is not None:
+            # The program is the shared block of a call, so its circuit is converted once.
+            return call_circuits.get_or_build(
+                (program,), {}, lambda: _build_circuit(program, build_config).freeze()
+            )
+        return _build_circuit(program, build_config)
+
+    if build_config.cache_results:
+        wrapper = _with_result_cache(wrapper, build_config)
+    return wrapper
+
+
+def _with_result_cache(func: Callable, build_config: BuildConfig) -> Callable:
+    """Wraps a builder so that it caches the frozen circuits it returns, see `BuildConfig`."""
+    cache = blqs.ResultCache(build_config.result_cache_maxsize, build_config.result_cache_weak_keys)
+
+    def build_frozen(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if isinstance(result, cirq.Circuit):
+            return result.freeze()
+        return blqs.result_cache.freeze_result(result)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if blqs.get_current_block() is not None:
+            return func(*args, **kwargs)
+        return cache.get_or_build(
+            args, kwargs, lambda: build_frozen(*args, **kwargs), _is_cacheable
+        )
 
+    setattr(wrapper, "_blqs_result_cache", cache)
     return wrapper
 
 
-def _build_circuit(program, build_config, inside_insert_strategy=False, inside_moment=False):
+def _is_cacheable(result: Any) -> bool:
+    """Whether a result of a builder is immutable, so can be cached."""
+    return isinstance(result, cirq.FrozenCircuit) or blqs.result_cache.is_cacheable(result)
+
+
+def build_many(
+    func: Callable,
+    args_iterable: Iterable[Sequence[Any]],
+    *,
+    executor: Union[str, concurrent.futures.Executor] = "process",
+    chunksize: int = 1,
+    ordered: bool = True,
+) -> Iterator[Any]:
+    """Calls a builder on each of many arguments in parallel, yielding the circuits built.
+
+    Typical use is to build a circuit for each of a sweep of parameters
+        ```
+        @build
+        def my_func(angle, layout):
+            my_code
+
+        for circuit in build_many(my_func, itertools.product(angles, layouts)):
+            ...
+        ```
+
+    The builder is compiled once in each worker, and both building the program and converting it
+    to a circuit are done by the workers, so this scales with the number of workers. See
+    `blqs.build_many` for the arguments and how the work is split between the workers. Circuits
+    are sent back from worker processes by pickling them, and programs, for builders whose
+    config does not output a circuit, in the compact format of `blqs.dumps`.
+
+    Returns:
+        An iterator over the circuits built, or over the tuples of their index and circuit if
+        `ordered` is False.
+    """
+    return blqs.build_many(
+        func, args_iterable, executor=executor, chunksize=chunksize, ordered=ordered
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _decorator_specs() -> Tuple[blqs.DecoratorSpec, ...]:
+    """Returns the specs of the `blqs_cirq.build` and `blqs_cirq.build_with_config` decorators."""
+    # To avoid a circular import, this is imported when first needed.
+    import blqs_cirq as __blqs_cirq
+
+    return (
+        blqs.DecoratorSpec(module=__blqs_cirq, method=build),
+        blqs.DecoratorSpec(module=__blqs_cirq, method=build_with_config),
+    )
+
+
+def _build_circuit(
+    program, build_config, inside_insert_strategy=False, inside_moment=False, call_circuits=None
+):
+    # The frozen circuits of the blocks of the calls converted so far, keyed by the id of the block.
+    call_circuits = {} if call_circuits is None else call_circuits
     circuit = cirq.Circuit()
     for statement in program:
         if isinstance(statement, blqs.Instruction):
             targets = statement.targets()
             if hasattr(statement.op(), "gate"):
-                qubits = [protocols.decode(build_config.qubit_decoder, t) for t in targets]
+                qubits = protocols.decode_each(build_config.qubit_decoder, targets)
                 circuit.append(statement.op().gate()(*qubits))
             else:
                 raise ValueError(
                     f"Unsupported instruction type: {type(statement)}. Instruction: {statement}."
                 )
+        elif isinstance(statement, blqs.BroadcastInstruction):
+            if hasattr(statement.op(), "gate"):
+                # Decode all the targets, and append the whole layer, at once.
+                gate = statement.op().gate()
+                qubits = protocols.decode_each(build_config.qubit_decoder, statement.targets())
+                circuit.append([gate(q) for q in qubits])
+            else:
+                raise ValueError(
+                    f"Unsupported instruction type: {type(statement)}. Instruction: {statement}."
+                )
         elif isinstance(statement, repeat.CircuitOperation):
             if build_config.support_circuit_operation:
                 subcircuit = _build_circuit(
-                    statement.circuit_op_block().statements(), build_config
+                    statement.circuit_op_block().statements_view(),
+                    build_config,
+                    call_circuits=call_circuits,
                 ).freeze()
                 circuit.append(cirq.CircuitOperation(subcircuit, **statement.circuit_op_kwargs()))
             else:
@@ -143,9 +266,12 @@ def _build_circuit(program, build_config, inside_insert_strategy=False, inside_m
                     raise ValueError("InsertStrategy cannot be used inside a Moment.")
                 ops = [
                     _build_circuit(
-                        [statement], build_config, inside_insert_strategy=True
+                        [statement],
+                        build_config,
+                        inside_insert_strategy=True,
+                        call_circuits=call_circuits,
                     ).all_operations()
-                    for statement in statement.insert_strategy_block().statements()
+                    for statement in statement.insert_strategy_block().statements_view()
                 ]
                 circuit.append(ops, strategy=statement.strategy())
             else:
@@ -158,7 +284,10 @@ def _build_circuit(program, build_config, inside_insert_strategy=False, inside_m
                 raise ValueError("Moments cannot be nested.")
             if build_config.support_moment:
                 ops = _build_circuit(
-                    statement.statements(), build_config, inside_moment=True
+                    statement.statements_view(),
+                    build_config,
+                    inside_moment=True,
+                    call_circuits=call_circuits,
                 ).all_operations()
                 circuit.append(cirq.Moment(ops))
             else:
@@ -166,6 +295,21 @@ def _build_circuit(program, build_config, inside_insert_strategy=False, inside_m
                     "Encountered Moment block, but support for Moments is "
                     "disabled in the build config."
                 )
+        elif isinstance(statement, blqs.Call):
+            if build_config.support_circuit_operation:
+                body = statement.block()
+                subcircuit = call_circuits.get(id(body))
+                if subcircuit is None:
+                    subcircuit = _build_circuit(
+                        body, build_config, call_circuits=call_circuits
+                    ).freeze()
+                    call_circuits[id(body)] = subcircuit
+                circuit.append(cirq.CircuitOperation(subcircuit))
+            else:
+                raise ValueError(
+                    "Encountered Call, which is converted to a CircuitOperation, but support for "
+                    "CircuitOperations is disabled in the build config."
+                )
         else:
             raise ValueError(
                 f"Unsupported statement type {type(statement)}. Statement: {statement}."
@@ -35,6 +35,78 @@ def test_build_statements():
     )
 
 
+def test_build_on_each():
+    def broadcast():
+        bc.H.on_each(0, 1, 2)
+        bc.CX(0, 1)
+        bc.X.on_each(*range(3))
+        bc.Z.on_each()
+
+    def individual():
+        for q in range(3):
+            bc.H(q)
+        bc.CX(0, 1)
+        for q in range(3):
+            bc.X(q)
+
+    circuit = bc.build(broadcast)()
+    assert circuit == bc.build(individual)()
+    assert len(circuit) == 3
+
+
+def test_build_on_each_insert_strategy_and_moment():
+    def broadcast():
+        with bc.InsertStrategy(cirq.InsertStrategy.NEW):
+            bc.H.on_each(0, 1)
+            bc.CX(0, 1)
+        with bc.Moment():
+            bc.X.on_each(0, 1)
+
+    def individual():
+        with bc.InsertStrategy(cirq.InsertStrategy.NEW):
+            bc.H(0)
+            bc.H(1)
+            bc.CX(0, 1)
+        with bc.Moment():
+            bc.X(0)
+            bc.X(1)
+
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = bc.build(broadcast)()
+    assert circuit == bc.build(individual)()
+    assert circuit[-1] == cirq.Moment([cirq.X(q0), cirq.X(q1)])
+
+
+def test_build_on_each_unsupported():
+    def fn():
+        blqs.Op("a").on_each(0)
+
+    with pytest.raises(ValueError, match="Unsupported instruction"):
+        _ = bc.build(fn)()
+
+
+def test_build_creates_blqs_builder_once(monkeypatch):
+    calls = []
+    build_with_config = blqs.build_with_config
+
+    def counting_build_with_config(config):
+        calls.append(config)
+        return build_with_config(config)
+
+    monkeypatch.setattr(blqs, "build_with_config", counting_build_with_config)
+
+    def fn(q):
+        bc.H(q)
+
+    built = bc.build(fn)
+    assert built(0) == cirq.Circuit([cirq.H(cirq.LineQubit(0))])
+    assert built(1) == cirq.Circuit([cirq.H(cirq.LineQubit(1))])
+    assert len(calls) == 1
+    specs = calls[0].additional_decorator_specs
+    assert blqs.DecoratorSpec(module=bc, method=bc.build) in specs
+    assert blqs.DecoratorSpec(module=bc, method=bc.build_with_config) in specs
+
+
 def test_build_insert_strategy():
     a, b = cirq.NamedQubit("a"), cirq.NamedQubit("b")
     # This order insures that each of the different strategies produce different moment
@@ -220,3 +292,146 @@ def test_build_with_config_if_disabled():
     # should be supported. However it just evaluates the iterable to be Truthy, so gives the
     # single statement
     assert bc.build_with_config(build_config)(fn)() == cirq.Circuit([cirq.H(cirq.LineQubit(0))])
+
+
+@bc.build
+def _rotations(theta, num_qubits):
+    for q in range(num_qubits):
+        bc.rx(theta)(q)
+    with bc.Moment():
+        bc.CZ(0, 1)
+
+
+@bc.build_with_config(bc.BuildConfig(output_circuit=False))
+def _rotations_program(theta, num_qubits):
+    for q in range(num_qubits):
+        bc.rx(theta)(q)
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_build_many(executor):
+    args = [(0.1 * i, n) for i in range(4) for n in (2, 3)]
+    circuits = list(bc.build_many(_rotations, args, executor=executor, chunksize=3))
+    assert circuits == [_rotations(*a) for a in args]
+    assert all(isinstance(c, cirq.Circuit) for c in circuits)
+
+    programs = bc.build_many(_rotations_program, args, executor=executor, ordered=False)
+    assert sorted(programs, key=lambda p: p[0]) == [
+        (i, _rotations_program(*a)) for i, a in enumerate(args)
+    ]
+
+
+def test_build_cache_results():
+    calls = []
+
+    def fn(theta):
+        calls.append(theta)
+        bc.rx(theta)(0)
+        bc.CZ(0, 1)
+
+    built_fn = bc.build_with_config(bc.BuildConfig(cache_results=True))(fn)
+    circuit = built_fn(0.5)
+    assert isinstance(circuit, cirq.FrozenCircuit)
+    assert circuit == cirq.FrozenCircuit(
+        cirq.rx(0.5)(cirq.LineQubit(0)), cirq.CZ(cirq.LineQubit(0), cirq.LineQubit(1))
+    )
+    assert built_fn(0.5) is circuit
+    assert built_fn(0.25) is not circuit
+    assert calls == [0.5, 0.25]
+    assert blqs.result_cache_info(built_fn) == blqs.ResultCacheInfo(
+        hits=1, misses=2, maxsize=128, currsize=2, weak_keys=False
+    )
+
+    program_fn = bc.build_with_config(bc.BuildConfig(output_circuit=False, cache_results=True))(fn)
+    program = program_fn(0.5)
+    assert program.is_frozen()
+    assert program_fn(0.5) is program
+
+
+def test_build_cache_results_in_block():
+    def fn():
+        bc.H(0)
+
+    built_fn = bc.build_with_config(bc.BuildConfig(cache_results=True))(fn)
+    with blqs.Program() as program:
+        assert built_fn() == cirq.Circuit(cirq.H(cirq.LineQubit(0)))
+    assert program == blqs.Program.of(blqs.Block.of(bc.H(0)))
+    assert blqs.result_cache_info(built_fn).currsize == 0
+
+
+def test_build_emit_calls():
+    @bc.build_with_config(bc.BuildConfig(emit_calls=True))
+    def sub(q):
+        bc.H(q)
+        bc.CZ(q, q + 1)
+
+    def fn():
+        sub(0)
+        sub(0)
+        sub(1)
+
+    program = bc.build_with_config(bc.BuildConfig(output_circuit=False))(fn)()
+    assert [type(s) for s in program] == [blqs.Call] * 3
+    assert program[0].block() is program[1].block()
+
+    circuit = bc.build(fn)()
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    sub0 = cirq.FrozenCircuit(cirq.H(q0), cirq.CZ(q0, q1))
+    sub1 = cirq.FrozenCircuit(cirq.H(q1), cirq.CZ(q1, q2))
+    assert circuit == cirq.Circuit(
+        [
+            cirq.CircuitOperation(sub0),
+            cirq.CircuitOperation(sub0),
+            cirq.CircuitOperation(sub1),
+        ]
+    )
+    ops = list(circuit.all_operations())
+    assert ops[0].circuit is ops[1].circuit
+
+
+def test_build_emit_calls_in_block():
+    @bc.build_with_config(bc.BuildConfig(emit_calls=True))
+    def sub():
+        bc.H(0)
+
+    assert sub() == cirq.Circuit(cirq.H(cirq.LineQubit(0)))
+    with blqs.Program() as program:
+        circuit = sub()
+        assert sub() is circuit
+    assert circuit == cirq.FrozenCircuit(cirq.H(cirq.LineQubit(0)))
+    assert program == blqs.Program.of(
+        blqs.Call("sub", blqs.Block.of(bc.H(0))), blqs.Call("sub", blqs.Block.of(bc.H(0)))
+    )
+
+
+def test_build_emit_calls_circuit_op_disabled():
+    @bc.build_with_config(bc.BuildConfig(emit_calls=True))
+    def sub():
+        bc.H(0)
+
+    def fn():
+        sub()
+
+    build_config = bc.BuildConfig(support_circuit_operation=False)
+    with pytest.raises(ValueError, match="Call"):
+        bc.build_with_config(build_config)(fn)()
+
+
+def test_build_cache_results_not_frozen():
+    def fn():
+        bc.H(0)
+        return [1]
+
+    built_fn = bc.build_with_config(bc.BuildConfig(output_circuit=False, cache_results=True))(fn)
+    result = built_fn()
+    result.append(2)
+    assert built_fn() == [1]
+    assert blqs.result_cache_info(built_fn).currsize == 0
+
+    @bc.build_with_config(bc.BuildConfig(output_circuit=False, cache_results=True))
+    def unhashable_fn():
+        bc.H([0, 1])
+
+    program = unhashable_fn()
+    assert not program.is_frozen()
+    assert unhashable_fn() is not program
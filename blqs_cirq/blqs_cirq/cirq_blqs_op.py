@@ -14,6 +14,7 @@
 from __future__ import annotations
 
 import functools
+import importlib
 import inspect
 
 from typing import (
@@ -41,6 +42,8 @@ GateLikeType = Union[cirq.Gate, Callable[[], cirq.Gate], functools.partial]
 class CirqBlqsOp(blqs.Op):
     """A `blqs.Op` corresponding to a `cirq.Gate`."""
 
+    __slots__ = ("_gate",)
+
     def __init__(self, gate: GateLikeType, op_name: Optional[str] = None):
         """Construct a CirqBlqsOp.
 
@@ -90,6 +93,20 @@ class CirqBlqsOp(blqs.Op):
     def __hash__(self):
         return hash((self._name, self._gate))
 
+    def __reduce_ex__(self, protocol):
+        if self.__class__ is not CirqBlqsOp:
+            return super().__reduce_ex__(protocol)
+        # The ops of the gate constants of `blqs_cirq.gates` are pickled by name, rather than with
+        # their gate, and unpickled as the same op.
+        if getattr(importlib.import_module("blqs_cirq.gates"), self._name, None) is self:
+            return _gates_constant, (self._name,)
+        return CirqBlqsOp, (self._gate, self._name)
+
+
+def _gates_constant(name: str) -> CirqBlqsOp:
+    """The op of the gate constant with the name in `blqs_cirq.gates`."""
+    return getattr(importlib.import_module("blqs_cirq.gates"), name)
+
 
 class CirqBlqsOpFactory:
     """A wrapper for Cirq gate classes or methods with params that when called give a `cirq.Gate`.
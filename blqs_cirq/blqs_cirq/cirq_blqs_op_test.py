@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import pickle
+
 import cirq
 import cirq.testing
 import pymore
@@ -154,3 +156,12 @@ def test_create_cirq_blqs_op_function():
 
     my_x_pow = bc.create_cirq_blqs_op(x_pow)
     assert my_x_pow(exponent=1) == bc.CirqBlqsOp(gate=cirq.XPowGate(exponent=1))
+
+
+def test_cirq_blqs_op_pickle():
+    assert pickle.loads(pickle.dumps(bc.H)) is bc.H
+    assert pickle.loads(pickle.dumps(bc.CNOT)) is bc.CNOT
+    for op in (bc.rx(0.5), bc.H**0.5, bc.CirqBlqsOp(cirq.X, op_name="x")):
+        unpickled = pickle.loads(pickle.dumps(op))
+        assert unpickled == op
+        assert unpickled.gate() == op.gate()
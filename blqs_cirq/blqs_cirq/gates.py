@@ -169,6 +169,8 @@ def reset(qubit) -> blqs.Instruction:
 
 # Special single qubit gate classes
 class SingleQubitCliffordGate(cirq_blqs_op.CirqBlqsOp):
+    __slots__ = ()
+
     I = cirq_blqs_op.CirqBlqsOp(cirq.SingleQubitCliffordGate.I)
     H = cirq_blqs_op.CirqBlqsOp(cirq.SingleQubitCliffordGate.H)
     X = cirq_blqs_op.CirqBlqsOp(cirq.SingleQubitCliffordGate.X)
@@ -239,6 +241,8 @@ class SingleQubitCliffordGate(cirq_blqs_op.CirqBlqsOp):
 
 
 class PauliInteractionGate(cirq_blqs_op.CirqBlqsOp):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(gate=cirq.PauliInteractionGate(*args, **kwargs))
 
@@ -250,6 +254,8 @@ class PauliInteractionGate(cirq_blqs_op.CirqBlqsOp):
 
 
 class CliffordGate(cirq_blqs_op.CirqBlqsOp):
+    __slots__ = ()
+
     I = cirq_blqs_op.CirqBlqsOp(cirq.CliffordGate.I)
     X = cirq_blqs_op.CirqBlqsOp(cirq.CliffordGate.X)
     H = cirq_blqs_op.CirqBlqsOp(cirq.CliffordGate.H)
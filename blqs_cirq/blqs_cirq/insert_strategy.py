@@ -19,6 +19,8 @@ import blqs
 class InsertStrategy(blqs.Statement):
     """Statement to switch to a new cirq.InsertionStrategy."""
 
+    __slots__ = ("_strategy", "_insert_strategy_block")
+
     def __init__(self, strategy: cirq.InsertStrategy):
         super().__init__()
         self._strategy = strategy
@@ -30,6 +32,10 @@ class InsertStrategy(blqs.Statement):
     def insert_strategy_block(self):
         return self._insert_strategy_block
 
+    def freeze(self):
+        self._insert_strategy_block.freeze()
+        return self
+
     def __enter__(self):
         self._insert_strategy_block.__enter__()
         return self
@@ -37,8 +43,11 @@ class InsertStrategy(blqs.Statement):
     def __exit__(self, exc_type, exc_value, traceback):
         return self._insert_strategy_block.__exit__(exc_type, exc_value, traceback)
 
-    def __str__(self):
-        return f"with InsertStrategy({self._strategy}):\n{self._insert_strategy_block}"
+    __str__ = blqs.print_str
+
+    def _print_(self, p: blqs.Printer):
+        p.write(f"with InsertStrategy({self._strategy}):\n")
+        p.print(self._insert_strategy_block)
 
     def __eq__(self, other):
         if not isinstance(other, type(self)):
@@ -32,6 +32,13 @@ def test_insert_strategy_block():
     assert insert_strategy.insert_strategy_block() == blqs.Block.of(bc.H(0), bc.H(1))
 
 
+def test_insert_strategy_freeze():
+    with bc.InsertStrategy(cirq.InsertStrategy.NEW) as insert_strategy:
+        bc.H(0)
+    assert insert_strategy.freeze() is insert_strategy
+    assert insert_strategy.insert_strategy_block().is_frozen()
+
+
 def test_insert_strategy_strategy():
     with bc.InsertStrategy(cirq.InsertStrategy.NEW) as insert_strategy:
         bc.H(0)
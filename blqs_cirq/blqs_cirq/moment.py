@@ -30,5 +30,8 @@ class Moment(blqs.Block):
     but if this is compiled, it will throw a normal Cirq exception.
     """
 
-    def __str__(self):
-        return f"with Moment():\n{super().__str__()}"
+    __slots__ = ()
+
+    def _print_(self, p: blqs.Printer):
+        p.write("with Moment():\n")
+        super()._print_(p)
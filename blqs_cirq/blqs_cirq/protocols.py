@@ -11,7 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Any, TypeVar, Union
+from typing import Any, List, Sequence, TypeVar, Union
 
 try:
     from typing import Protocol
@@ -71,3 +71,26 @@ def decode(
         "No default was specified and the decoder did not have `_decode_` method or one was and it "
         "returned NotImplemented."
     )
+
+
+def decode_each(
+    decoder: SupportsDecoding[F, T],
+    vals: Sequence[F],
+    default: Union[T, NotImplementedType] = NotImplemented,
+) -> List[T]:
+    """Use the given decoder to decode each of the values, in one pass.
+
+    This is equivalent to `[decode(decoder, val, default) for val in vals]`, but looks up the
+    decoder's `_decode_` method once.
+
+    Raises:
+        NotImplementedError: if no default is specified, and a value could not be decoded.
+    """
+    decode_method = getattr(decoder, "_decode_", None)
+    if decode_method is None:
+        return [decode(decoder, val, default) for val in vals]
+    results = [decode_method(val) for val in vals]
+    for i, result in enumerate(results):
+        if result is NotImplemented:
+            results[i] = decode(decoder, vals[i], default)
+    return results
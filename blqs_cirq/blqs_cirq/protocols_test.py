@@ -45,3 +45,29 @@ def test_decode_no_decode_method():
     assert bc.decode(decoder, 10, default="11") == "11"
     with pytest.raises(NotImplementedError, match="_decode_"):
         _ = bc.decode(decoder, 10)
+
+
+def test_decode_each():
+    class Decoder(bc.SupportsDecoding):
+        def _decode_(self, val: int) -> str:
+            if val < 0:
+                return NotImplemented
+            return str(val)
+
+    decoder = Decoder()
+    assert bc.decode_each(decoder, [1, 10]) == ["1", "10"]
+    assert bc.decode_each(decoder, []) == []
+    assert bc.decode_each(decoder, [1, -1], default="d") == ["1", "d"]
+    with pytest.raises(NotImplementedError, match="_decode_"):
+        _ = bc.decode_each(decoder, [1, -1])
+
+
+def test_decode_each_no_decode_method():
+    class DecoderWithNoDecode:
+        pass
+
+    decoder = DecoderWithNoDecode()
+    assert bc.decode_each(decoder, [10, 11], default="d") == ["d", "d"]
+    assert bc.decode_each(decoder, []) == []
+    with pytest.raises(NotImplementedError, match="_decode_"):
+        _ = bc.decode_each(decoder, [10])
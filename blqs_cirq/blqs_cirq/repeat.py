@@ -30,6 +30,8 @@ class CircuitOperation(blqs.Statement):
     See `Repeat` if all one wants to do is to do repetitions.
     """
 
+    __slots__ = ("_circuit_op_block", "_circuit_op_kwargs")
+
     def __init__(self, **circuit_op_kwargs):
         self._circuit_op_block = blqs.Block(parent_statement=self)
         self._circuit_op_kwargs = circuit_op_kwargs
@@ -41,6 +43,10 @@ class CircuitOperation(blqs.Statement):
     def circuit_op_block(self) -> blqs.Block:
         return self._circuit_op_block
 
+    def freeze(self) -> "CircuitOperation":
+        self._circuit_op_block.freeze()
+        return self
+
     def __enter__(self):
         self._circuit_op_block.__enter__()
         return self
@@ -48,8 +54,11 @@ class CircuitOperation(blqs.Statement):
     def __exit__(self, exc_type, exc_value, traceback):
         self._circuit_op_block.__exit__(exc_type, exc_value, traceback)
 
-    def __str__(self):
-        return f"with CircuitOperation({self._circuit_op_kwargs or ''}):\n{self._circuit_op_block}"
+    __str__ = blqs.print_str
+
+    def _print_(self, p: blqs.Printer):
+        p.write(f"with CircuitOperation({self._circuit_op_kwargs or ''}):\n")
+        p.print(self._circuit_op_block)
 
     def __eq__(self, other):
         if not isinstance(other, type(self)):
@@ -74,11 +83,14 @@ class Repeat(CircuitOperation):
     ```
     """
 
+    __slots__ = ()
+
     def __init__(self, repetitions: int):
         super().__init__(repetitions=repetitions)
 
     def repetitions(self) -> int:
         return self.circuit_op_kwargs()["repetitions"]
 
-    def __str__(self):
-        return f"repeat({self.repetitions()} times):\n{self._circuit_op_block}"
+    def _print_(self, p: blqs.Printer):
+        p.write(f"repeat({self.repetitions()} times):\n")
+        p.print(self._circuit_op_block)
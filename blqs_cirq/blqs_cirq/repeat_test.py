@@ -138,6 +138,13 @@ def test_circuit_operation_equality():
     equals_tester.add_equality_group(co)
 
 
+def test_circuit_operation_freeze():
+    with bc.CircuitOperation(repetitions=2) as circuit_op:
+        bc.H(0)
+    assert circuit_op.freeze() is circuit_op
+    assert circuit_op.circuit_op_block().is_frozen()
+
+
 def test_circuit_operation_str():
     assert str(bc.CircuitOperation()) == "with CircuitOperation():\n"
     with bc.CircuitOperation() as co: